@@ -37,6 +37,18 @@ def get_argument_parser() -> ArgumentParser:
         type=int,
         default=8080
     )
+    app_group.add_argument(
+        '--dbus-backend',
+        help='D-Bus client stack, gio shares the NetworkManager client connection',
+        choices=['dbus-python', 'gio'],
+        default='dbus-python'
+    )
+    app_group.add_argument(
+        '--nm-profile-source',
+        help='NetworkManager profile source, client reads profiles from the NetworkManager client',
+        choices=['keyfile', 'client'],
+        default='keyfile'
+    )
 
     device_group = parser.add_argument_group('device')
     device_group.add_argument('--device-role', help='device role', default='edge')
@@ -65,6 +77,12 @@ def get_argument_parser() -> ArgumentParser:
         action='store_true',
         default=False
     )
+    wlan_group.add_argument(
+        '--wlan-precompute-psk',
+        help='store derived WPA PSKs instead of passphrases for client networks and the hotspot',
+        action='store_true',
+        default=False
+    )
 
     control_group = parser.add_argument_group('control')
     control_group.add_argument(
@@ -82,16 +100,58 @@ def get_argument_parser() -> ArgumentParser:
     client_group = parser.add_argument_group('client')
     client_group.add_argument(
         '--client-timeout',
-        help='client timeout in seconds',
+        help='client timeout in seconds, used until connect durations are learned',
         type=int,
         default=30
     )
+    client_group.add_argument(
+        '--client-timeout-min',
+        help='minimum learned client timeout in seconds',
+        type=int,
+        default=10
+    )
+    client_group.add_argument(
+        '--client-timeout-max',
+        help='maximum learned client timeout in seconds',
+        type=int,
+        default=60
+    )
+    client_group.add_argument(
+        '--client-timeout-percentile',
+        help='percentile of observed connect durations used for the client timeout, 0 to disable learning',
+        type=float,
+        default=95
+    )
+    client_group.add_argument(
+        '--client-timeout-margin',
+        help='multiplier applied to the learned connect duration',
+        type=float,
+        default=1.5
+    )
     client_group.add_argument(
         '--client-restart-delay',
         help='client restart delay in seconds',
         type=int,
         default=5
     )
+    client_group.add_argument(
+        '--client-scan-before-start',
+        help='scan for stored networks before starting client mode and stay in hotspot mode if none are in range',
+        action=BooleanOptionalAction,
+        default=True
+    )
+    client_group.add_argument(
+        '--client-scan-cache-ttl',
+        help='scan result reuse period in seconds',
+        type=int,
+        default=30
+    )
+    client_group.add_argument(
+        '--client-rank-interval',
+        help='network priority ranking interval in seconds, 0 to disable',
+        type=int,
+        default=3600
+    )
 
     hotspot_group = parser.add_argument_group('hotspot')
     hotspot_group.add_argument(
@@ -105,6 +165,12 @@ def get_argument_parser() -> ArgumentParser:
         type=int,
         default=120
     )
+    hotspot_group.add_argument(
+        '--hotspot-watch-interval',
+        help='interval in seconds to scan for stored networks while in hotspot mode, 0 to disable',
+        type=int,
+        default=30
+    )
     hotspot_group.add_argument(
         '--hotspot-static-ip',
         help='hotspot static IP address',
@@ -121,6 +187,17 @@ def get_argument_parser() -> ArgumentParser:
         type=int,
         default=5
     )
+    hotspot_group.add_argument(
+        '--hotspot-concurrent',
+        help='run the hotspot on a virtual interface alongside the client',
+        action=BooleanOptionalAction,
+        default=False
+    )
+    hotspot_group.add_argument(
+        '--hotspot-interface',
+        help='virtual hotspot interface name, used in concurrent mode',
+        default='uap0'
+    )
 
     connection_group = parser.add_argument_group('connection')
     connection_group.add_argument(
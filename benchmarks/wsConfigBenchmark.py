@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+import os
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser, Namespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wifi_config import WifiNetwork, WpaSupplicantConfig  # noqa: E402
+
+NETWORK_COUNTS = [1, 10, 100, 1000]
+
+
+def main() -> None:
+    arguments = _parse_arguments()
+
+    with tempfile.TemporaryDirectory() as directory:
+        config_file = os.path.join(directory, 'wpa_supplicant.conf')
+
+        for count in arguments.networks:
+            cold_lookup, cached_lookup, parse_count = _measure(config_file, count, arguments.repeat)
+            print(f'networks={count}, cold lookup={cold_lookup * 1000:.3f}ms, '
+                  f'cached lookup={cached_lookup * 1000:.3f}ms, parses={parse_count}')
+
+
+def _parse_arguments() -> Namespace:
+    parser = ArgumentParser(description='Measure wpa_supplicant config lookups against network count')
+    parser.add_argument('-n', '--networks', type=int, nargs='+', default=NETWORK_COUNTS,
+                        help='network counts to measure')
+    parser.add_argument('-r', '--repeat', type=int, default=100, help='cached lookups per network count')
+    return parser.parse_args()
+
+
+def _measure(config_file: str, count: int, repeat: int) -> tuple[float, float, int]:
+    networks = [WifiNetwork(f'"network{index}"', '"password"', True, index) for index in range(count)]
+    with open(config_file, 'w') as file:
+        file.write(WpaSupplicantConfig('HU', config_file)._render_config(networks))
+
+    ws_config = WpaSupplicantConfig('HU', config_file)
+    ssid = f'network{count - 1}'
+
+    start = time.perf_counter()
+    ws_config.get_network(ssid)
+    cold_lookup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        ws_config.get_network(ssid)
+    cached_lookup = (time.perf_counter() - start) / repeat
+
+    return cold_lookup, cached_lookup, ws_config.get_parse_count()
+
+
+if __name__ == '__main__':
+    main()
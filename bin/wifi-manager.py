@@ -12,20 +12,28 @@ from wifi_connection import (
     ConnectionMonitor,
     ConnectionAction,
 )
-from wifi_dbus import WpaSupplicantDbus, NetworkManagerDbus
+from wifi_dbus import (
+    WpaSupplicantDbus,
+    NetworkManagerDbus,
+    AsyncDbus,
+    GioSystemBus,
+    SystemdUnitMonitor,
+    UnitSnapshot,
+)
 
 gi.require_version('NM', '1.0')
 import os
+import resource
+import sys
+import time
 from pathlib import Path
 from signal import signal, SIGINT, SIGTERM
 from threading import Thread
 from typing import Any
 
-from _dbus_glib_bindings import DBusGMainLoop
 from common_utility import ReusableTimer, ConfigLoader
 from context_logger import setup_logging, get_logger
 from cysystemd.reader import JournalReader  # type: ignore
-from dbus import SystemBus
 
 from gi.repository import GLib, NM
 from jinja2 import Template
@@ -38,6 +46,10 @@ from wifi_manager import (
     WifiWebServer,
     WifiManager,
     WifiControlConfig,
+    NetworkHistory,
+    NetworkRanker,
+    ClientTimeoutConfig,
+    NetworkWatcher,
 )
 from wifi_service import (
     WpaSupplicantService,
@@ -49,6 +61,7 @@ from wifi_service import (
     DnsmasqConfig,
     IService,
     ServiceDependencies,
+    SetupTransaction,
     NetworkManagerService,
     SystemdResolvedService,
     WifiClientService,
@@ -61,15 +74,27 @@ from wifi_utility import (
     GpioBlinkDevice,
     BlinkConfig,
     BlinkControl,
+    ConfigReconciler,
+    FileMonitor,
+    AtomicFileWriter,
+    WifiScanner,
+    VirtualInterface,
 )
-from wifi_config import WpaSupplicantConfig, NetworkManagerConfig
+from wifi_config import WpaSupplicantConfig, NetworkManagerConfig, NetworkManagerClientConfig
 
 log = get_logger('WifiManagerApp')
 
 DEFAULT_CONFIG_PATH = Path(f'/etc/effective-range/{APPLICATION_NAME}/{APPLICATION_NAME}.conf.default')
+CONFIG_STATE_PATH = Path(f'/var/lib/effective-range/{APPLICATION_NAME}/config-state.json')
+NETWORK_HISTORY_PATH = Path(f'/var/lib/effective-range/{APPLICATION_NAME}/network-history.json')
+WPA_SUPPLICANT_CONFIG_PATH = '/etc/wpa_supplicant/wpa_supplicant.conf'
+NM_CONNECTIONS_DIR = '/etc/NetworkManager/system-connections'
 
 
 def main() -> None:
+    import_usage = resource.getrusage(resource.RUSAGE_SELF)
+    import_cpu_seconds = time.process_time()
+
     setup_logging(APPLICATION_NAME)
 
     resource_root = _get_resource_root()
@@ -90,6 +115,10 @@ def main() -> None:
 
     cpu_serial = platform.get_cpu_serial()
     mac_address = platform.get_mac_address(wlan_interface)
+    hotspot_interface = config.hotspot_interface if config.hotspot_concurrent else wlan_interface
+    virtual_interface = VirtualInterface(
+        platform, wlan_interface, hotspot_interface, debian_12_or_higher
+    ) if config.hotspot_concurrent else None
 
     id_context = {
         'device_role': config.device_role,
@@ -100,34 +129,48 @@ def main() -> None:
     hostname = Template(config.device_hostname).render(id_context)
     id_context['hostname'] = hostname
 
-    system_bus = SystemBus(DBusGMainLoop(set_as_default=True))
+    nm_client = NM.Client.new(None)
+    system_bus = _create_system_bus(config.dbus_backend, nm_client)
 
     with SystemdDbus(system_bus) as systemd:
-        wpa_config = WpaSupplicantConfig(config.wlan_country)
+        wpa_config_monitor = FileMonitor(WPA_SUPPLICANT_CONFIG_PATH)
+        file_writer = AtomicFileWriter()
+        wpa_config = WpaSupplicantConfig(
+            config.wlan_country, WPA_SUPPLICANT_CONFIG_PATH, wpa_config_monitor, file_writer
+        )
+        wpa_config_monitor.start()
         wpa_dbus = WpaSupplicantDbus(wlan_interface, system_bus)
-        nm_client = NM.Client.new(None)
-        nm_config = NetworkManagerConfig(wlan_interface, config.wlan_country)
+        nm_config = _create_nm_config(config.nm_profile_source, wlan_interface, nm_client, file_writer)
         nm_dbus = NetworkManagerDbus(wlan_interface, nm_client)
         dnsmasq_config = DnsmasqConfig(
-            wlan_interface, config.hotspot_static_ip, config.hotspot_dhcp_range, config.server_port
+            hotspot_interface, config.hotspot_static_ip, config.hotspot_dhcp_range, config.server_port
         )
         hostapd_config = HostapdConfig(
-            wlan_interface,
+            hotspot_interface,
             mac_address,
             hostname,
             config.hotspot_password,
             config.wlan_country,
             config.hotspot_startup_delay,
+            config.wlan_precompute_psk,
         )
         reader = JournalReader()
         journal = ServiceJournal(reader)
-        service_dependencies = ServiceDependencies(platform, systemd, journal)
+        unit_monitor = SystemdUnitMonitor(system_bus)
+        unit_snapshot = UnitSnapshot(system_bus, AsyncDbus(system_bus), unit_monitor)
+        config_reconciler = ConfigReconciler(str(CONFIG_STATE_PATH), file_writer)
+        service_dependencies = ServiceDependencies(
+            platform, systemd, journal, unit_monitor, unit_snapshot, config_reconciler, file_writer
+        )
 
         services: dict[str, IService] = {}
         wifi_client_service: WifiClientService
 
         systemd_resolved_service = SystemdResolvedService(service_dependencies)
-        dhcpcd_service = DhcpcdService(service_dependencies, system_bus, wlan_interface)
+        dhcpcd_service = DhcpcdService(
+            service_dependencies, system_bus, wlan_interface,
+            excluded_interfaces=[hotspot_interface] if config.hotspot_concurrent else None
+        )
         avahi_service = AvahiService(service_dependencies, hostname)
         network_manager_service = NetworkManagerService(
             service_dependencies, nm_config, nm_dbus, config.client_restart_delay
@@ -139,9 +182,15 @@ def main() -> None:
             service_dependencies, wpa_config, wpa_dbus, dhcpcd_service
         )
         hostapd_service = HostapdService(
-            service_dependencies, hostapd_config, dnsmasq_service, resource_root
+            service_dependencies, hostapd_config, dnsmasq_service, resource_root,
+            virtual_interface=virtual_interface
         )
 
+        unit_snapshot.refresh([service.get_name() for service in [
+            systemd_resolved_service, dhcpcd_service, avahi_service, dnsmasq_service,
+            network_manager_service, wpa_supplicant_service, hostapd_service
+        ]])
+
         if debian_12_or_higher:
             _init_service(services, systemd_resolved_service, False)
             _init_service(services, dhcpcd_service, False)
@@ -164,7 +213,8 @@ def main() -> None:
             wifi_client_service = wpa_supplicant_service
 
         wifi_hotspot_service = HostapdService(
-            service_dependencies, hostapd_config, dnsmasq_service, resource_root
+            service_dependencies, hostapd_config, dnsmasq_service, resource_root,
+            virtual_interface=virtual_interface
         )
 
         connection_monitor_timer = ReusableTimer()
@@ -189,8 +239,16 @@ def main() -> None:
         connection_monitor = ConnectionMonitor(
             platform, systemd, connection_monitor_timer, connection_monitor_config
         )
-        wifi_control_config = WifiControlConfig(config.control_switch_fail_limit, config.control_switch_fail_command)
-        wifi_control = WifiControl(wifi_client_service, wifi_hotspot_service, platform, wifi_control_config)
+        wifi_control_config = WifiControlConfig(
+            config.control_switch_fail_limit, config.control_switch_fail_command, config.wlan_precompute_psk,
+            config.hotspot_concurrent
+        )
+        wifi_scanner = WifiScanner(
+            platform, wlan_interface, config.client_scan_cache_ttl, wifi_client_service.scan_networks
+        ) if config.client_scan_before_start else None
+        wifi_control = WifiControl(
+            wifi_client_service, wifi_hotspot_service, platform, wifi_control_config, wifi_scanner
+        )
         blink_config = BlinkConfig(
             config.identify_blink_frequency, config.identify_blink_interval, config.identify_blink_pause,
             config.identify_blink_count
@@ -200,6 +258,17 @@ def main() -> None:
             initial_value=config.identify_pin_initial_value
         )
         blink_control = BlinkControl(blink_config, blink_device)
+        network_history = NetworkHistory(str(NETWORK_HISTORY_PATH), file_writer)
+        network_ranker = NetworkRanker(wifi_control, network_history, ReusableTimer(), config.client_rank_interval)
+        if wifi_scanner:
+            wifi_scanner.add_result_handler(network_ranker.record_scan)
+        client_timeout_config = ClientTimeoutConfig(
+            config.client_timeout_min, config.client_timeout_max, config.client_timeout_percentile,
+            config.client_timeout_margin
+        ) if config.client_timeout_percentile > 0 else None
+        network_watcher = NetworkWatcher(
+            wifi_control, ReusableTimer(), config.hotspot_watch_interval
+        ) if wifi_scanner else None
         event_handler_timer = ReusableTimer()
         event_handler = WifiEventHandler(
             wifi_control,
@@ -208,6 +277,10 @@ def main() -> None:
             connection_monitor,
             config.client_timeout,
             config.hotspot_peer_timeout,
+            network_history,
+            network_ranker,
+            client_timeout_config,
+            network_watcher,
         )
         command_definitions = config.command_definitions.strip().split('\n')
         web_server_config = WebServerConfig(
@@ -216,9 +289,11 @@ def main() -> None:
         web_server = WifiWebServer(web_server_config, platform, event_handler, command_definitions)
 
         wifi_manager = WifiManager(
-            services, wifi_control, event_handler, connection_monitor, web_server
+            services, wifi_control, event_handler, connection_monitor, web_server, SetupTransaction(systemd)
         )
 
+        _log_footprint(config.dbus_backend, import_usage, import_cpu_seconds)
+
         event_loop = GLib.MainLoop()
         event_thread = Thread(target=event_loop.run)
 
@@ -236,10 +311,45 @@ def main() -> None:
 
         wifi_manager.run()
 
+        log.info('Config persistence', writes=file_writer.get_writes(),
+                 writes_avoided=file_writer.get_writes_avoided(), bytes_written=file_writer.get_bytes_written())
+
         event_loop.quit()
         event_thread.join(1)
 
 
+def _create_system_bus(dbus_backend: str, nm_client: NM.Client) -> Any:
+    if dbus_backend == 'gio':
+        return GioSystemBus(nm_client.get_dbus_connection())
+
+    from _dbus_glib_bindings import DBusGMainLoop
+    from dbus import SystemBus
+
+    return SystemBus(DBusGMainLoop(set_as_default=True))
+
+
+def _create_nm_config(profile_source: str, wlan_interface: str, nm_client: NM.Client,
+                      file_writer: AtomicFileWriter) -> NetworkManagerConfig:
+    if profile_source == 'client':
+        return NetworkManagerClientConfig(wlan_interface, nm_client, network_dir=NM_CONNECTIONS_DIR,
+                                          file_writer=file_writer)
+
+    nm_connections_monitor = FileMonitor(NM_CONNECTIONS_DIR, directory=True)
+    nm_config = NetworkManagerConfig(wlan_interface, network_dir=NM_CONNECTIONS_DIR,
+                                     dir_monitor=nm_connections_monitor, file_writer=file_writer)
+    nm_connections_monitor.start()
+
+    return nm_config
+
+
+def _log_footprint(dbus_backend: str, import_usage: resource.struct_rusage, import_cpu_seconds: float) -> None:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    log.info('Process footprint', dbus_backend=dbus_backend,
+             import_max_rss_kb=import_usage.ru_maxrss, import_cpu_seconds=round(import_cpu_seconds, 3),
+             max_rss_kb=usage.ru_maxrss, startup_cpu_seconds=round(time.process_time(), 3),
+             dbus_python_loaded='dbus' in sys.modules)
+
+
 def _get_resource_root() -> str:
     return str(Path(os.path.dirname(__file__)).parent.absolute())
 
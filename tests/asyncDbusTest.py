@@ -0,0 +1,105 @@
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock, ANY
+
+from context_logger import setup_logging
+from dbus import SystemBus, DBusException
+
+from wifi_dbus import AsyncDbus, DbusProxyCache
+
+BUS_NAME = 'org.freedesktop.systemd1'
+OBJECT_PATH = '/org/freedesktop/systemd1'
+INTERFACE_NAME = 'org.freedesktop.systemd1.Manager'
+
+
+class AsyncDbusTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+
+    def test_call_resolves_future_with_reply(self):
+        # Given
+        proxy_cache, method = create_components()
+        method.side_effect = lambda *args, **kwargs: kwargs['reply_handler']('enabled')
+        async_dbus = AsyncDbus(MagicMock(spec=SystemBus), proxy_cache)
+
+        # When
+        future = async_dbus.call(BUS_NAME, OBJECT_PATH, INTERFACE_NAME, 'GetUnitFileState', 'hostapd.service')
+
+        # Then
+        self.assertEqual('enabled', future.result(0))
+        proxy_cache.get_interface.assert_called_once_with(BUS_NAME, OBJECT_PATH, INTERFACE_NAME)
+        method.assert_called_once_with('hostapd.service', reply_handler=ANY,
+                                       error_handler=ANY, timeout=5)
+
+    def test_call_resolves_future_with_error(self):
+        # Given
+        proxy_cache, method = create_components()
+        error = DBusException('No such file')
+        method.side_effect = lambda *args, **kwargs: kwargs['error_handler'](error)
+        async_dbus = AsyncDbus(MagicMock(spec=SystemBus), proxy_cache)
+
+        # When
+        future = async_dbus.call(BUS_NAME, OBJECT_PATH, INTERFACE_NAME, 'GetUnitFileState', 'missing.service')
+
+        # Then
+        self.assertEqual(error, future.exception(0))
+
+    def test_call_resolves_future_with_error_when_arguments_not_marshalled(self):
+        # Given
+        proxy_cache, method = create_components()
+        error = ValueError('Unable to guess signature from an empty list')
+        method.side_effect = error
+        async_dbus = AsyncDbus(MagicMock(spec=SystemBus), proxy_cache)
+
+        # When
+        future = async_dbus.call(BUS_NAME, OBJECT_PATH, INTERFACE_NAME, 'ListUnitFilesByPatterns', [], [])
+
+        # Then
+        self.assertEqual(error, future.exception(0))
+
+    def test_call_passes_per_call_timeout(self):
+        # Given
+        proxy_cache, method = create_components()
+        async_dbus = AsyncDbus(MagicMock(spec=SystemBus), proxy_cache)
+
+        # When
+        async_dbus.call(BUS_NAME, OBJECT_PATH, INTERFACE_NAME, 'Reload', timeout=1)
+
+        # Then
+        method.assert_called_once_with(reply_handler=ANY, error_handler=ANY, timeout=1)
+
+    def test_gather_returns_results_and_errors(self):
+        # Given
+        proxy_cache, method = create_components()
+        error = DBusException('No such file')
+        handlers = []
+        method.side_effect = lambda *args, **kwargs: handlers.append(kwargs)
+        async_dbus = AsyncDbus(MagicMock(spec=SystemBus), proxy_cache)
+        pending = [async_dbus.call(BUS_NAME, OBJECT_PATH, INTERFACE_NAME, 'GetUnitFileState', f'unit{index}')
+                   for index in range(3)]
+        handlers[0]['reply_handler']('enabled')
+        handlers[1]['error_handler'](error)
+
+        # When
+        result = async_dbus.gather(pending, 0.1)
+
+        # Then
+        self.assertEqual('enabled', result[0])
+        self.assertEqual(error, result[1])
+        self.assertIsInstance(result[2], TimeoutError)
+
+
+def create_components():
+    proxy_cache = MagicMock(spec=DbusProxyCache)
+    method = MagicMock()
+    proxy_cache.get_interface.return_value.get_dbus_method.return_value = method
+    return proxy_cache, method
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import unittest
+from unittest import TestCase
+
+from common_utility import delete_directory, create_file
+from context_logger import setup_logging
+
+from tests import TEST_FILE_SYSTEM_ROOT
+from wifi_utility import AtomicFileWriter
+
+CONFIG_DIR = f'{TEST_FILE_SYSTEM_ROOT}/etc/test'
+CONFIG_FILE = f'{CONFIG_DIR}/test.conf'
+
+
+class AtomicFileWriterTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+        delete_directory(TEST_FILE_SYSTEM_ROOT)
+
+    def test_writes_new_file(self):
+        # Given
+        file_writer = AtomicFileWriter()
+
+        # When
+        result = file_writer.write(CONFIG_FILE, 'key=value\n')
+
+        # Then
+        self.assertTrue(result)
+        self.assertEqual('key=value\n', read_file(CONFIG_FILE))
+        self.assertEqual(1, file_writer.get_writes())
+        self.assertEqual(10, file_writer.get_bytes_written())
+        self.assertEqual(['test.conf'], os.listdir(CONFIG_DIR))
+
+    def test_skips_write_when_content_unchanged(self):
+        # Given
+        create_file(CONFIG_FILE, 'key=value\n')
+        os.utime(CONFIG_FILE, ns=(0, 0))
+        file_writer = AtomicFileWriter()
+
+        # When
+        result = file_writer.write(CONFIG_FILE, 'key=value\n')
+
+        # Then
+        self.assertFalse(result)
+        self.assertEqual(0, os.stat(CONFIG_FILE).st_mtime_ns)
+        self.assertEqual(1, file_writer.get_writes_avoided())
+        self.assertEqual(0, file_writer.get_bytes_written())
+
+    def test_replaces_file_and_keeps_mode_when_content_changed(self):
+        # Given
+        create_file(CONFIG_FILE, 'key=value\n')
+        os.chmod(CONFIG_FILE, 0o600)
+        inode = os.stat(CONFIG_FILE).st_ino
+        file_writer = AtomicFileWriter()
+
+        # When
+        result = file_writer.write(CONFIG_FILE, 'key=other\n')
+
+        # Then
+        self.assertTrue(result)
+        self.assertEqual('key=other\n', read_file(CONFIG_FILE))
+        self.assertEqual(0o600, os.stat(CONFIG_FILE).st_mode & 0o7777)
+        self.assertNotEqual(inode, os.stat(CONFIG_FILE).st_ino)
+        self.assertEqual(['test.conf'], os.listdir(CONFIG_DIR))
+
+    def test_writes_file_with_requested_mode(self):
+        # Given
+        file_writer = AtomicFileWriter()
+
+        # When
+        file_writer.write(CONFIG_FILE, 'key=value\n', 0o600)
+
+        # Then
+        self.assertEqual(0o600, os.stat(CONFIG_FILE).st_mode & 0o7777)
+
+    def test_updates_file_content(self):
+        # Given
+        create_file(CONFIG_FILE, 'host=old\nport=80\n')
+        file_writer = AtomicFileWriter()
+
+        # When
+        result = file_writer.update(CONFIG_FILE, lambda content: content.replace('old', 'new'))
+
+        # Then
+        self.assertTrue(result)
+        self.assertEqual('host=new\nport=80\n', read_file(CONFIG_FILE))
+
+    def test_skips_update_when_transform_makes_no_change(self):
+        # Given
+        create_file(CONFIG_FILE, 'host=new\n')
+        file_writer = AtomicFileWriter()
+
+        # When
+        result = file_writer.update(CONFIG_FILE, lambda content: content.replace('old', 'new'))
+
+        # Then
+        self.assertFalse(result)
+        self.assertEqual(1, file_writer.get_writes_avoided())
+
+
+def read_file(file_path):
+    with open(file_path, 'r') as file:
+        return file.read()
+
+
+if __name__ == '__main__':
+    unittest.main()
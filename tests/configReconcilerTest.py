@@ -0,0 +1,169 @@
+import json
+import os
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from common_utility import delete_directory
+from context_logger import setup_logging
+
+from tests import TEST_FILE_SYSTEM_ROOT
+from wifi_utility import ConfigReconciler, AtomicFileWriter
+
+CONFIG_FILE = f'{TEST_FILE_SYSTEM_ROOT}/etc/hostapd/hostapd.conf'
+STATE_FILE = f'{TEST_FILE_SYSTEM_ROOT}/var/lib/wifi-manager/config-state.json'
+
+
+class ConfigReconcilerTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+        delete_directory(TEST_FILE_SYSTEM_ROOT)
+        os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
+        with open(CONFIG_FILE, 'w') as file:
+            file.write('interface=wlan0\n')
+
+    def test_runs_check_on_first_reconcile(self):
+        # Given
+        reconciler = ConfigReconciler(STATE_FILE)
+        check = MagicMock(return_value=False)
+
+        # When
+        result = reconciler.need_setup(CONFIG_FILE, 'interface=wlan0\n', check)
+
+        # Then
+        self.assertFalse(result)
+        check.assert_called_once()
+        self.assertEqual('check', reconciler.get_timings()[CONFIG_FILE]['method'])
+
+    def test_skips_check_when_metadata_unchanged(self):
+        # Given
+        ConfigReconciler(STATE_FILE).need_setup(CONFIG_FILE, 'interface=wlan0\n', MagicMock(return_value=False))
+        reconciler = ConfigReconciler(STATE_FILE)
+        check = MagicMock(return_value=False)
+
+        # When
+        result = reconciler.need_setup(CONFIG_FILE, 'interface=wlan0\n', check)
+
+        # Then
+        self.assertFalse(result)
+        check.assert_not_called()
+        self.assertEqual('stat', reconciler.get_timings()[CONFIG_FILE]['method'])
+
+    def test_skips_check_when_content_hash_unchanged(self):
+        # Given
+        reconciler = ConfigReconciler(STATE_FILE)
+        reconciler.need_setup(CONFIG_FILE, 'interface=wlan0\n', MagicMock(return_value=False))
+        file_stat = os.stat(CONFIG_FILE)
+        os.utime(CONFIG_FILE, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 1000000000))
+        check = MagicMock(return_value=False)
+
+        # When
+        result = reconciler.need_setup(CONFIG_FILE, 'interface=wlan0\n', check)
+
+        # Then
+        self.assertFalse(result)
+        check.assert_not_called()
+        self.assertEqual('hash', reconciler.get_timings()[CONFIG_FILE]['method'])
+
+    def test_runs_check_when_content_changed(self):
+        # Given
+        reconciler = ConfigReconciler(STATE_FILE)
+        reconciler.need_setup(CONFIG_FILE, 'interface=wlan0\n', MagicMock(return_value=False))
+        with open(CONFIG_FILE, 'w') as file:
+            file.write('interface=wlan1\n')
+        check = MagicMock(return_value=True)
+
+        # When
+        result = reconciler.need_setup(CONFIG_FILE, 'interface=wlan0\n', check)
+
+        # Then
+        self.assertTrue(result)
+        check.assert_called_once()
+
+    def test_runs_check_when_expected_config_changed(self):
+        # Given
+        reconciler = ConfigReconciler(STATE_FILE)
+        reconciler.need_setup(CONFIG_FILE, 'interface=wlan0\n', MagicMock(return_value=False))
+        check = MagicMock(return_value=True)
+
+        # When
+        result = reconciler.need_setup(CONFIG_FILE, 'interface=wlan1\n', check)
+
+        # Then
+        self.assertTrue(result)
+        check.assert_called_once()
+
+    def test_runs_check_when_file_missing(self):
+        # Given
+        reconciler = ConfigReconciler(STATE_FILE)
+        reconciler.need_setup(CONFIG_FILE, 'interface=wlan0\n', MagicMock(return_value=False))
+        os.remove(CONFIG_FILE)
+        check = MagicMock(return_value=True)
+
+        # When
+        result = reconciler.need_setup(CONFIG_FILE, 'interface=wlan0\n', check)
+
+        # Then
+        self.assertTrue(result)
+        check.assert_called_once()
+        self.assertEqual('missing', reconciler.get_timings()[CONFIG_FILE]['method'])
+
+    def test_does_not_record_file_needing_setup(self):
+        # Given
+        reconciler = ConfigReconciler(STATE_FILE)
+        reconciler.need_setup(CONFIG_FILE, 'interface=wlan0\n', MagicMock(return_value=True))
+        check = MagicMock(return_value=True)
+
+        # When
+        result = reconciler.need_setup(CONFIG_FILE, 'interface=wlan0\n', check)
+
+        # Then
+        self.assertTrue(result)
+        check.assert_called_once()
+
+    def test_starts_with_empty_state_when_state_file_corrupted(self):
+        # Given
+        os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+        with open(STATE_FILE, 'w') as file:
+            file.write('{invalid')
+        reconciler = ConfigReconciler(STATE_FILE)
+        check = MagicMock(return_value=False)
+
+        # When
+        reconciler.need_setup(CONFIG_FILE, 'interface=wlan0\n', check)
+
+        # Then
+        check.assert_called_once()
+
+    def test_saves_state_with_file_writer(self):
+        # Given
+        file_writer = MagicMock(spec=AtomicFileWriter)
+        reconciler = ConfigReconciler(STATE_FILE, file_writer)
+
+        # When
+        reconciler.need_setup(CONFIG_FILE, 'interface=wlan0\n', MagicMock(return_value=False))
+
+        # Then
+        file_writer.write.assert_called_once()
+        state_file, content = file_writer.write.call_args.args
+        self.assertEqual(STATE_FILE, state_file)
+        self.assertIn(CONFIG_FILE, json.loads(content)['files'])
+
+    def test_leaves_no_temporary_file_after_saving_state(self):
+        # Given
+        reconciler = ConfigReconciler(STATE_FILE)
+
+        # When
+        reconciler.need_setup(CONFIG_FILE, 'interface=wlan0\n', MagicMock(return_value=False))
+
+        # Then
+        self.assertEqual(['config-state.json'], os.listdir(os.path.dirname(STATE_FILE)))
+
+
+if __name__ == '__main__':
+    unittest.main()
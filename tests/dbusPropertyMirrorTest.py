@@ -0,0 +1,68 @@
+import unittest
+from unittest import TestCase
+
+from context_logger import setup_logging
+
+from wifi_dbus import DbusPropertyMirror
+
+
+class DbusPropertyMirrorTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+
+    def test_seed_stores_mirrored_properties_only(self):
+        # Given
+        property_mirror = DbusPropertyMirror('test', {'State', 'CurrentNetwork'})
+
+        # When
+        property_mirror.seed({'State': 'completed', 'CurrentNetwork': '/network/0', 'Ifname': 'wlan0'})
+
+        # Then
+        self.assertTrue(property_mirror.is_seeded())
+        self.assertEqual('completed', property_mirror.get('State'))
+        self.assertEqual('/network/0', property_mirror.get('CurrentNetwork'))
+        self.assertFalse(property_mirror.contains('Ifname'))
+
+    def test_update_changes_seeded_properties(self):
+        # Given
+        property_mirror = DbusPropertyMirror('test', {'State', 'CurrentNetwork'})
+        property_mirror.seed({'State': 'completed', 'CurrentNetwork': '/network/0'})
+
+        # When
+        property_mirror.update({'State': 'disconnected', 'CurrentNetwork': '/'})
+
+        # Then
+        self.assertEqual('disconnected', property_mirror.get('State'))
+        self.assertEqual('/', property_mirror.get('CurrentNetwork'))
+
+    def test_update_ignored_when_not_seeded(self):
+        # Given
+        property_mirror = DbusPropertyMirror('test')
+
+        # When
+        property_mirror.update({'State': 'disconnected'})
+
+        # Then
+        self.assertFalse(property_mirror.is_seeded())
+        self.assertIsNone(property_mirror.get('State'))
+
+    def test_clear_removes_properties(self):
+        # Given
+        property_mirror = DbusPropertyMirror('test')
+        property_mirror.seed({'State': 'completed'})
+
+        # When
+        property_mirror.clear()
+
+        # Then
+        self.assertFalse(property_mirror.is_seeded())
+        self.assertFalse(property_mirror.contains('State'))
+
+
+if __name__ == '__main__':
+    unittest.main()
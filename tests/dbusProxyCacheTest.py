@@ -0,0 +1,99 @@
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from context_logger import setup_logging
+from dbus import SystemBus
+
+from wifi_dbus import DbusProxyCache
+
+BUS_NAME = 'fi.w1.wpa_supplicant1'
+INTERFACE_PATH = '/fi/w1/wpa_supplicant1/Interfaces/0'
+NETWORK_PATH = '/fi/w1/wpa_supplicant1/Interfaces/0/Networks/0'
+INTERFACE_NAME = 'fi.w1.wpa_supplicant1.Interface'
+PROPERTIES_NAME = 'org.freedesktop.DBus.Properties'
+
+
+class DbusProxyCacheTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+
+    def test_get_interface_returns_cached_proxy(self):
+        # Given
+        system_bus = MagicMock(spec=SystemBus)
+        proxy_cache = DbusProxyCache(system_bus)
+        proxy = proxy_cache.get_interface(BUS_NAME, INTERFACE_PATH, INTERFACE_NAME)
+
+        # When
+        result = proxy_cache.get_interface(BUS_NAME, INTERFACE_PATH, INTERFACE_NAME)
+
+        # Then
+        self.assertIs(proxy, result)
+        system_bus.get_object.assert_called_once_with(BUS_NAME, INTERFACE_PATH)
+
+    def test_get_interface_returns_separate_proxy_per_interface(self):
+        # Given
+        system_bus = MagicMock(spec=SystemBus)
+        proxy_cache = DbusProxyCache(system_bus)
+        proxy = proxy_cache.get_interface(BUS_NAME, INTERFACE_PATH, INTERFACE_NAME)
+
+        # When
+        result = proxy_cache.get_interface(BUS_NAME, INTERFACE_PATH, PROPERTIES_NAME)
+
+        # Then
+        self.assertIsNot(proxy, result)
+        self.assertEqual(2, proxy_cache.get_size())
+
+    def test_watches_name_owner_once_per_bus_name(self):
+        # Given
+        system_bus = MagicMock(spec=SystemBus)
+        proxy_cache = DbusProxyCache(system_bus)
+
+        # When
+        proxy_cache.get_interface(BUS_NAME, INTERFACE_PATH, INTERFACE_NAME)
+        proxy_cache.get_interface(BUS_NAME, NETWORK_PATH, PROPERTIES_NAME)
+
+        # Then
+        system_bus.add_signal_receiver.assert_called_once_with(proxy_cache._on_name_owner_changed,
+                                                               signal_name='NameOwnerChanged',
+                                                               dbus_interface='org.freedesktop.DBus',
+                                                               bus_name='org.freedesktop.DBus',
+                                                               arg0=BUS_NAME)
+
+    def test_invalidate_removes_proxies_under_object_path(self):
+        # Given
+        system_bus = MagicMock(spec=SystemBus)
+        proxy_cache = DbusProxyCache(system_bus)
+        proxy_cache.get_interface(BUS_NAME, '/fi/w1/wpa_supplicant1', PROPERTIES_NAME)
+        proxy_cache.get_interface(BUS_NAME, INTERFACE_PATH, INTERFACE_NAME)
+        proxy_cache.get_interface(BUS_NAME, NETWORK_PATH, PROPERTIES_NAME)
+
+        # When
+        proxy_cache.invalidate(BUS_NAME, INTERFACE_PATH)
+
+        # Then
+        self.assertEqual(1, proxy_cache.get_size())
+
+    def test_name_owner_change_invalidates_proxies_and_calls_handlers(self):
+        # Given
+        system_bus = MagicMock(spec=SystemBus)
+        proxy_cache = DbusProxyCache(system_bus)
+        handler = MagicMock()
+        proxy_cache.add_invalidation_handler(BUS_NAME, handler)
+        proxy_cache.get_interface(BUS_NAME, INTERFACE_PATH, INTERFACE_NAME)
+
+        # When
+        proxy_cache._on_name_owner_changed(BUS_NAME, ':1.10', ':1.20')
+
+        # Then
+        self.assertEqual(0, proxy_cache.get_size())
+        handler.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
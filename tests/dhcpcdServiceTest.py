@@ -41,6 +41,22 @@ class DhcpcdServiceTest(TestCase):
         self.assertTrue(compare_files(self.EXPECTED_DHCPCD_CONFIG_FILE, self.DHCPCD_CONFIG_FILE))
         dependencies.systemd.restart_service.assert_called_once_with('dhcpcd')
 
+    def test_setup_denies_excluded_interfaces(self):
+        # Given
+        dependencies, system_bus = create_components()
+        dhcpcd_service = DhcpcdService(dependencies, system_bus, 'wlan0', self.DHCPCD_CONFIG_FILE, ['uap0'])
+
+        # When
+        dhcpcd_service._config_reloaded.set()
+        dhcpcd_service.setup()
+
+        # Then
+        with open(self.DHCPCD_CONFIG_FILE, 'r') as file:
+            content = file.read()
+        self.assertTrue(content.startswith('denyinterfaces uap0\n'))
+        self.assertIn('\ninterface wlan0\nnohook wpa_supplicant', content)
+        self.assertFalse(dhcpcd_service._need_config_setup())
+
     def test_setup_raises_service_error_when_failed_to_update_config_file(self):
         # Given
         dependencies, system_bus = create_components()
@@ -0,0 +1,75 @@
+import unittest
+from unittest import TestCase, mock
+from unittest.mock import MagicMock
+
+from context_logger import setup_logging
+from gi.repository import Gio
+
+from wifi_utility import FileMonitor
+
+CONFIG_FILE = '/etc/wpa_supplicant/wpa_supplicant.conf'
+
+
+class FileMonitorTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+
+    def test_dispatches_change_to_handlers(self):
+        # Given
+        file_monitor = FileMonitor(CONFIG_FILE)
+        handler = MagicMock()
+        file_monitor.add_handler(handler)
+
+        # When
+        file_monitor._on_changed(MagicMock(), Gio.File.new_for_path(CONFIG_FILE), None,
+                                 Gio.FileMonitorEvent.CHANGES_DONE_HINT)
+
+        # Then
+        handler.assert_called_once_with(CONFIG_FILE)
+
+    def test_dispatches_both_names_when_renamed(self):
+        # Given
+        file_monitor = FileMonitor('/etc/NetworkManager/system-connections', directory=True)
+        handler = MagicMock()
+        file_monitor.add_handler(handler)
+        temp_file = '/etc/NetworkManager/system-connections/network.nmconnection.ABC123'
+        network_file = '/etc/NetworkManager/system-connections/network.nmconnection'
+
+        # When
+        file_monitor._on_changed(MagicMock(), Gio.File.new_for_path(temp_file), Gio.File.new_for_path(network_file),
+                                 Gio.FileMonitorEvent.RENAMED)
+
+        # Then
+        handler.assert_has_calls([mock.call(temp_file), mock.call(network_file)])
+
+    def test_ignores_intermediate_events(self):
+        # Given
+        file_monitor = FileMonitor(CONFIG_FILE)
+        handler = MagicMock()
+        file_monitor.add_handler(handler)
+
+        # When
+        file_monitor._on_changed(MagicMock(), Gio.File.new_for_path(CONFIG_FILE), None,
+                                 Gio.FileMonitorEvent.CHANGED)
+
+        # Then
+        handler.assert_not_called()
+
+    def test_is_not_active_before_started(self):
+        # Given
+        file_monitor = FileMonitor(CONFIG_FILE)
+
+        # When
+        result = file_monitor.is_active()
+
+        # Then
+        self.assertFalse(result)
+
+
+if __name__ == '__main__':
+    unittest.main()
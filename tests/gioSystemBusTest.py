@@ -0,0 +1,162 @@
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock, ANY
+
+import dbus
+from context_logger import setup_logging
+from gi.repository import Gio, GLib
+
+from wifi_dbus import GioSystemBus
+
+BUS_NAME = 'fi.w1.wpa_supplicant1'
+OBJECT_PATH = '/fi/w1/wpa_supplicant1/Interfaces/0'
+INTERFACE_NAME = 'fi.w1.wpa_supplicant1.Interface'
+
+
+class GioSystemBusTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+
+    def test_property_get_returns_unpacked_value(self):
+        # Given
+        connection = MagicMock(spec=Gio.DBusConnection)
+        connection.call_sync.return_value = GLib.Variant('(v)', (GLib.Variant('s', 'completed'),))
+        system_bus = GioSystemBus(connection)
+        properties = dbus.Interface(system_bus.get_object(BUS_NAME, OBJECT_PATH), dbus.PROPERTIES_IFACE)
+
+        # When
+        result = properties.Get(INTERFACE_NAME, 'State')
+
+        # Then
+        self.assertEqual('completed', result)
+        connection.call_sync.assert_called_once_with(BUS_NAME, OBJECT_PATH, dbus.PROPERTIES_IFACE, 'Get',
+                                                     GLib.Variant('(ss)', (INTERFACE_NAME, 'State')), None,
+                                                     Gio.DBusCallFlags.NONE, 25000, None)
+
+    def test_method_call_converts_dbus_dictionary_to_variant_dictionary(self):
+        # Given
+        connection = MagicMock(spec=Gio.DBusConnection)
+        connection.call_sync.return_value = GLib.Variant('(o)', (f'{OBJECT_PATH}/Networks/0',))
+        system_bus = GioSystemBus(connection)
+        interface = dbus.Interface(system_bus.get_object(BUS_NAME, OBJECT_PATH), INTERFACE_NAME)
+
+        # When
+        result = interface.AddNetwork(dbus.Dictionary({'ssid': 'test-network', 'priority': '1'}, 'sv'),
+                                      signature='a{sv}')
+
+        # Then
+        self.assertEqual(f'{OBJECT_PATH}/Networks/0', result)
+        parameters = connection.call_sync.call_args.args[4]
+        self.assertEqual('(a{sv})', parameters.get_type_string())
+        self.assertEqual(({'ssid': 'test-network', 'priority': '1'},), parameters.unpack())
+
+    def test_method_call_raises_dbus_exception_on_error(self):
+        # Given
+        connection = MagicMock(spec=Gio.DBusConnection)
+        connection.call_sync.side_effect = GLib.Error('Unknown interface')
+        system_bus = GioSystemBus(connection)
+        interface = dbus.Interface(system_bus.get_object(BUS_NAME, '/fi/w1/wpa_supplicant1'), BUS_NAME)
+
+        # When, Then
+        self.assertRaises(dbus.DBusException, interface.GetInterface, 'wlan0', signature='s')
+
+    def test_async_method_call_passes_handlers(self):
+        # Given
+        connection = MagicMock(spec=Gio.DBusConnection)
+        system_bus = GioSystemBus(connection)
+        interface = dbus.Interface(system_bus.get_object(BUS_NAME, OBJECT_PATH), INTERFACE_NAME)
+        reply_handler, error_handler = MagicMock(), MagicMock()
+
+        # When
+        interface.Scan({'Type': 'passive'}, signature='a{sv}', reply_handler=reply_handler,
+                       error_handler=error_handler, timeout=1)
+
+        # Then
+        connection.call.assert_called_once_with(BUS_NAME, OBJECT_PATH, INTERFACE_NAME, 'Scan', ANY, None,
+                                                Gio.DBusCallFlags.NONE, 1000, None, system_bus._on_call_finished,
+                                                (reply_handler, error_handler))
+
+    def test_identical_signal_receivers_share_subscription(self):
+        # Given
+        connection = MagicMock(spec=Gio.DBusConnection)
+        connection.signal_subscribe.return_value = 1
+        system_bus = GioSystemBus(connection)
+
+        # When
+        first = system_bus.add_signal_receiver(MagicMock(), signal_name='PropertiesChanged',
+                                               dbus_interface=INTERFACE_NAME, path=OBJECT_PATH)
+        second = system_bus.add_signal_receiver(MagicMock(), signal_name='PropertiesChanged',
+                                                dbus_interface=INTERFACE_NAME, path=OBJECT_PATH)
+
+        # Then
+        connection.signal_subscribe.assert_called_once()
+        self.assertEqual(1, system_bus.get_match_rule_count())
+
+        first.remove()
+        connection.signal_unsubscribe.assert_not_called()
+        second.remove()
+        connection.signal_unsubscribe.assert_called_once_with(1)
+
+    def test_signal_dispatched_to_receivers_with_path_keyword(self):
+        # Given
+        connection = MagicMock(spec=Gio.DBusConnection)
+        system_bus = GioSystemBus(connection)
+        handler = MagicMock()
+        match = system_bus.add_signal_receiver(handler, signal_name='PropertiesChanged',
+                                               dbus_interface=dbus.PROPERTIES_IFACE, path_keyword='path')
+
+        # When
+        system_bus._on_signal(connection, ':1.1', OBJECT_PATH, dbus.PROPERTIES_IFACE, 'PropertiesChanged',
+                              GLib.Variant('(sa{sv}as)', ('unit', {'ActiveState': GLib.Variant('s', 'active')}, [])),
+                              match.rule)
+
+        # Then
+        handler.assert_called_once_with('unit', {'ActiveState': 'active'}, [], path=OBJECT_PATH)
+
+    def test_unsupported_signal_receiver_keyword_raises(self):
+        # Given
+        connection = MagicMock(spec=Gio.DBusConnection)
+        system_bus = GioSystemBus(connection)
+
+        # When, Then
+        self.assertRaises(TypeError, system_bus.add_signal_receiver, MagicMock(), signal_name='PropertiesChanged',
+                          sender_keyword='sender')
+        connection.signal_subscribe.assert_not_called()
+
+    def test_method_call_returns_byte_arrays_as_bytes(self):
+        # Given
+        connection = MagicMock(spec=Gio.DBusConnection)
+        connection.call_sync.return_value = GLib.Variant('(a{sv})', ({
+            'SSID': GLib.Variant('ay', b'test-network'),
+            'Signal': GLib.Variant('n', -52),
+            'Networks': GLib.Variant('ao', [f'{OBJECT_PATH}/Networks/0']),
+        },))
+        system_bus = GioSystemBus(connection)
+        properties = dbus.Interface(system_bus.get_object(BUS_NAME, OBJECT_PATH), dbus.PROPERTIES_IFACE)
+
+        # When
+        result = properties.GetAll(INTERFACE_NAME)
+
+        # Then
+        self.assertEqual({'SSID': b'test-network', 'Signal': -52, 'Networks': [f'{OBJECT_PATH}/Networks/0']}, result)
+        self.assertIsInstance(result['SSID'], bytes)
+
+    def test_guesses_signature_of_dbus_types(self):
+        # Given
+        system_bus = GioSystemBus(MagicMock(spec=Gio.DBusConnection))
+
+        # When
+        result = [system_bus._guess_signature(value) for value in (
+            dbus.ObjectPath(OBJECT_PATH), dbus.Boolean(True), dbus.UInt32(1), dbus.String('test'), True, 1)]
+
+        # Then
+        self.assertEqual(['o', 'b', 'u', 's', 'b', 'i'], result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,7 +10,7 @@ from test_utility import compare_files
 from tests import TEST_FILE_SYSTEM_ROOT, TEST_RESOURCE_ROOT, RESOURCE_ROOT
 from wifi_event import WifiEventType
 from wifi_service import HostapdService, HostapdConfig, ServiceDependencies, ServiceError, DhcpServerService
-from wifi_utility import IPlatformAccess, IJournal
+from wifi_utility import IPlatformAccess, IJournal, VirtualInterface
 
 
 class HostapdServiceTest(TestCase):
@@ -56,6 +56,23 @@ class HostapdServiceTest(TestCase):
         # Then
         self.assertTrue(compare_files(self.EXPECTED_HOSTAPD_CONFIG_FILE, self.HOSTAPD_CONFIG_FILE))
 
+    def test_setup_writes_precomputed_psk_to_config_file(self):
+        # Given
+        dependencies, _, dhcp_server = create_components()
+        config = HostapdConfig('wlan0', '11:22:33:44:55:66', 'IEEE', 'password', 'GB', 0, True)
+        hostapd_service = HostapdService(
+            dependencies, config, dhcp_server, RESOURCE_ROOT, config_file=self.HOSTAPD_CONFIG_FILE
+        )
+
+        # When
+        hostapd_service.setup()
+
+        # Then
+        with open(self.HOSTAPD_CONFIG_FILE, 'r') as file:
+            content = file.read()
+        self.assertIn('\nwpa_psk=f42c6fc52df0ebef9ebb4b90b38a5f902e83fe1b135a70e23aed762e9710a12e\n', content)
+        self.assertNotIn('wpa_passphrase', content)
+
     def test_setup_raises_service_error_when_failed_to_update_config_file(self):
         # Given
         dependencies, config, dhcp_server = create_components()
@@ -95,6 +112,83 @@ class HostapdServiceTest(TestCase):
         dependencies.platform.set_ip_address.assert_called_once_with('wlan0', '192.168.100.1')
         dhcp_server.restart.assert_called_once()
 
+    def test_creates_virtual_interface_on_parent_channel_before_start(self):
+        # Given
+        dependencies, config, dhcp_server = create_components()
+        config.interface = 'uap0'
+        virtual_interface = MagicMock(spec=VirtualInterface)
+        virtual_interface.get_parent_channel.return_value = 36
+        hostapd_service = HostapdService(
+            dependencies, config, dhcp_server, RESOURCE_ROOT, config_file=self.HOSTAPD_CONFIG_FILE,
+            virtual_interface=virtual_interface
+        )
+
+        # When
+        hostapd_service.start()
+
+        # Then
+        virtual_interface.create.assert_called_once()
+        dependencies.platform.set_ip_address.assert_called_once_with('uap0', '192.168.100.1')
+        with open(self.HOSTAPD_CONFIG_FILE, 'r') as file:
+            content = file.read()
+        self.assertIn('\nhw_mode=a\nchannel=36\n', content)
+
+    def test_switches_channel_when_following_client_channel(self):
+        # Given
+        dependencies, config, dhcp_server = create_components()
+        config.interface = 'uap0'
+        virtual_interface = MagicMock(spec=VirtualInterface)
+        virtual_interface.get_parent_channel.return_value = 11
+        hostapd_service = HostapdService(
+            dependencies, config, dhcp_server, RESOURCE_ROOT, config_file=self.HOSTAPD_CONFIG_FILE,
+            virtual_interface=virtual_interface
+        )
+        dependencies.systemd.is_active.return_value = True
+
+        # When
+        hostapd_service.follow_client_channel()
+
+        # Then
+        dependencies.platform.execute_command.assert_called_once_with('hostapd_cli -i uap0 chan_switch 5 2462')
+        dependencies.systemd.restart_service.assert_not_called()
+        with open(self.HOSTAPD_CONFIG_FILE, 'r') as file:
+            content = file.read()
+        self.assertIn('\nhw_mode=g\nchannel=11\n', content)
+
+    def test_restarts_when_channel_switch_failed(self):
+        # Given
+        dependencies, config, dhcp_server = create_components()
+        virtual_interface = MagicMock(spec=VirtualInterface)
+        virtual_interface.get_parent_channel.return_value = 1
+        dependencies.platform.execute_command.side_effect = Exception('FAIL')
+        hostapd_service = HostapdService(
+            dependencies, config, dhcp_server, RESOURCE_ROOT, config_file=self.HOSTAPD_CONFIG_FILE,
+            virtual_interface=virtual_interface
+        )
+        dependencies.systemd.is_active.return_value = True
+
+        # When
+        hostapd_service.follow_client_channel()
+
+        # Then
+        dependencies.systemd.restart_service.assert_called_once_with('hostapd')
+
+    def test_does_not_switch_channel_when_on_client_channel(self):
+        # Given
+        dependencies, config, dhcp_server = create_components()
+        virtual_interface = MagicMock(spec=VirtualInterface)
+        virtual_interface.get_parent_channel.return_value = 7
+        hostapd_service = HostapdService(
+            dependencies, config, dhcp_server, RESOURCE_ROOT, config_file=self.HOSTAPD_CONFIG_FILE,
+            virtual_interface=virtual_interface
+        )
+
+        # When
+        hostapd_service.follow_client_channel()
+
+        # Then
+        dependencies.platform.execute_command.assert_not_called()
+
     def test_returns_supported_events(self):
         # Given
         dependencies, config, dhcp_server = create_components()
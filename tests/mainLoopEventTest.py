@@ -0,0 +1,59 @@
+import unittest
+from threading import Thread, Timer
+from unittest import TestCase
+
+from context_logger import setup_logging
+from gi.repository import GLib
+
+from wifi_dbus import MainLoopEvent
+
+
+class MainLoopEventTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+
+    def test_wait_dispatches_main_loop_when_called_from_loop_thread(self):
+        # Given
+        event = MainLoopEvent()
+        GLib.idle_add(lambda: event.set())
+
+        # When
+        result = event.wait(1)
+
+        # Then
+        self.assertTrue(result)
+
+    def test_wait_returns_when_set_from_other_thread(self):
+        # Given
+        event = MainLoopEvent()
+        main_loop = GLib.MainLoop()
+        Thread(target=main_loop.run).start()
+        Timer(0.1, event.set).start()
+
+        try:
+            # When
+            result = event.wait(1)
+        finally:
+            main_loop.quit()
+
+        # Then
+        self.assertTrue(result)
+
+    def test_wait_returns_false_when_timed_out(self):
+        # Given
+        event = MainLoopEvent()
+
+        # When
+        result = event.wait(0.1)
+
+        # Then
+        self.assertFalse(result)
+
+
+if __name__ == '__main__':
+    unittest.main()
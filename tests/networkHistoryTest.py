@@ -0,0 +1,260 @@
+import json
+import unittest
+from unittest import TestCase, mock
+
+from common_utility import delete_directory, create_file
+from context_logger import setup_logging
+
+from tests import TEST_FILE_SYSTEM_ROOT
+from wifi_manager import NetworkHistory, NetworkStats, CONNECT_TIME_BUCKETS
+
+STATE_FILE = f'{TEST_FILE_SYSTEM_ROOT}/var/lib/wifi-manager/network-history.json'
+
+
+class NetworkHistoryTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+        delete_directory(TEST_FILE_SYSTEM_ROOT)
+
+    @mock.patch('wifi_manager.networkHistory.time')
+    def test_records_time_to_ip_when_ip_acquired(self, time):
+        # Given
+        time.monotonic.side_effect = [100.0, 104.5]
+        time.time.return_value = 1000.0
+        network_history = NetworkHistory(STATE_FILE)
+        network_history.start_attempt()
+        network_history.record_connected('network1')
+
+        # When
+        network_history.record_ip_acquired('network1')
+
+        # Then
+        stats = network_history.get_stats('network1')
+        self.assertEqual(1, stats.attempts)
+        self.assertEqual(1, stats.successes)
+        self.assertEqual(4.5, stats.total_time_to_ip)
+        self.assertEqual(1000.0, stats.last_connected)
+        self.assertEqual(1, stats.get_connect_time_count())
+        self.assertEqual(5.0, stats.get_connect_time_percentile(90))
+
+    @mock.patch('wifi_manager.networkHistory.time')
+    def test_records_uptime_when_disconnected_after_ip_acquired(self, time):
+        # Given
+        time.monotonic.side_effect = [100.0, 102.0, 162.0, 162.0, 162.0]
+        time.time.return_value = 1000.0
+        network_history = NetworkHistory(STATE_FILE)
+        network_history.record_connected('network1')
+        network_history.record_ip_acquired('network1')
+
+        # When
+        network_history.record_disconnected()
+
+        # Then
+        stats = network_history.get_stats('network1')
+        self.assertEqual(0, stats.failures)
+        self.assertEqual(60.0, stats.total_uptime)
+
+    def test_returns_connect_time_percentile(self):
+        # Given
+        stats = NetworkStats()
+        for duration in [3.2, 3.8, 4.1, 4.5, 5.0, 5.5, 7.0, 9.0, 11.0, 38.0]:
+            stats.add_connect_time(duration)
+
+        # When
+        result = stats.get_connect_time_percentile(90)
+
+        # Then
+        self.assertEqual(12.0, result)
+        self.assertEqual(40.0, stats.get_connect_time_percentile(100))
+        self.assertEqual(5.0, stats.get_connect_time_percentile(50))
+
+    def test_returns_highest_connect_time_percentile_when_all_networks_have_enough_samples(self):
+        # Given
+        network_history = NetworkHistory(STATE_FILE)
+        network_history._networks = {
+            'network1': NetworkStats(connect_times=[0, 0, 0, 3] + [0] * 15),
+            'network2': NetworkStats(connect_times=[0] * 13 + [3] + [0] * 5),
+            'network3': NetworkStats(connect_times=[0] * 18 + [1])
+        }
+
+        # When
+        result = network_history.get_connect_time_percentile(['network1', 'network2'], 95, 3)
+
+        # Then
+        self.assertEqual(40.0, result)
+        self.assertEqual(4.0, network_history.get_connect_time_percentile(['network1'], 95, 3))
+        self.assertIsNone(network_history.get_connect_time_percentile(['network1', 'network3'], 95, 3))
+        self.assertIsNone(network_history.get_connect_time_percentile(['network1', 'network4'], 95, 3))
+        self.assertIsNone(network_history.get_connect_time_percentile([], 95, 3))
+
+    def test_records_failure_when_disconnected_before_ip_acquired(self):
+        # Given
+        network_history = NetworkHistory(STATE_FILE)
+        network_history.record_connected('network1')
+
+        # When
+        network_history.record_disconnected()
+
+        # Then
+        stats = network_history.get_stats('network1')
+        self.assertEqual(1, stats.attempts)
+        self.assertEqual(0, stats.successes)
+        self.assertEqual(1, stats.failures)
+
+    def test_records_failure_when_attempt_timed_out(self):
+        # Given
+        network_history = NetworkHistory(STATE_FILE)
+        network_history.record_connected('network1')
+
+        # When
+        network_history.record_timeout()
+
+        # Then
+        self.assertEqual(1, network_history.get_stats('network1').failures)
+
+    def test_does_not_record_failure_when_timed_out_after_ip_acquired(self):
+        # Given
+        network_history = NetworkHistory(STATE_FILE)
+        network_history.record_connected('network1')
+        network_history.record_ip_acquired('network1')
+
+        # When
+        network_history.record_timeout()
+
+        # Then
+        self.assertEqual(0, network_history.get_stats('network1').failures)
+
+    @mock.patch('wifi_manager.networkHistory.time')
+    def test_records_censored_connect_time_of_attempted_network_when_timed_out(self, time):
+        # Given
+        time.monotonic.side_effect = [100.0, 115.0]
+        network_history = NetworkHistory(STATE_FILE)
+        network_history.start_attempt()
+        network_history.record_connected('network1')
+
+        # When
+        network_history.record_timeout()
+
+        # Then
+        stats = network_history.get_stats('network1')
+        self.assertEqual([0] * 19, stats.connect_times)
+        self.assertEqual(1, stats.censored_times[CONNECT_TIME_BUCKETS.index(20)])
+        self.assertEqual(20.0, stats.get_connect_time_percentile(95))
+
+    def test_does_not_record_censored_connect_time_when_no_network_attempted(self):
+        # Given
+        network_history = NetworkHistory(STATE_FILE)
+        network_history._networks = {'network1': NetworkStats(connect_times=[0, 0, 0, 3] + [0] * 15)}
+        network_history.start_attempt()
+
+        # When
+        network_history.record_timeout()
+
+        # Then
+        self.assertEqual(3, network_history.get_stats('network1').get_connect_time_count())
+
+    @mock.patch('wifi_manager.networkHistory.time')
+    def test_repeated_timeouts_on_one_network_do_not_inflate_connect_time_of_others(self, time):
+        # Given
+        time.monotonic.side_effect = [100.0, 130.0] * 10
+        network_history = NetworkHistory(STATE_FILE)
+        network_history._networks = {
+            'network1': NetworkStats(connect_times=[0, 0, 0, 3] + [0] * 15),
+            'network2': NetworkStats(connect_times=[0, 0, 0, 3] + [0] * 15)
+        }
+
+        # When
+        for _ in range(10):
+            network_history.start_attempt()
+            network_history.record_connected('network1')
+            network_history.record_timeout()
+
+        # Then
+        self.assertEqual(4.0, network_history.get_connect_time_percentile(['network2'], 95, 3))
+        self.assertEqual(3, network_history.get_stats('network2').get_connect_time_count())
+        self.assertEqual(0, network_history.get_stats('network2').failures)
+        self.assertEqual(10, network_history.get_stats('network1').failures)
+        self.assertEqual(40.0, network_history.get_connect_time_percentile(['network1'], 95, 3))
+
+    def test_censored_connect_times_only_raise_percentile_they_reach(self):
+        # Given
+        stats = NetworkStats()
+        for duration in [3.2, 3.8, 4.1, 4.5, 5.0, 5.5, 7.0, 9.0, 11.0]:
+            stats.add_connect_time(duration)
+
+        # When
+        stats.add_censored_time(30)
+
+        # Then
+        self.assertEqual(10, stats.get_connect_time_count())
+        self.assertEqual(5.0, stats.get_connect_time_percentile(50))
+        self.assertEqual(40.0, stats.get_connect_time_percentile(95))
+
+    def test_records_signal_of_known_network(self):
+        # Given
+        network_history = NetworkHistory(STATE_FILE)
+        network_history.record_connected('network1')
+
+        # When
+        network_history.record_signal('network1', -55)
+
+        # Then
+        self.assertEqual(-55, network_history.get_stats('network1').last_rssi)
+        self.assertEqual(1, network_history.get_stats('network1').attempts)
+
+    def test_records_signal_of_untried_network(self):
+        # Given
+        network_history = NetworkHistory(STATE_FILE)
+
+        # When
+        network_history.record_signal('network2', -40)
+
+        # Then
+        self.assertEqual(-40, network_history.get_stats('network2').last_rssi)
+        self.assertEqual(0, network_history.get_stats('network2').attempts)
+
+    def test_persists_and_loads_history(self):
+        # Given
+        network_history = NetworkHistory(STATE_FILE)
+        network_history.record_connected('network1')
+        network_history.record_ip_acquired('network1')
+
+        # When
+        result = NetworkHistory(STATE_FILE)
+
+        # Then
+        self.assertEqual(network_history.get_stats('network1'), result.get_stats('network1'))
+        with open(STATE_FILE, 'r') as file:
+            self.assertEqual(['network1'], list(json.load(file)['networks'].keys()))
+
+    def test_starts_with_empty_history_when_state_file_invalid(self):
+        # Given
+        create_file(STATE_FILE, 'invalid')
+
+        # When
+        network_history = NetworkHistory(STATE_FILE)
+
+        # Then
+        self.assertEqual({}, network_history.get_all_stats())
+
+    def test_removes_network_history(self):
+        # Given
+        network_history = NetworkHistory(STATE_FILE)
+        network_history.record_connected('network1')
+        network_history.record_ip_acquired('network1')
+
+        # When
+        network_history.remove('network1')
+
+        # Then
+        self.assertIsNone(network_history.get_stats('network1'))
+        self.assertIsNone(NetworkHistory(STATE_FILE).get_stats('network1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
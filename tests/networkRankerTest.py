@@ -0,0 +1,173 @@
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from common_utility import IReusableTimer
+from context_logger import setup_logging
+
+from wifi_config import WifiNetwork
+from wifi_manager import NetworkRanker, NetworkHistory, NetworkStats, IWifiControl
+
+
+class NetworkRankerTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+
+    def test_starts_timer_with_interval(self):
+        # Given
+        wifi_control, network_history, timer = create_mocks()
+        network_ranker = NetworkRanker(wifi_control, network_history, timer, 3600)
+
+        # When
+        network_ranker.start()
+
+        # Then
+        timer.start.assert_called_once_with(3600, network_ranker._on_rank_timeout)
+
+    def test_does_not_start_timer_when_disabled(self):
+        # Given
+        wifi_control, network_history, timer = create_mocks()
+        network_ranker = NetworkRanker(wifi_control, network_history, timer, 0)
+
+        # When
+        network_ranker.start()
+
+        # Then
+        timer.start.assert_not_called()
+
+    def test_ranks_reliable_network_first(self):
+        # Given
+        wifi_control, network_history, timer = create_mocks()
+        wifi_control.get_networks.return_value = [
+            WifiNetwork('"network1"', '"password1"', True, 0),
+            WifiNetwork('"network2"', '"password2"', True, 1)
+        ]
+        network_history.get_all_stats.return_value = {
+            'network1': NetworkStats(10, 10, 0, 30.0, 36000.0, -50),
+            'network2': NetworkStats(10, 2, 8, 200.0, 600.0, -80)
+        }
+        network_ranker = NetworkRanker(wifi_control, network_history, timer, 3600)
+
+        # When
+        result = network_ranker.rank()
+
+        # Then
+        self.assertEqual({'network1': 1, 'network2': 0}, result)
+        wifi_control.set_network_priorities.assert_called_once_with({'network1': 1, 'network2': 0})
+
+    def test_ranks_fast_network_before_slow_network(self):
+        # Given
+        wifi_control, network_history, timer = create_mocks()
+        wifi_control.get_networks.return_value = [
+            WifiNetwork('network1', 'password1', True, 5),
+            WifiNetwork('network2', 'password2', True, 3)
+        ]
+        network_history.get_all_stats.return_value = {
+            'network1': NetworkStats(5, 5, 0, 250.0, 0.0),
+            'network2': NetworkStats(5, 5, 0, 10.0, 0.0)
+        }
+        network_ranker = NetworkRanker(wifi_control, network_history, timer, 3600)
+
+        # When
+        result = network_ranker.rank()
+
+        # Then
+        self.assertEqual({'network1': 3, 'network2': 5}, result)
+
+    def test_assigns_distinct_priorities_when_priorities_equal(self):
+        # Given
+        wifi_control, network_history, timer = create_mocks()
+        wifi_control.get_networks.return_value = [
+            WifiNetwork('network1', 'password1', True, 0),
+            WifiNetwork('network2', 'password2', True, 0),
+            WifiNetwork('network3', 'password3', True, 0)
+        ]
+        network_history.get_all_stats.return_value = {
+            'network2': NetworkStats(4, 4, 0, 8.0, 7200.0, -40)
+        }
+        network_ranker = NetworkRanker(wifi_control, network_history, timer, 3600)
+
+        # When
+        result = network_ranker.rank()
+
+        # Then
+        self.assertEqual({'network1': 1, 'network2': 2}, result)
+
+    def test_does_not_update_priorities_when_order_unchanged(self):
+        # Given
+        wifi_control, network_history, timer = create_mocks()
+        wifi_control.get_networks.return_value = [
+            WifiNetwork('network1', 'password1', True, 1),
+            WifiNetwork('network2', 'password2', True, 0)
+        ]
+        network_history.get_all_stats.return_value = {
+            'network1': NetworkStats(3, 3, 0, 6.0, 600.0)
+        }
+        network_ranker = NetworkRanker(wifi_control, network_history, timer, 3600)
+
+        # When
+        result = network_ranker.rank()
+
+        # Then
+        self.assertEqual({}, result)
+        wifi_control.set_network_priorities.assert_not_called()
+
+    def test_does_not_update_priorities_without_history(self):
+        # Given
+        wifi_control, network_history, timer = create_mocks()
+        wifi_control.get_networks.return_value = [
+            WifiNetwork('network1', 'password1', True, 0),
+            WifiNetwork('network2', 'password2', True, 0)
+        ]
+        network_history.get_all_stats.return_value = {}
+        network_ranker = NetworkRanker(wifi_control, network_history, timer, 3600)
+
+        # When
+        result = network_ranker.rank()
+
+        # Then
+        self.assertEqual({}, result)
+        wifi_control.set_network_priorities.assert_not_called()
+
+    def test_records_signal_of_stored_networks_from_scan_result(self):
+        # Given
+        wifi_control, network_history, timer = create_mocks()
+        wifi_control.get_networks.return_value = [
+            WifiNetwork('"network1"', 'password', True, 1),
+            WifiNetwork('network2', 'password', True, 0)
+        ]
+        network_ranker = NetworkRanker(wifi_control, network_history, timer, 3600)
+
+        # When
+        network_ranker.record_scan({'network1': -62, 'neighbour': -40})
+
+        # Then
+        network_history.record_signal.assert_called_once_with('network1', -62)
+
+    def test_restarts_timer_when_ranking_failed(self):
+        # Given
+        wifi_control, network_history, timer = create_mocks()
+        wifi_control.get_networks.side_effect = Exception('error')
+        network_ranker = NetworkRanker(wifi_control, network_history, timer, 3600)
+
+        # When
+        network_ranker._on_rank_timeout()
+
+        # Then
+        timer.restart.assert_called_once()
+
+
+def create_mocks():
+    wifi_control = MagicMock(spec=IWifiControl)
+    network_history = MagicMock(spec=NetworkHistory)
+    timer = MagicMock(spec=IReusableTimer)
+    return wifi_control, network_history, timer
+
+
+if __name__ == '__main__':
+    unittest.main()
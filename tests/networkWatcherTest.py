@@ -0,0 +1,113 @@
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from common_utility import IReusableTimer
+from context_logger import setup_logging
+
+from wifi_manager import NetworkWatcher, IWifiControl
+
+
+class NetworkWatcherTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+
+    def test_starts_timer_with_interval(self):
+        # Given
+        wifi_control, timer = create_mocks()
+        network_watcher = NetworkWatcher(wifi_control, timer, 30)
+
+        # When
+        network_watcher.start(MagicMock())
+
+        # Then
+        timer.start.assert_called_once_with(30, network_watcher._on_watch_timeout)
+
+    def test_does_not_start_timer_when_disabled(self):
+        # Given
+        wifi_control, timer = create_mocks()
+        network_watcher = NetworkWatcher(wifi_control, timer, 0)
+
+        # When
+        network_watcher.start(MagicMock())
+
+        # Then
+        timer.start.assert_not_called()
+
+    def test_notifies_when_stored_network_visible(self):
+        # Given
+        wifi_control, timer = create_mocks()
+        wifi_control.get_visible_client_networks.return_value = ['network1']
+        network_watcher = NetworkWatcher(wifi_control, timer, 30)
+        on_visible = MagicMock()
+        network_watcher.start(on_visible)
+
+        # When
+        network_watcher._on_watch_timeout()
+
+        # Then
+        on_visible.assert_called_once()
+        timer.restart.assert_not_called()
+        wifi_control.get_visible_client_networks.assert_called_once_with(max_age=15)
+
+    def test_keeps_watching_when_no_stored_network_visible(self):
+        # Given
+        wifi_control, timer = create_mocks()
+        wifi_control.get_visible_client_networks.return_value = []
+        network_watcher = NetworkWatcher(wifi_control, timer, 30)
+        on_visible = MagicMock()
+        network_watcher.start(on_visible)
+
+        # When
+        network_watcher._on_watch_timeout()
+
+        # Then
+        on_visible.assert_not_called()
+        timer.restart.assert_called_once()
+
+    def test_keeps_watching_when_scan_failed(self):
+        # Given
+        wifi_control, timer = create_mocks()
+        wifi_control.get_visible_client_networks.return_value = None
+        network_watcher = NetworkWatcher(wifi_control, timer, 30)
+        on_visible = MagicMock()
+        network_watcher.start(on_visible)
+
+        # When
+        network_watcher._on_watch_timeout()
+
+        # Then
+        on_visible.assert_not_called()
+        timer.restart.assert_called_once()
+
+    def test_does_not_notify_when_stopped(self):
+        # Given
+        wifi_control, timer = create_mocks()
+        wifi_control.get_visible_client_networks.return_value = ['network1']
+        network_watcher = NetworkWatcher(wifi_control, timer, 30)
+        on_visible = MagicMock()
+        network_watcher.start(on_visible)
+        network_watcher.stop()
+
+        # When
+        network_watcher._on_watch_timeout()
+
+        # Then
+        on_visible.assert_not_called()
+        timer.cancel.assert_called_once()
+        timer.restart.assert_not_called()
+
+
+def create_mocks():
+    wifi_control = MagicMock(spec=IWifiControl)
+    timer = MagicMock(spec=IReusableTimer)
+    return wifi_control, timer
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from common_utility import delete_directory, copy_file, create_directory
+from context_logger import setup_logging
+from gi.repository import GLib, NM
+from gi.repository.NM import Client, RemoteConnection
+
+from tests import TEST_FILE_SYSTEM_ROOT, TEST_RESOURCE_ROOT
+from wifi_config import NetworkManagerClientConfig, WifiNetwork
+
+
+class NetworkManagerClientConfigTest(TestCase):
+    NM_CONFIG_FILE = f'{TEST_FILE_SYSTEM_ROOT}/etc/NetworkManager/NetworkManager.conf'
+    NM_NETWORK_DIR = f'{TEST_FILE_SYSTEM_ROOT}/etc/NetworkManager/system-connections'
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+        delete_directory(TEST_FILE_SYSTEM_ROOT)
+        create_directory(self.NM_NETWORK_DIR)
+        copy_file(f'{TEST_RESOURCE_ROOT}/config/test-network1.nmconnection', self.NM_NETWORK_DIR)
+
+    def test_get_networks_returns_wifi_profiles_on_interface(self):
+        # Given
+        client = create_client([
+            create_connection('/connection/1', 'network1', 'password1', priority=1),
+            create_connection('/connection/2', 'network2', 'password2', interface='wlan1'),
+            create_connection('/connection/3', 'network3', 'password3', interface=None),
+            create_connection('/connection/4', 'eth0', '', connection_type='802-3-ethernet'),
+        ])
+        nm_config = NetworkManagerClientConfig('wlan0', client, self.NM_CONFIG_FILE, self.NM_NETWORK_DIR)
+
+        # When
+        result = nm_config.get_networks()
+
+        # Then
+        self.assertEqual([
+            WifiNetwork('network1', 'password1', True, 1),
+            WifiNetwork('network3', 'password3', True, 0)
+        ], result)
+        self.assertEqual(2, nm_config.get_network_count())
+        self.assertEqual(WifiNetwork('network3', 'password3', True, 0), nm_config.get_network('network3'))
+
+    def test_get_networks_reads_connection_list_once(self):
+        # Given
+        client = create_client([create_connection('/connection/1', 'network1', 'password1')])
+        nm_config = NetworkManagerClientConfig('wlan0', client, self.NM_CONFIG_FILE, self.NM_NETWORK_DIR)
+
+        # When
+        nm_config.get_networks()
+        nm_config.get_network('network1')
+        nm_config.get_network_count()
+
+        # Then
+        client.get_connections.assert_called_once()
+
+    def test_connection_added_updates_index(self):
+        # Given
+        client = create_client([])
+        nm_config = NetworkManagerClientConfig('wlan0', client, self.NM_CONFIG_FILE, self.NM_NETWORK_DIR)
+        nm_config.get_networks()
+
+        # When
+        nm_config._on_connection_added(client, create_connection('/connection/1', 'network1', 'password1'))
+
+        # Then
+        self.assertEqual(WifiNetwork('network1', 'password1', True, 0), nm_config.get_network('network1'))
+
+    def test_connection_removed_updates_index(self):
+        # Given
+        connection = create_connection('/connection/1', 'network1', 'password1')
+        client = create_client([connection])
+        nm_config = NetworkManagerClientConfig('wlan0', client, self.NM_CONFIG_FILE, self.NM_NETWORK_DIR)
+        nm_config.get_networks()
+
+        # When
+        nm_config._on_connection_removed(client, connection)
+
+        # Then
+        self.assertIsNone(nm_config.get_network('network1'))
+        connection.disconnect.assert_called_once()
+
+    def test_connection_changed_updates_index(self):
+        # Given
+        connection = create_connection('/connection/1', 'network1', 'password1')
+        client = create_client([connection])
+        nm_config = NetworkManagerClientConfig('wlan0', client, self.NM_CONFIG_FILE, self.NM_NETWORK_DIR)
+        nm_config.get_networks()
+        connection.get_setting_connection().set_property(NM.SETTING_CONNECTION_AUTOCONNECT_PRIORITY, 5)
+
+        # When
+        nm_config._on_connection_changed(connection)
+
+        # Then
+        self.assertEqual(WifiNetwork('network1', 'password1', True, 5), nm_config.get_network('network1'))
+
+    def test_falls_back_to_keyfiles_when_network_manager_not_running(self):
+        # Given
+        client = create_client([create_connection('/connection/1', 'network1', 'password1')])
+        client.get_nm_running.return_value = False
+        nm_config = NetworkManagerClientConfig('wlan0', client, self.NM_CONFIG_FILE, self.NM_NETWORK_DIR)
+
+        # When
+        result = nm_config.get_networks()
+
+        # Then
+        self.assertEqual([WifiNetwork('test-network1', 'test-password1', True, 0)], result)
+        client.get_connections.assert_not_called()
+
+
+def create_client(connections):
+    client = MagicMock(spec=Client)
+    client.get_nm_running.return_value = True
+    client.get_connections.return_value = connections
+    return client
+
+
+def create_connection(path, ssid, password, priority=0, interface='wlan0',
+                      connection_type=NM.SETTING_WIRELESS_SETTING_NAME):
+    setting_connection = NM.SettingConnection.new()
+    setting_connection.set_property(NM.SETTING_CONNECTION_ID, ssid)
+    setting_connection.set_property(NM.SETTING_CONNECTION_AUTOCONNECT_PRIORITY, priority)
+    setting_wireless = NM.SettingWireless.new()
+    setting_wireless.set_property(NM.SETTING_WIRELESS_SSID, GLib.Bytes.new(ssid.encode()))
+    setting_security = NM.SettingWirelessSecurity.new()
+    setting_security.set_property(NM.SETTING_WIRELESS_SECURITY_PSK, password)
+    connection = MagicMock(spec=RemoteConnection)
+    connection.get_path.return_value = path
+    connection.get_connection_type.return_value = connection_type
+    connection.get_interface_name.return_value = interface
+    connection.get_setting_connection.return_value = setting_connection
+    connection.get_setting_wireless.return_value = setting_wireless
+    connection.get_setting_wireless_security.return_value = setting_security
+    return connection
+
+
+if __name__ == "__main__":
+    unittest.main()
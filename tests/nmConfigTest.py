@@ -1,13 +1,16 @@
 import os.path
 import unittest
 from unittest import TestCase
+from unittest.mock import MagicMock
 
 from common_utility import delete_directory, copy_file, create_directory
 from context_logger import setup_logging
+from gi.repository import Gio
 from test_utility import compare_files
 
 from tests import TEST_FILE_SYSTEM_ROOT, TEST_RESOURCE_ROOT
 from wifi_config import NetworkManagerConfig, WifiNetwork
+from wifi_utility import FileMonitor
 
 
 class NetworkManagerConfigTest(TestCase):
@@ -136,6 +139,115 @@ class NetworkManagerConfigTest(TestCase):
         # Then
         self.assertFalse(result)
 
+    def test_get_networks_parses_each_file_once_when_unchanged(self):
+        # Given
+        nm_config = NetworkManagerConfig('wlan0', self.NM_CONFIG_FILE, self.NM_NETWORK_DIR)
+
+        # When
+        nm_config.get_networks()
+        nm_config.get_network('test-network1')
+        result = nm_config.get_network_count()
+
+        # Then
+        self.assertEqual(2, result)
+        self.assertEqual(2, nm_config.get_parse_count())
+
+    def test_get_networks_reparses_only_changed_file(self):
+        # Given
+        nm_config = NetworkManagerConfig('wlan0', self.NM_CONFIG_FILE, self.NM_NETWORK_DIR)
+        nm_config.get_networks()
+        file_name = f'{self.NM_NETWORK_DIR}/test-network2.nmconnection'
+        with open(file_name, 'a') as file:
+            file.write('\n')
+
+        # When
+        result = nm_config.get_network('test-network2')
+
+        # Then
+        self.assertEqual(WifiNetwork('test-network2', '', False, 1), result)
+        self.assertEqual(3, nm_config.get_parse_count())
+
+    def test_add_and_remove_network_update_index(self):
+        # Given
+        nm_config = NetworkManagerConfig('wlan0', self.NM_CONFIG_FILE, self.NM_NETWORK_DIR)
+        nm_config.get_networks()
+
+        # When
+        nm_config.add_network(WifiNetwork('test-network3', 'test-password3', True, 2))
+        nm_config.remove_network('test-network1')
+
+        # Then
+        self.assertEqual(WifiNetwork('test-network3', 'test-password3', True, 2),
+                         nm_config.get_network('test-network3'))
+        self.assertIsNone(nm_config.get_network('test-network1'))
+        self.assertEqual(2, nm_config.get_network_count())
+
+    def test_get_networks_skips_non_wireless_connection_files(self):
+        # Given
+        with open(f'{self.NM_NETWORK_DIR}/eth0.nmconnection', 'w') as file:
+            file.write('[connection]\nid=eth0\ntype=ethernet\n')
+        nm_config = NetworkManagerConfig('wlan0', self.NM_CONFIG_FILE, self.NM_NETWORK_DIR)
+
+        # When
+        result = nm_config.get_network_count()
+
+        # Then
+        self.assertEqual(2, result)
+
+    def test_monitored_index_reparses_only_notified_files(self):
+        # Given
+        dir_monitor = MagicMock(spec=FileMonitor)
+        dir_monitor.is_active.return_value = True
+        nm_config = NetworkManagerConfig('wlan0', self.NM_CONFIG_FILE, self.NM_NETWORK_DIR, dir_monitor)
+        nm_config.get_networks()
+        handler = dir_monitor.add_handler.call_args.args[0]
+        copy_file(f'{TEST_RESOURCE_ROOT}/expected/test-network3.nmconnection', self.NM_NETWORK_DIR)
+        os.remove(f'{self.NM_NETWORK_DIR}/test-network1.nmconnection')
+
+        # When
+        handler(f'{self.NM_NETWORK_DIR}/test-network3.nmconnection')
+        handler(f'{self.NM_NETWORK_DIR}/test-network1.nmconnection')
+        result = nm_config.get_networks()
+
+        # Then
+        self.assertEqual(2, len(result))
+        self.assertIsNone(nm_config.get_network('test-network1'))
+        self.assertIsNotNone(nm_config.get_network('test-network3'))
+        self.assertEqual(3, nm_config.get_parse_count())
+
+    def test_monitored_index_picks_up_renamed_temp_file(self):
+        # Given
+        dir_monitor = MagicMock(spec=FileMonitor)
+        dir_monitor.is_active.return_value = True
+        nm_config = NetworkManagerConfig('wlan0', self.NM_CONFIG_FILE, self.NM_NETWORK_DIR, dir_monitor)
+        nm_config.get_networks()
+        file_monitor = FileMonitor(self.NM_NETWORK_DIR, directory=True)
+        file_monitor.add_handler(dir_monitor.add_handler.call_args.args[0])
+        temp_file = f'{self.NM_NETWORK_DIR}/test-network3.nmconnection.ABC123'
+        network_file = f'{self.NM_NETWORK_DIR}/test-network3.nmconnection'
+        copy_file(f'{TEST_RESOURCE_ROOT}/expected/test-network3.nmconnection', self.NM_NETWORK_DIR)
+
+        # When
+        file_monitor._on_changed(MagicMock(), Gio.File.new_for_path(temp_file), Gio.File.new_for_path(network_file),
+                                 Gio.FileMonitorEvent.RENAMED)
+        result = nm_config.get_network_count()
+
+        # Then
+        self.assertEqual(3, result)
+        self.assertIsNotNone(nm_config.get_network('test-network3'))
+
+    def test_network_count_matches_network_list_when_ssid_duplicated(self):
+        # Given
+        copy_file(f'{self.NM_NETWORK_DIR}/test-network1.nmconnection', f'{self.NM_NETWORK_DIR}/copy.nmconnection')
+        nm_config = NetworkManagerConfig('wlan0', self.NM_CONFIG_FILE, self.NM_NETWORK_DIR)
+
+        # When
+        result = nm_config.get_network_count()
+
+        # Then
+        self.assertEqual(len(nm_config.get_networks()), result)
+        self.assertEqual(3, result)
+
 
 def create_config_files():
     create_directory(NetworkManagerConfigTest.NM_NETWORK_DIR)
@@ -3,11 +3,11 @@ from unittest import TestCase, mock
 from unittest.mock import MagicMock
 
 from context_logger import setup_logging
-from gi.repository import GLib
-from gi.repository.NM import Client, DeviceWifi, AccessPoint, Device
+from gi.repository import GLib, NM
+from gi.repository.NM import Client, DeviceWifi, AccessPoint, Device, RemoteConnection
 
 from wifi_config import WifiNetwork
-from wifi_dbus import NetworkManagerDbus
+from wifi_dbus import NetworkManagerDbus, AccessPointIndex
 
 
 class NmDbusTest(TestCase):
@@ -33,8 +33,7 @@ class NmDbusTest(TestCase):
     def test_add_connection_handler(self):
         # Given
         client, device = create_components()
-        client.get_devices.side_effect = [[], [], [device]]
-        nm_dbus = NetworkManagerDbus('wlan0', client, 2, 0)
+        nm_dbus = NetworkManagerDbus('wlan0', client)
 
         handler = MagicMock()
 
@@ -42,18 +41,81 @@ class NmDbusTest(TestCase):
         nm_dbus.add_connection_handler(handler)
 
         # Then
-        device.connect.assert_called_once_with('state-changed', handler)
+        device.connect.assert_any_call('state-changed', handler)
+        self.assertFalse(nm_dbus._device_waiter.is_waiting())
+
+    def test_add_connection_handler_when_device_appears(self):
+        # Given
+        client, device = create_components()
+        client.get_devices.return_value = []
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+
+        handler = MagicMock()
+        nm_dbus.add_connection_handler(handler)
+
+        # When
+        nm_dbus._on_device_added(client, device)
+
+        # Then
+        client.connect.assert_any_call('device-added', nm_dbus._on_device_added)
+        device.connect.assert_any_call('state-changed', handler)
+        self.assertFalse(nm_dbus._device_waiter.is_waiting())
+
+    def test_add_connection_handler_ignores_other_devices(self):
+        # Given
+        client, device = create_components()
+        client.get_devices.return_value = []
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+        other_device = MagicMock(spec=DeviceWifi)
+        other_device.get_iface.return_value = 'wlan1'
+
+        nm_dbus.add_connection_handler(MagicMock())
+
+        # When
+        nm_dbus._on_device_added(client, other_device)
+
+        # Then
+        other_device.connect.assert_not_called()
+        self.assertTrue(nm_dbus._device_waiter.is_waiting())
 
-    def test_add_connection_handler_when_exceeding_max_retries(self):
+        nm_dbus._device_waiter.stop()
+
+    def test_add_connection_handler_keeps_waiting_when_device_does_not_appear_in_time(self):
         # Given
         client, device = create_components()
-        client.get_devices.side_effect = [[], [], [], [device]]
-        nm_dbus = NetworkManagerDbus('wlan0', client, 2, 0)
+        client.get_devices.return_value = []
+        nm_dbus = NetworkManagerDbus('wlan0', client)
 
         handler = MagicMock()
+        nm_dbus.add_connection_handler(handler)
+
+        # When
+        nm_dbus._device_waiter._on_timeout_elapsed()
+
+        # Then
+        self.assertTrue(nm_dbus._device_waiter.is_waiting())
+        self.assertEqual([handler], nm_dbus._pending_handlers)
+        self.assertEqual(2, client.connect.call_args_list.count(mock.call('device-added', nm_dbus._on_device_added)))
 
-        # When, Then
-        self.assertRaises(Exception, nm_dbus.add_connection_handler, handler)
+        nm_dbus._device_waiter.stop()
+
+    def test_add_connection_handler_when_device_appears_after_timeout(self):
+        # Given
+        client, device = create_components()
+        client.get_devices.return_value = []
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+
+        handler = MagicMock()
+        nm_dbus.add_connection_handler(handler)
+        nm_dbus._device_waiter._on_timeout_elapsed()
+
+        # When
+        nm_dbus._on_device_added(client, device)
+
+        # Then
+        device.connect.assert_any_call('state-changed', handler)
+        self.assertEqual([], nm_dbus._pending_handlers)
+        self.assertFalse(nm_dbus._device_waiter.is_waiting())
 
     def test_get_active_ssid(self):
         # Given
@@ -81,53 +143,254 @@ class NmDbusTest(TestCase):
         # Then
         self.assertIsNone(result)
 
+    def test_get_active_ssid_uses_cached_device(self):
+        # Given
+        client, device = create_components()
+        device.get_active_access_point.return_value = None
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+
+        # When
+        nm_dbus.get_active_ssid()
+        nm_dbus.get_active_ssid()
+
+        # Then
+        client.get_devices.assert_called_once()
+        client.connect.assert_called_once_with('device-removed', nm_dbus._on_device_removed)
+        device.connect.assert_has_calls([
+            mock.call('access-point-added', nm_dbus._on_access_point_added),
+            mock.call('access-point-removed', nm_dbus._on_access_point_removed)
+        ])
+
+    def test_device_cache_invalidated_when_device_removed(self):
+        # Given
+        client, device = create_components()
+        device.get_access_points.return_value = [create_access_point('test-ap-1', '/ap/1')]
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+        nm_dbus.get_active_ssid()
+
+        # When
+        nm_dbus._on_device_removed(client, device)
+
+        # Then
+        self.assertIsNone(nm_dbus._device)
+        self.assertEqual([], nm_dbus._access_points.find('test-ap-1'))
+        self.assertEqual(3, client.disconnect.call_count + device.disconnect.call_count)
+
+    def test_device_cache_kept_when_other_device_removed(self):
+        # Given
+        client, device = create_components()
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+        nm_dbus.get_active_ssid()
+
+        # When
+        nm_dbus._on_device_removed(client, MagicMock(spec=Device))
+
+        # Then
+        self.assertEqual(device, nm_dbus._device)
+
+    def test_access_point_index_updated_on_access_point_signals(self):
+        # Given
+        client, device = create_components()
+        access_point_1 = create_access_point('test-ap-1', '/ap/1')
+        access_point_2 = create_access_point('test-ap-1', '/ap/2')
+        device.get_access_points.return_value = [access_point_1]
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+        nm_dbus.get_active_ssid()
+
+        # When
+        nm_dbus._on_access_point_added(device, access_point_2)
+        nm_dbus._on_access_point_removed(device, access_point_1)
+
+        # Then
+        self.assertEqual([access_point_2], nm_dbus._access_points.find('test-ap-1'))
+
+    def test_access_point_index_ignores_hidden_access_points(self):
+        # Given
+        index = AccessPointIndex()
+        access_point = MagicMock(spec=AccessPoint)
+        access_point.get_path.return_value = '/ap/1'
+        access_point.get_ssid.return_value = None
+
+        # When
+        index.add(access_point)
+        index.remove(access_point)
+
+        # Then
+        self.assertEqual([], index.find(''))
+
+    def test_access_point_index_finds_access_point_when_ssid_resolved_later(self):
+        # Given
+        index = AccessPointIndex()
+        access_point = MagicMock(spec=AccessPoint)
+        access_point.get_path.return_value = '/ap/1'
+        access_point.get_ssid.return_value = None
+        index.add(access_point)
+        access_point.get_ssid.return_value = GLib.Bytes.new('test-ap-1'.encode())
+
+        # When
+        result = index.find('test-ap-1')
+
+        # Then
+        self.assertEqual([access_point], result)
+        self.assertEqual({}, index._unnamed)
+
     def test_add_network_and_not_activate(self):
         # Given
         client, device = create_components()
-        ap = MagicMock(spec=AccessPoint)
-        ap.get_ssid.return_value = GLib.Bytes.new('test-ap-3'.encode())
-        device.get_access_points.return_value = [ap]
+        device.get_access_points.return_value = [create_access_point('test-ap-3', '/ap/3')]
         nm_dbus = NetworkManagerDbus('wlan0', client)
+        network = WifiNetwork('test-ap-3', 'test-psk-3', False, 3)
 
         # When
-        nm_dbus.add_network(WifiNetwork('test-ap-3', 'test-psk-3', False, 3))
-        nm_dbus._on_added(client, MagicMock(), None)
+        nm_dbus.add_network(network)
+        nm_dbus._on_added(client, MagicMock(), network)
 
         # Then
         client.add_connection_async.assert_called_once()
-        device.request_scan.assert_not_called()
+        device.request_scan_options_async.assert_not_called()
         client.activate_connection_async.assert_not_called()
         client.add_connection_finish.assert_called_once()
         client.activate_connection_finish.assert_not_called()
 
-    def test_add_network_and_activate(self):
+    def test_add_network_creates_new_connection(self):
         # Given
         client, device = create_components()
-        ap = MagicMock(spec=AccessPoint)
-        ap.get_ssid.return_value = GLib.Bytes.new('test-ap-3'.encode())
-        device.get_access_points.return_value = [ap]
+        client.get_connections.return_value = []
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+        network = WifiNetwork('test-ap-3', 'test-psk-3', True, 3)
+
+        # When
+        nm_dbus.add_network(network)
+
+        # Then
+        client.add_connection_async.assert_called_once_with(mock.ANY, True, None, nm_dbus._on_added, network)
+        connection = client.add_connection_async.call_args.args[0]
+        self.assertEqual('test-ap-3', connection.get_id())
+        self.assertEqual('wlan0', connection.get_interface_name())
+        self.assertTrue(connection.get_uuid())
+        self.assertEqual(3, connection.get_setting_connection().get_autoconnect_priority())
+        self.assertEqual('test-psk-3', connection.get_setting_wireless_security().get_psk())
+
+    def test_add_network_updates_existing_connection(self):
+        # Given
+        client, device = create_components()
+        existing = create_connection('test-ap-3', 'old-psk')
+        other = create_connection('test-ap-4', 'other-psk')
+        client.get_connections.return_value = [other, existing]
         nm_dbus = NetworkManagerDbus('wlan0', client)
+        network = WifiNetwork('test-ap-3', 'test-psk-3', False, 5)
 
         # When
-        nm_dbus.add_network(WifiNetwork('test-ap-3', 'test-psk-3', True, 3))
-        nm_dbus._on_added(client, MagicMock(), None)
+        nm_dbus.add_network(network)
+        nm_dbus._on_updated(existing, MagicMock(), network)
+
+        # Then
+        client.add_connection_async.assert_not_called()
+        existing.commit_changes_async.assert_called_once_with(True, None, nm_dbus._on_updated, network)
+        existing.commit_changes_finish.assert_called_once()
+        other.commit_changes_async.assert_not_called()
+        self.assertEqual('test-psk-3', existing.setting_security.get_psk())
+        self.assertEqual(5, existing.setting_connection.get_autoconnect_priority())
+        self.assertFalse(existing.setting_connection.get_autoconnect())
+        device.request_scan_options_async.assert_not_called()
+
+    def test_update_networks_saves_and_removes_connections_without_activation(self):
+        # Given
+        client, device = create_components()
+        existing = create_connection('test-ap-3', 'old-psk')
+        removed = create_connection('test-ap-4', 'other-psk')
+        client.get_connections.return_value = [existing, removed]
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+        updated_network = WifiNetwork('test-ap-3', 'test-psk-3', True, 5)
+        new_network = WifiNetwork('test-ap-5', 'test-psk-5', True, 6)
+
+        # When
+        nm_dbus.update_networks([updated_network, new_network], ['test-ap-4'])
+        nm_dbus._on_batch_added(client, MagicMock(), new_network)
+        nm_dbus._on_batch_updated(existing, MagicMock(), updated_network)
+
+        # Then
+        removed.delete_async.assert_called_once_with(None, nm_dbus._on_removed, 'test-ap-4')
+        existing.commit_changes_async.assert_called_once_with(True, None, nm_dbus._on_batch_updated, updated_network)
+        client.add_connection_async.assert_called_once_with(mock.ANY, True, None, nm_dbus._on_batch_added,
+                                                            new_network)
+        self.assertEqual('test-psk-3', existing.setting_security.get_psk())
+        device.request_scan_options_async.assert_not_called()
+        client.activate_connection_async.assert_not_called()
+
+    def test_add_network_requests_targeted_scan(self):
+        # Given
+        client, device = create_components()
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+        network = WifiNetwork('test-ap-3', 'test-psk-3', True, 3)
+
+        # When
+        nm_dbus.add_network(network)
+        nm_dbus._on_added(client, MagicMock(), network)
+
+        # Then
+        device.request_scan_options_async.assert_called_once()
+        options = device.request_scan_options_async.call_args.args[0]
+        self.assertEqual({'ssids': [b'test-ap-3']}, options.unpack())
+        device.connect.assert_any_call('notify::last-scan', mock.ANY)
+        client.activate_connection_async.assert_not_called()
+
+        nm_dbus._scan_waiters['test-ap-3'].stop()
+
+    def test_add_network_and_activate_strongest_access_point_after_scan(self):
+        # Given
+        client, device = create_components()
+        weak_ap = create_access_point('test-ap-3', '/ap/1', 20)
+        strong_ap = create_access_point('test-ap-3', '/ap/2', 80)
+        device.get_access_points.return_value = [weak_ap, strong_ap]
+        connection = MagicMock()
+        client.add_connection_finish.return_value = connection
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+        network = WifiNetwork('test-ap-3', 'test-psk-3', True, 3)
+
+        # When
+        nm_dbus.add_network(network)
+        nm_dbus._on_added(client, MagicMock(), network)
+        nm_dbus._on_scan_completed('test-ap-3', connection, device, None)
         nm_dbus._on_activated(client, MagicMock(), None)
 
         # Then
         client.add_connection_async.assert_called_once()
-        device.request_scan.assert_called_once()
-        client.activate_connection_async.assert_called_once()
+        client.activate_connection_async.assert_called_once_with(
+            connection, device, '/ap/2', None, nm_dbus._on_activated, None)
         client.add_connection_finish.assert_called_once()
         client.activate_connection_finish.assert_called_once()
+        self.assertNotIn('test-ap-3', nm_dbus._scan_waiters)
+
+    def test_add_network_and_activate_on_scan_timeout(self):
+        # Given
+        client, device = create_components()
+        device.get_access_points.return_value = [create_access_point('test-ap-3', '/ap/3')]
+        connection = MagicMock()
+        client.add_connection_finish.return_value = connection
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+        network = WifiNetwork('test-ap-3', 'test-psk-3', True, 3)
+        nm_dbus.add_network(network)
+        nm_dbus._on_added(client, MagicMock(), network)
+
+        # When
+        nm_dbus._scan_waiters['test-ap-3']._on_timeout_elapsed()
+
+        # Then
+        client.activate_connection_async.assert_called_once_with(
+            connection, device, '/ap/3', None, nm_dbus._on_activated, None)
+        self.assertNotIn('test-ap-3', nm_dbus._scan_waiters)
 
     def test_add_network_and_not_activate_when_no_such_ap(self):
         # Given
         client, device = create_components()
         nm_dbus = NetworkManagerDbus('wlan0', client)
+        network = WifiNetwork('test-ap-3', 'test-psk-3', True, 3)
 
         # When
-        nm_dbus.add_network(WifiNetwork('test-ap-3', 'test-psk-3', True, 3))
-        nm_dbus._on_added(client, MagicMock(), None)
+        nm_dbus.add_network(network)
+        nm_dbus._on_added(client, MagicMock(), network)
+        nm_dbus._on_scan_completed('test-ap-3', MagicMock(), device, None)
 
         # Then
         client.add_connection_async.assert_called_once()
@@ -135,16 +398,170 @@ class NmDbusTest(TestCase):
         client.add_connection_finish.assert_called_once()
         client.activate_connection_finish.assert_not_called()
 
-    def test_reset_wireless(self):
+    def test_scan_returns_signal_of_requested_networks(self):
+        # Given
+        client, device = create_components()
+        device.get_state.return_value = NM.DeviceState.DISCONNECTED
+        device.get_last_scan.side_effect = [100, 200]
+        device.get_access_points.return_value = [create_access_point('test-ap-1', '/ap/1', 20),
+                                                 create_access_point('test-ap-1', '/ap/2', 80),
+                                                 create_access_point('test-ap-2', '/ap/3', 50)]
+        handlers = {}
+        device.connect.side_effect = lambda signal, handler: handlers.setdefault(signal, handler) and 1
+        device.request_scan_options_async.side_effect = lambda *args: handlers['notify::last-scan'](device, None)
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+
+        # When
+        result = nm_dbus.scan(['test-ap-1', 'test-ap-3'])
+
+        # Then
+        self.assertEqual({'test-ap-1': -34}, result)
+        options = device.request_scan_options_async.call_args.args[0]
+        self.assertEqual({'ssids': [b'test-ap-1', b'test-ap-3']}, options.unpack())
+        device.disconnect.assert_called_once()
+
+    def test_scan_dispatches_main_loop_when_called_from_loop_thread(self):
+        # Given
+        client, device = create_components()
+        device.get_state.return_value = NM.DeviceState.DISCONNECTED
+        device.get_last_scan.side_effect = [100, 200]
+        device.get_access_points.return_value = [create_access_point('test-ap-1', '/ap/1', 80)]
+        handlers = {}
+        device.connect.side_effect = lambda signal, handler: handlers.setdefault(signal, handler) and 1
+        device.request_scan_options_async.side_effect = lambda *args: GLib.idle_add(
+            lambda: handlers['notify::last-scan'](device, None))
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+
+        # When
+        result = nm_dbus.scan(['test-ap-1'])
+
+        # Then
+        self.assertEqual({'test-ap-1': -34}, result)
+
+    def test_scan_returns_none_when_device_unavailable(self):
+        # Given
+        client, device = create_components()
+        device.get_state.return_value = NM.DeviceState.UNMANAGED
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+
+        # When
+        result = nm_dbus.scan(['test-ap-1'])
+
+        # Then
+        self.assertIsNone(result)
+        device.request_scan_options_async.assert_not_called()
+
+    def test_scan_returns_none_when_scan_not_completed(self):
+        # Given
+        client, device = create_components()
+        device.get_state.return_value = NM.DeviceState.DISCONNECTED
+        device.get_last_scan.return_value = 100
+        nm_dbus = NetworkManagerDbus('wlan0', client, scan_timeout=0.01)
+
+        # When
+        result = nm_dbus.scan(['test-ap-1'])
+
+        # Then
+        self.assertIsNone(result)
+        device.request_scan_options_async.assert_called_once()
+        device.disconnect.assert_called_once()
+
+    def test_reset_wireless_disables_wireless(self):
+        # Given
+        client, device = create_components()
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+
+        # When
+        nm_dbus.reset_wireless()
+
+        # Then
+        client.connect.assert_called_once_with('notify::wireless-enabled', nm_dbus._on_wireless_disabled)
+        client.wireless_set_enabled.assert_called_once_with(False)
+        self.assertTrue(nm_dbus._reset_waiter.is_waiting())
+
+    def test_reset_wireless_enables_wireless_when_disabled(self):
+        # Given
+        client, device = create_components()
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+        nm_dbus.reset_wireless()
+        client.wireless_get_enabled.return_value = False
+
+        # When
+        nm_dbus._on_wireless_disabled(client, None)
+
+        # Then
+        client.wireless_set_enabled.assert_has_calls([mock.call(False), mock.call(True)])
+        device.connect.assert_any_call('state-changed', nm_dbus._on_device_state_changed_after_reset)
+        self.assertTrue(nm_dbus._reset_waiter.is_waiting())
+
+    def test_reset_wireless_completes_when_device_becomes_available(self):
+        # Given
+        client, device = create_components()
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+        nm_dbus.reset_wireless()
+        client.wireless_get_enabled.return_value = False
+        nm_dbus._on_wireless_disabled(client, None)
+
+        # When
+        nm_dbus._on_device_state_changed_after_reset(device, 30, 20, 0)
+
+        # Then
+        self.assertFalse(nm_dbus._reset_waiter.is_waiting())
+        device.disconnect.assert_called_once()
+
+    def test_reset_wireless_waits_while_device_is_unavailable(self):
+        # Given
+        client, device = create_components()
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+        nm_dbus.reset_wireless()
+        client.wireless_get_enabled.return_value = False
+        nm_dbus._on_wireless_disabled(client, None)
+
+        # When
+        nm_dbus._on_device_state_changed_after_reset(device, 20, 10, 0)
+
+        # Then
+        self.assertTrue(nm_dbus._reset_waiter.is_waiting())
+
+    def test_reset_wireless_waits_for_hardware_enable(self):
         # Given
         client, device = create_components()
+        client.wireless_get_enabled.return_value = False
+        client.wireless_hardware_get_enabled.return_value = False
         nm_dbus = NetworkManagerDbus('wlan0', client)
 
         # When
         nm_dbus.reset_wireless()
 
+        # Then
+        client.connect.assert_called_once_with(
+            'notify::wireless-hardware-enabled', nm_dbus._on_wireless_hardware_enabled)
+        client.wireless_set_enabled.assert_not_called()
+
+    def test_reset_wireless_ignored_when_already_in_progress(self):
+        # Given
+        client, device = create_components()
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+        nm_dbus.reset_wireless()
+
+        # When
+        nm_dbus.reset_wireless()
+
+        # Then
+        client.wireless_set_enabled.assert_called_once_with(False)
+
+    def test_reset_wireless_enables_wireless_on_timeout(self):
+        # Given
+        client, device = create_components()
+        nm_dbus = NetworkManagerDbus('wlan0', client)
+        nm_dbus.reset_wireless()
+
+        # When
+        nm_dbus._reset_waiter._on_timeout_elapsed()
+
         # Then
         client.wireless_set_enabled.assert_has_calls([mock.call(False), mock.call(True)])
+        self.assertFalse(nm_dbus._reset_waiter.is_waiting())
 
     def test_enable_wireless(self):
         # Given
@@ -158,6 +575,32 @@ class NmDbusTest(TestCase):
         client.wireless_set_enabled.assert_called_once_with(True)
 
 
+def create_connection(ssid, password):
+    setting_connection = NM.SettingConnection.new()
+    setting_connection.set_property(NM.SETTING_CONNECTION_ID, ssid)
+    setting_wireless = NM.SettingWireless.new()
+    setting_wireless.set_property(NM.SETTING_WIRELESS_SSID, GLib.Bytes.new(ssid.encode()))
+    setting_security = NM.SettingWirelessSecurity.new()
+    setting_security.set_property(NM.SETTING_WIRELESS_SECURITY_PSK, password)
+    connection = MagicMock(spec=RemoteConnection)
+    connection.get_connection_type.return_value = NM.SETTING_WIRELESS_SETTING_NAME
+    connection.get_interface_name.return_value = 'wlan0'
+    connection.get_setting_connection.return_value = setting_connection
+    connection.get_setting_wireless.return_value = setting_wireless
+    connection.get_setting_wireless_security.return_value = setting_security
+    connection.setting_connection = setting_connection
+    connection.setting_security = setting_security
+    return connection
+
+
+def create_access_point(ssid, path, strength=50):
+    access_point = MagicMock(spec=AccessPoint)
+    access_point.get_ssid.return_value = GLib.Bytes.new(ssid.encode())
+    access_point.get_path.return_value = path
+    access_point.get_strength.return_value = strength
+    return access_point
+
+
 def create_components():
     loopback_device = MagicMock(spec=Device)
     loopback_device.get_iface.return_value = 'lo'
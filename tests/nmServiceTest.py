@@ -73,10 +73,7 @@ class NetworkManagerServiceTest(TestCase):
     def test_returns_network_count(self):
         # Given
         dependencies, wifi_config, wifi_dbus = create_dependencies()
-        wifi_config.get_networks.return_value = [
-            WifiNetwork('"test-network1"', '"test-password1"', True, 0),
-            WifiNetwork('test-network2', 'test-password2', False, 1)
-        ]
+        wifi_config.get_network_count.return_value = 2
         network_manager_service = NetworkManagerService(dependencies, wifi_config, wifi_dbus, 0)
 
         # When
@@ -112,8 +109,123 @@ class NetworkManagerServiceTest(TestCase):
         # When
         network_manager_service.add_network(network)
 
+        # Then
+        wifi_dbus.add_network.assert_called_once_with(network)
+        wifi_config.add_network.assert_not_called()
+
+    def test_adds_network_to_config_when_not_active(self):
+        # Given
+        dependencies, wifi_config, wifi_dbus = create_dependencies()
+        dependencies.systemd.is_active.return_value = False
+        network_manager_service = NetworkManagerService(dependencies, wifi_config, wifi_dbus, 0)
+
+        network = WifiNetwork('test-network1', 'test-password1', True, 1)
+
+        # When
+        network_manager_service.add_network(network)
+
         # Then
         wifi_config.add_network.assert_called_once_with(network)
+        wifi_dbus.add_network.assert_not_called()
+
+    def test_updates_networks_via_dbus_when_active(self):
+        # Given
+        dependencies, wifi_config, wifi_dbus = create_dependencies()
+        dependencies.systemd.is_active.return_value = True
+        network_manager_service = NetworkManagerService(dependencies, wifi_config, wifi_dbus, 0)
+        networks = [WifiNetwork('test-network1', 'test-password1', True, 1)]
+
+        # When
+        network_manager_service.update_networks(networks, ['test-network2'])
+
+        # Then
+        wifi_dbus.update_networks.assert_called_once_with(networks, ['test-network2'])
+        wifi_config.update_networks.assert_not_called()
+
+    def test_updates_networks_in_config_when_not_active(self):
+        # Given
+        dependencies, wifi_config, wifi_dbus = create_dependencies()
+        dependencies.systemd.is_active.return_value = False
+        network_manager_service = NetworkManagerService(dependencies, wifi_config, wifi_dbus, 0)
+        networks = [WifiNetwork('test-network1', 'test-password1', True, 1)]
+
+        # When
+        network_manager_service.update_networks(networks, ['test-network2'])
+
+        # Then
+        wifi_config.update_networks.assert_called_once_with(networks, ['test-network2'])
+        wifi_dbus.update_networks.assert_not_called()
+
+    def test_sets_network_priorities_via_dbus_when_active(self):
+        # Given
+        dependencies, wifi_config, wifi_dbus = create_dependencies()
+        dependencies.systemd.is_active.return_value = True
+        network_manager_service = NetworkManagerService(dependencies, wifi_config, wifi_dbus, 0)
+
+        # When
+        network_manager_service.set_network_priorities({'test-network1': 2})
+
+        # Then
+        wifi_dbus.set_network_priorities.assert_called_once_with({'test-network1': 2})
+        wifi_config.update_networks.assert_not_called()
+
+    def test_sets_network_priorities_in_config_when_not_active(self):
+        # Given
+        dependencies, wifi_config, wifi_dbus = create_dependencies()
+        dependencies.systemd.is_active.return_value = False
+        wifi_config.get_networks.return_value = [
+            WifiNetwork('test-network1', 'test-password1', True, 0),
+            WifiNetwork('test-network2', 'test-password2', True, 1)
+        ]
+        network_manager_service = NetworkManagerService(dependencies, wifi_config, wifi_dbus, 0)
+
+        # When
+        network_manager_service.set_network_priorities({'test-network1': 1, 'test-network2': 0})
+
+        # Then
+        wifi_config.update_networks.assert_called_once_with([
+            WifiNetwork('test-network1', 'test-password1', True, 1),
+            WifiNetwork('test-network2', 'test-password2', True, 0)
+        ], [])
+        wifi_dbus.set_network_priorities.assert_not_called()
+
+    def test_supports_live_reconfiguration(self):
+        # Given
+        dependencies, wifi_config, wifi_dbus = create_dependencies()
+        network_manager_service = NetworkManagerService(dependencies, wifi_config, wifi_dbus, 0)
+
+        # When
+        result = network_manager_service.supports_live_reconfiguration()
+
+        # Then
+        self.assertTrue(result)
+
+    def test_scans_networks_via_dbus_when_active(self):
+        # Given
+        dependencies, wifi_config, wifi_dbus = create_dependencies()
+        dependencies.systemd.is_active.return_value = True
+        wifi_dbus.scan.return_value = {'test-network1': -50}
+        network_manager_service = NetworkManagerService(dependencies, wifi_config, wifi_dbus, 0)
+
+        # When
+        result = network_manager_service.scan_networks(['test-network1'])
+
+        # Then
+        self.assertEqual({'test-network1': -50}, result)
+        wifi_dbus.scan.assert_called_once_with(['test-network1'])
+
+    def test_does_not_scan_networks_when_not_active(self):
+        # Given
+        dependencies, wifi_config, wifi_dbus = create_dependencies()
+        dependencies.systemd.is_active.return_value = False
+        network_manager_service = NetworkManagerService(dependencies, wifi_config, wifi_dbus, 0)
+
+        # When
+        result = network_manager_service.scan_networks(['test-network1'])
+
+        # Then
+        self.assertIsNone(result)
+        wifi_dbus.scan.assert_not_called()
 
     def test_resets_wireless(self):
         # Given
@@ -5,6 +5,7 @@ from unittest.mock import MagicMock
 from context_logger import setup_logging
 from systemd_dbus import Systemd
 
+from wifi_dbus import SystemdUnitMonitor, UnitSnapshot, UnitState
 from wifi_event import WifiEventType
 from wifi_service import ServiceDependencies, ServiceError, Service
 from wifi_utility import IPlatformAccess, IJournal
@@ -51,6 +52,53 @@ class HostapdServiceTest(TestCase):
         # When, Then
         self.assertRaises(ServiceError, service.register_callback, WifiEventType.HOTSPOT_STARTED, None)
 
+    def test_registers_state_change_handler_on_unit_monitor(self):
+        # Given
+        dependencies = create_dependencies()
+        dependencies.unit_monitor = MagicMock(spec=SystemdUnitMonitor)
+        service = Service('test-service', '/test/service/path', dependencies)
+
+        # When
+        service._setup_state_change_handling()
+
+        # Then
+        dependencies.unit_monitor.add_handler.assert_called_once_with('/test/service/path',
+                                                                      service._on_property_changed)
+        dependencies.systemd.add_property_change_handler.assert_not_called()
+
+    def test_setup_queries_unit_snapshot_instead_of_systemd(self):
+        # Given
+        dependencies = create_dependencies()
+        dependencies.unit_snapshot = MagicMock(spec=UnitSnapshot)
+        dependencies.unit_snapshot.get.return_value = UnitState('/test/service/path', 'loaded', 'active', 'running',
+                                                                'enabled')
+        service = Service('test-service', '/test/service/path', dependencies)
+
+        # When
+        service.setup()
+
+        # Then
+        self.assertTrue(service.is_installed())
+        dependencies.systemd.is_masked.assert_not_called()
+        dependencies.systemd.is_enabled.assert_not_called()
+        dependencies.systemd.is_installed.assert_not_called()
+
+    def test_mask_invalidates_unit_snapshot(self):
+        # Given
+        dependencies = create_dependencies()
+        dependencies.unit_snapshot = MagicMock(spec=UnitSnapshot)
+        dependencies.unit_snapshot.get.return_value = UnitState('/test/service/path', 'loaded', 'inactive', 'dead',
+                                                                'disabled')
+        service = Service('test-service', '/test/service/path', dependencies)
+        service.set_force_stop(True)
+
+        # When
+        service.setup()
+
+        # Then
+        dependencies.systemd.mask_service.assert_called_once_with('test-service')
+        dependencies.unit_snapshot.invalidate.assert_called_once_with('test-service')
+
 
 def create_dependencies():
     platform = MagicMock(spec=IPlatformAccess)
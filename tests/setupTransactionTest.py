@@ -0,0 +1,63 @@
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from context_logger import setup_logging
+from systemd_dbus import Systemd
+
+from wifi_service import SetupTransaction
+
+
+class SetupTransactionTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+
+    def test_commit_reloads_daemon_once_for_all_requests(self):
+        # Given
+        systemd = MagicMock(spec=Systemd)
+        setup_transaction = SetupTransaction(systemd)
+        setup_transaction.request_reload('hostapd')
+        setup_transaction.request_reload('dnsmasq')
+        setup_transaction.request_reload('wpa_supplicant')
+
+        # When
+        setup_transaction.commit()
+
+        # Then
+        systemd.reload_daemon.assert_called_once()
+        self.assertEqual(1, setup_transaction.get_reload_count())
+        self.assertEqual(2, setup_transaction.get_reloads_avoided())
+        self.assertFalse(setup_transaction.is_reload_pending())
+
+    def test_commit_does_not_reload_daemon_without_requests(self):
+        # Given
+        systemd = MagicMock(spec=Systemd)
+        setup_transaction = SetupTransaction(systemd)
+
+        # When
+        setup_transaction.commit()
+
+        # Then
+        systemd.reload_daemon.assert_not_called()
+        self.assertEqual(0, setup_transaction.get_reload_count())
+
+    def test_commits_on_exit(self):
+        # Given
+        systemd = MagicMock(spec=Systemd)
+
+        # When
+        with SetupTransaction(systemd) as setup_transaction:
+            setup_transaction.request_reload('hostapd')
+            systemd.reload_daemon.assert_not_called()
+
+        # Then
+        systemd.reload_daemon.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
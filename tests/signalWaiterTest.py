@@ -0,0 +1,93 @@
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from context_logger import setup_logging
+
+from wifi_dbus import SignalWaiter
+
+
+class SignalWaiterTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+
+    def test_connect_connects_handler_to_source(self):
+        # Given
+        source, handler = MagicMock(), MagicMock()
+        signal_waiter = SignalWaiter('test', 1, MagicMock())
+
+        # When
+        signal_waiter.connect(source, 'test-signal', handler)
+
+        # Then
+        source.connect.assert_called_once_with('test-signal', handler)
+
+    def test_start_starts_waiting(self):
+        # Given
+        signal_waiter = SignalWaiter('test', 1, MagicMock())
+
+        # When
+        signal_waiter.start()
+
+        # Then
+        self.assertTrue(signal_waiter.is_waiting())
+
+        signal_waiter.stop()
+
+    def test_stop_disconnects_handlers_and_stops_waiting(self):
+        # Given
+        source = MagicMock()
+        source.connect.return_value = 1
+        signal_waiter = SignalWaiter('test', 1, MagicMock())
+        signal_waiter.connect(source, 'test-signal', MagicMock())
+        signal_waiter.start()
+
+        # When
+        signal_waiter.stop()
+
+        # Then
+        source.disconnect.assert_called_once_with(1)
+        self.assertFalse(signal_waiter.is_waiting())
+
+    def test_disconnect_all_keeps_waiting(self):
+        # Given
+        source = MagicMock()
+        source.connect.return_value = 1
+        signal_waiter = SignalWaiter('test', 1, MagicMock())
+        signal_waiter.connect(source, 'test-signal', MagicMock())
+        signal_waiter.start()
+
+        # When
+        signal_waiter.disconnect_all()
+
+        # Then
+        source.disconnect.assert_called_once_with(1)
+        self.assertTrue(signal_waiter.is_waiting())
+
+        signal_waiter.stop()
+
+    def test_timeout_disconnects_handlers_and_executes_callback(self):
+        # Given
+        source, on_timeout = MagicMock(), MagicMock()
+        source.connect.return_value = 1
+        signal_waiter = SignalWaiter('test', 1, on_timeout)
+        signal_waiter.connect(source, 'test-signal', MagicMock())
+        signal_waiter.start()
+
+        # When
+        result = signal_waiter._on_timeout_elapsed()
+
+        # Then
+        self.assertFalse(result)
+        source.disconnect.assert_called_once_with(1)
+        on_timeout.assert_called_once()
+        self.assertFalse(signal_waiter.is_waiting())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from context_logger import setup_logging
+from dbus import SystemBus
+
+from wifi_dbus import SystemdUnitMonitor
+
+UNIT_INTERFACE = 'org.freedesktop.systemd1.Unit'
+HOSTAPD_PATH = '/org/freedesktop/systemd1/unit/hostapd_2eservice'
+DNSMASQ_PATH = '/org/freedesktop/systemd1/unit/dnsmasq_2eservice'
+
+
+class SystemdUnitMonitorTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+
+    def test_single_subscription_for_all_units(self):
+        # Given
+        system_bus = MagicMock(spec=SystemBus)
+        unit_monitor = SystemdUnitMonitor(system_bus)
+
+        # When
+        unit_monitor.add_handler(HOSTAPD_PATH, MagicMock())
+        unit_monitor.add_handler(DNSMASQ_PATH, MagicMock())
+
+        # Then
+        system_bus.add_signal_receiver.assert_called_once_with(unit_monitor._on_properties_changed,
+                                                               signal_name='PropertiesChanged',
+                                                               dbus_interface='org.freedesktop.DBus.Properties',
+                                                               bus_name='org.freedesktop.systemd1',
+                                                               arg0=UNIT_INTERFACE,
+                                                               path_keyword='path')
+        self.assertEqual([HOSTAPD_PATH, DNSMASQ_PATH], unit_monitor.get_unit_paths())
+
+    def test_dispatches_state_changes_by_path(self):
+        # Given
+        unit_monitor = SystemdUnitMonitor(MagicMock(spec=SystemBus))
+        hostapd_handler, dnsmasq_handler = MagicMock(), MagicMock()
+        unit_monitor.add_handler(HOSTAPD_PATH, hostapd_handler)
+        unit_monitor.add_handler(DNSMASQ_PATH, dnsmasq_handler)
+
+        # When
+        unit_monitor._on_properties_changed(UNIT_INTERFACE, {'ActiveState': 'active', 'SubState': 'running',
+                                                             'InactiveExitTimestamp': 1}, [], path=HOSTAPD_PATH)
+
+        # Then
+        hostapd_handler.assert_called_once_with(UNIT_INTERFACE, {'ActiveState': 'active', 'SubState': 'running'}, [])
+        dnsmasq_handler.assert_not_called()
+
+    def test_does_not_dispatch_when_state_unchanged(self):
+        # Given
+        unit_monitor = SystemdUnitMonitor(MagicMock(spec=SystemBus))
+        handler = MagicMock()
+        unit_monitor.add_handler(HOSTAPD_PATH, handler)
+        unit_monitor._on_properties_changed(UNIT_INTERFACE, {'ActiveState': 'active', 'SubState': 'running'}, [],
+                                            path=HOSTAPD_PATH)
+        handler.reset_mock()
+
+        # When
+        unit_monitor._on_properties_changed(UNIT_INTERFACE, {'ActiveState': 'active', 'SubState': 'running'}, [],
+                                            path=HOSTAPD_PATH)
+        unit_monitor._on_properties_changed(UNIT_INTERFACE, {'ActiveEnterTimestamp': 1}, [], path=HOSTAPD_PATH)
+
+        # Then
+        handler.assert_not_called()
+
+    def test_ignores_unmanaged_units(self):
+        # Given
+        unit_monitor = SystemdUnitMonitor(MagicMock(spec=SystemBus))
+        handler = MagicMock()
+        unit_monitor.add_handler(HOSTAPD_PATH, handler)
+
+        # When
+        unit_monitor._on_properties_changed(UNIT_INTERFACE, {'ActiveState': 'active'}, [],
+                                            path='/org/freedesktop/systemd1/unit/cron_2eservice')
+
+        # Then
+        handler.assert_not_called()
+
+    def test_removes_subscription_when_last_handler_removed(self):
+        # Given
+        system_bus = MagicMock(spec=SystemBus)
+        unit_monitor = SystemdUnitMonitor(system_bus)
+        handler = MagicMock()
+        unit_monitor.add_handler(HOSTAPD_PATH, handler)
+
+        # When
+        unit_monitor.remove_handler(HOSTAPD_PATH, handler)
+
+        # Then
+        system_bus.add_signal_receiver.return_value.remove.assert_called_once()
+        self.assertEqual([], unit_monitor.get_unit_paths())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from context_logger import setup_logging
+from dbus import SystemBus, DBusException
+
+from wifi_dbus import UnitSnapshot, AsyncDbus, SystemdUnitMonitor, UnitState, DbusProxyCache
+
+HOSTAPD_PATH = '/org/freedesktop/systemd1/unit/hostapd_2eservice'
+DNSMASQ_PATH = '/org/freedesktop/systemd1/unit/dnsmasq_2eservice'
+MISSING_PATH = '/org/freedesktop/systemd1/unit/missing_2eservice'
+
+
+class UnitSnapshotTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+
+    def test_refresh_fetches_all_units_in_two_calls(self):
+        # Given
+        system_bus, async_dbus, unit_monitor = create_components()
+        unit_snapshot = UnitSnapshot(system_bus, async_dbus, unit_monitor)
+
+        # When
+        unit_snapshot.refresh(['hostapd', 'dnsmasq', 'missing'])
+
+        # Then
+        self.assertEqual(2, async_dbus.call.call_count)
+        async_dbus.call.assert_any_call('org.freedesktop.systemd1', '/org/freedesktop/systemd1',
+                                        'org.freedesktop.systemd1.Manager', 'ListUnitsByNames',
+                                        ['hostapd.service', 'dnsmasq.service', 'missing.service'])
+        self.assertEqual(UnitState(HOSTAPD_PATH, 'loaded', 'active', 'running', 'enabled'),
+                         unit_snapshot.get('hostapd'))
+        self.assertTrue(unit_snapshot.get('dnsmasq').is_masked())
+        self.assertFalse(unit_snapshot.get('missing').is_installed())
+
+    def test_refresh_monitors_unit_state_changes(self):
+        # Given
+        system_bus, async_dbus, unit_monitor = create_components()
+        unit_snapshot = UnitSnapshot(system_bus, async_dbus, unit_monitor)
+        unit_snapshot.refresh(['hostapd', 'dnsmasq', 'missing'])
+        handler = unit_monitor.add_handler.call_args_list[0].args[1]
+
+        # When
+        handler('org.freedesktop.systemd1.Unit', {'ActiveState': 'deactivating'}, [])
+
+        # Then
+        self.assertEqual(3, unit_monitor.add_handler.call_count)
+        self.assertEqual('deactivating', unit_snapshot.get('hostapd').active_state)
+        self.assertEqual('running', unit_snapshot.get('hostapd').sub_state)
+
+    def test_refresh_clears_snapshot_on_error(self):
+        # Given
+        system_bus, async_dbus, unit_monitor = create_components()
+        unit_snapshot = UnitSnapshot(system_bus, async_dbus, unit_monitor)
+        unit_snapshot.refresh(['hostapd', 'dnsmasq', 'missing'])
+        async_dbus.gather.return_value = [DBusException('Unknown method'), []]
+
+        # When
+        unit_snapshot.refresh(['hostapd', 'dnsmasq', 'missing'])
+
+        # Then
+        self.assertIsNone(unit_snapshot.get('hostapd'))
+
+    def test_refresh_passes_typed_empty_pattern_list(self):
+        # Given
+        system_bus, _, unit_monitor = create_components()
+        proxy_cache = MagicMock(spec=DbusProxyCache)
+        method = proxy_cache.get_interface.return_value.get_dbus_method.return_value
+        method.side_effect = reply_like_dbus_python
+        unit_snapshot = UnitSnapshot(system_bus, AsyncDbus(system_bus, proxy_cache), unit_monitor)
+
+        # When
+        unit_snapshot.refresh(['hostapd'])
+
+        # Then
+        patterns = method.call_args_list[1].args[0]
+        self.assertEqual([], patterns)
+        self.assertEqual('s', patterns.signature)
+        self.assertEqual('s', method.call_args_list[1].args[1].signature)
+
+    def test_refresh_falls_back_when_snapshot_cannot_be_fetched(self):
+        # Given
+        system_bus, async_dbus, unit_monitor = create_components()
+        unit_snapshot = UnitSnapshot(system_bus, async_dbus, unit_monitor)
+        unit_snapshot.refresh(['hostapd', 'dnsmasq', 'missing'])
+        async_dbus.call.side_effect = ValueError('Unable to guess signature from an empty list')
+
+        # When
+        unit_snapshot.refresh(['hostapd', 'dnsmasq', 'missing'])
+
+        # Then
+        self.assertIsNone(unit_snapshot.get('hostapd'))
+
+    def test_unit_files_changed_clears_snapshot(self):
+        # Given
+        system_bus, async_dbus, unit_monitor = create_components()
+        unit_snapshot = UnitSnapshot(system_bus, async_dbus, unit_monitor)
+        unit_snapshot.refresh(['hostapd', 'dnsmasq', 'missing'])
+
+        # When
+        unit_snapshot._on_unit_files_changed()
+
+        # Then
+        self.assertIsNone(unit_snapshot.get('hostapd'))
+
+    def test_invalidate_removes_unit(self):
+        # Given
+        system_bus, async_dbus, unit_monitor = create_components()
+        unit_snapshot = UnitSnapshot(system_bus, async_dbus, unit_monitor)
+        unit_snapshot.refresh(['hostapd', 'dnsmasq', 'missing'])
+
+        # When
+        unit_snapshot.invalidate('dnsmasq')
+
+        # Then
+        self.assertIsNone(unit_snapshot.get('dnsmasq'))
+        self.assertIsNotNone(unit_snapshot.get('hostapd'))
+
+
+def reply_like_dbus_python(*args, **kwargs):
+    if any(isinstance(arg, list) and not arg and not getattr(arg, 'signature', None) for arg in args):
+        raise ValueError('Unable to guess signature from an empty list')
+
+    kwargs['reply_handler']([])
+
+
+def create_components():
+    system_bus = MagicMock(spec=SystemBus)
+    async_dbus = MagicMock(spec=AsyncDbus)
+    async_dbus.gather.return_value = [
+        [
+            ('hostapd.service', '', 'loaded', 'active', 'running', '', HOSTAPD_PATH, 0, '', '/'),
+            ('dnsmasq.service', '', 'masked', 'inactive', 'dead', '', DNSMASQ_PATH, 0, '', '/'),
+            ('missing.service', '', 'not-found', 'inactive', 'dead', '', MISSING_PATH, 0, '', '/'),
+        ],
+        [
+            ('/lib/systemd/system/hostapd.service', 'enabled'),
+            ('/etc/systemd/system/dnsmasq.service', 'masked'),
+        ]
+    ]
+    unit_monitor = MagicMock(spec=SystemdUnitMonitor)
+    return system_bus, async_dbus, unit_monitor
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from common_utility import delete_directory, create_directory
+from context_logger import setup_logging
+
+from tests import TEST_FILE_SYSTEM_ROOT
+from wifi_utility import VirtualInterface, IPlatformAccess
+
+SYS_CLASS_NET = f'{TEST_FILE_SYSTEM_ROOT}/sys/class/net'
+
+INFO_OUTPUT = b'''Interface wlan0
+\tifindex 3
+\twdev 0x1
+\taddr 00:11:22:33:44:55
+\tssid test-network
+\ttype managed
+\twiphy 0
+\tchannel 36 (5180 MHz), width: 80 MHz, center1: 5210 MHz
+\ttxpower 31.00 dBm
+'''
+
+
+class VirtualInterfaceTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+        delete_directory(TEST_FILE_SYSTEM_ROOT)
+        create_directory(SYS_CLASS_NET)
+
+    def test_creates_interface_when_not_exists(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        virtual_interface = VirtualInterface(platform, 'wlan0', 'uap0', sys_class_net=SYS_CLASS_NET)
+
+        # When
+        virtual_interface.create()
+
+        # Then
+        platform.execute_command.assert_called_once_with('iw dev wlan0 interface add uap0 type __ap')
+
+    def test_does_not_create_interface_when_exists(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        create_directory(f'{SYS_CLASS_NET}/uap0')
+        virtual_interface = VirtualInterface(platform, 'wlan0', 'uap0', sys_class_net=SYS_CLASS_NET)
+
+        # When
+        virtual_interface.create()
+
+        # Then
+        platform.execute_command.assert_not_called()
+
+    def test_releases_created_interface_from_network_manager_when_unmanaged(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        virtual_interface = VirtualInterface(platform, 'wlan0', 'uap0', True, SYS_CLASS_NET)
+
+        # When
+        virtual_interface.create()
+
+        # Then
+        platform.execute_command.assert_called_with('nmcli device set uap0 managed no')
+
+    def test_returns_parent_channel(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        platform.execute_command.return_value = INFO_OUTPUT
+        virtual_interface = VirtualInterface(platform, 'wlan0', 'uap0', sys_class_net=SYS_CLASS_NET)
+
+        # When
+        result = virtual_interface.get_parent_channel()
+
+        # Then
+        self.assertEqual(36, result)
+        platform.execute_command.assert_called_once_with('iw dev wlan0 info')
+
+    def test_returns_no_parent_channel_when_not_connected(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        platform.execute_command.return_value = b'Interface wlan0\n\ttype managed\n'
+        virtual_interface = VirtualInterface(platform, 'wlan0', 'uap0', sys_class_net=SYS_CLASS_NET)
+
+        # When
+        result = virtual_interface.get_parent_channel()
+
+        # Then
+        self.assertIsNone(result)
+
+    def test_returns_no_parent_channel_when_command_failed(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        platform.execute_command.side_effect = Exception('No such device')
+        virtual_interface = VirtualInterface(platform, 'wlan0', 'uap0', sys_class_net=SYS_CLASS_NET)
+
+        # When
+        result = virtual_interface.get_parent_channel()
+
+        # Then
+        self.assertIsNone(result)
+
+
+if __name__ == '__main__':
+    unittest.main()
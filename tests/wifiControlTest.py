@@ -9,7 +9,7 @@ from wifi_config import WifiNetwork
 from wifi_event import WifiEventType
 from wifi_manager import WifiControl, WifiControlState, WifiControlConfig
 from wifi_service import WifiClientService, WifiHotspotService, IService
-from wifi_utility import IPlatformAccess
+from wifi_utility import IPlatformAccess, IWifiScanner, ScanResult
 
 
 class WifiControlTest(TestCase):
@@ -340,6 +340,225 @@ class WifiControlTest(TestCase):
         # Then
         client_service.add_network.assert_called_once_with(network)
 
+    def test_add_network_with_precomputed_psk(self):
+        # Given
+        client_service, hotspot_service, platform, _ = create_components()
+        config = WifiControlConfig(3, "reboot", precompute_psk=True)
+        wifi_control = WifiControl(client_service, hotspot_service, platform, config)
+
+        # When
+        wifi_control.add_network(WifiNetwork('IEEE', 'password', True, 1))
+
+        # Then
+        client_service.add_network.assert_called_once_with(
+            WifiNetwork('IEEE', 'f42c6fc52df0ebef9ebb4b90b38a5f902e83fe1b135a70e23aed762e9710a12e', True, 1))
+
+    def test_update_networks_keeps_already_derived_psk(self):
+        # Given
+        client_service, hotspot_service, platform, _ = create_components()
+        config = WifiControlConfig(3, "reboot", precompute_psk=True)
+        wifi_control = WifiControl(client_service, hotspot_service, platform, config)
+        psk = 'f42c6fc52df0ebef9ebb4b90b38a5f902e83fe1b135a70e23aed762e9710a12e'
+
+        # When
+        wifi_control.update_networks([WifiNetwork('IEEE', psk, True, 1)], ['old-network'])
+
+        # Then
+        client_service.update_networks.assert_called_once_with([WifiNetwork('IEEE', psk, True, 1)], ['old-network'])
+
+    def test_supports_live_reconfiguration(self):
+        # Given
+        client_service, hotspot_service, platform, config = create_components()
+        client_service.supports_live_reconfiguration.return_value = True
+        wifi_control = WifiControl(client_service, hotspot_service, platform, config)
+
+        # When
+        result = wifi_control.supports_live_reconfiguration()
+
+        # Then
+        self.assertTrue(result)
+
+    def test_client_network_visible_when_stored_network_in_range(self):
+        # Given
+        client_service, hotspot_service, platform, config = create_components()
+        client_service.is_active.return_value = False
+        hotspot_service.is_active.return_value = True
+        client_service.get_networks.return_value = [
+            WifiNetwork('"network1"', '"password1"', True, 0),
+            WifiNetwork('"network2"', '"password2"', True, 1)
+        ]
+        scanner = MagicMock(spec=IWifiScanner)
+        scanner.scan.return_value = ScanResult(0, {'network2': -60, 'other': -40})
+        wifi_control = WifiControl(client_service, hotspot_service, platform, config, scanner)
+
+        # When
+        result = wifi_control.is_client_network_visible()
+
+        # Then
+        self.assertTrue(result)
+        scanner.scan.assert_called_once_with(['network1', 'network2'], ap_force=True, max_age=None)
+
+    def test_client_network_not_visible_when_no_stored_network_in_range(self):
+        # Given
+        client_service, hotspot_service, platform, config = create_components()
+        client_service.is_active.return_value = True
+        hotspot_service.is_active.return_value = False
+        client_service.get_networks.return_value = [WifiNetwork('network1', 'password1', True, 0)]
+        scanner = MagicMock(spec=IWifiScanner)
+        scanner.scan.return_value = ScanResult(0, {'other': -40})
+        wifi_control = WifiControl(client_service, hotspot_service, platform, config, scanner)
+
+        # When
+        result = wifi_control.is_client_network_visible()
+
+        # Then
+        self.assertFalse(result)
+        scanner.scan.assert_called_once_with(['network1'], ap_force=False, max_age=None)
+
+    def test_client_network_visible_when_scan_failed(self):
+        # Given
+        client_service, hotspot_service, platform, config = create_components()
+        client_service.get_networks.return_value = [WifiNetwork('network1', 'password1', True, 0)]
+        scanner = MagicMock(spec=IWifiScanner)
+        scanner.scan.return_value = None
+        wifi_control = WifiControl(client_service, hotspot_service, platform, config, scanner)
+
+        # When
+        result = wifi_control.is_client_network_visible()
+
+        # Then
+        self.assertTrue(result)
+
+    def test_visible_client_networks_unknown_when_scan_failed(self):
+        # Given
+        client_service, hotspot_service, platform, config = create_components()
+        client_service.get_networks.return_value = [WifiNetwork('network1', 'password1', True, 0)]
+        scanner = MagicMock(spec=IWifiScanner)
+        scanner.scan.return_value = None
+        wifi_control = WifiControl(client_service, hotspot_service, platform, config, scanner)
+
+        # When
+        result = wifi_control.get_visible_client_networks(15)
+
+        # Then
+        self.assertIsNone(result)
+        scanner.scan.assert_called_once_with(['network1'], ap_force=False, max_age=15)
+
+    def test_client_network_visible_without_scanner(self):
+        # Given
+        client_service, hotspot_service, platform, config = create_components()
+        wifi_control = WifiControl(client_service, hotspot_service, platform, config)
+
+        # When
+        result = wifi_control.is_client_network_visible()
+
+        # Then
+        self.assertTrue(result)
+        client_service.get_networks.assert_not_called()
+
+    def test_get_state_when_concurrent(self):
+        # Given
+        client_service, hotspot_service, platform, config = create_components()
+        config.concurrent = True
+        client_service.is_active.return_value = True
+        hotspot_service.is_active.return_value = True
+        wifi_control = WifiControl(client_service, hotspot_service, platform, config)
+
+        # When
+        result = wifi_control.get_state()
+
+        # Then
+        self.assertEqual(WifiControlState.CONCURRENT, result)
+
+    def test_get_status_when_concurrent_returns_client_status(self):
+        # Given
+        client_service, hotspot_service, platform, config = create_components()
+        config.concurrent = True
+        client_service.is_active.return_value = True
+        client_service.get_connected_ssid.return_value = 'test-network'
+        client_service.get_ip_address.return_value = '1.2.3.4'
+        client_service.get_mac_address.return_value = '11:22:33:44:55:66'
+        hotspot_service.is_active.return_value = True
+        wifi_control = WifiControl(client_service, hotspot_service, platform, config)
+
+        # When
+        result = wifi_control.get_status()
+
+        # Then
+        self.assertEqual({'ssid': 'test-network', 'ip': '1.2.3.4', 'mac': '11:22:33:44:55:66'}, result)
+
+    def test_start_client_mode_keeps_hotspot_running_when_concurrent(self):
+        # Given
+        client_service, hotspot_service, platform, config = create_components()
+        config.concurrent = True
+        client_service.is_active.return_value = False
+        hotspot_service.is_active.return_value = True
+        wifi_control = WifiControl(client_service, hotspot_service, platform, config)
+
+        # When
+        wifi_control.start_client_mode()
+
+        # Then
+        hotspot_service.stop.assert_not_called()
+        hotspot_service.start.assert_not_called()
+        client_service.start.assert_called_once()
+
+    def test_start_client_mode_starts_hotspot_when_concurrent(self):
+        # Given
+        client_service, hotspot_service, platform, config = create_components()
+        config.concurrent = True
+        client_service.is_active.return_value = False
+        hotspot_service.is_active.return_value = False
+        wifi_control = WifiControl(client_service, hotspot_service, platform, config)
+
+        # When
+        wifi_control.start_client_mode()
+
+        # Then
+        hotspot_service.start.assert_called_once()
+        client_service.start.assert_called_once()
+
+    def test_start_hotspot_mode_keeps_client_running_when_concurrent(self):
+        # Given
+        client_service, hotspot_service, platform, config = create_components()
+        config.concurrent = True
+        client_service.is_active.return_value = True
+        hotspot_service.is_active.return_value = True
+        wifi_control = WifiControl(client_service, hotspot_service, platform, config)
+
+        # When
+        wifi_control.start_hotspot_mode()
+
+        # Then
+        client_service.stop.assert_not_called()
+        hotspot_service.restart.assert_not_called()
+        hotspot_service.start.assert_not_called()
+
+    def test_follow_client_channel_when_concurrent(self):
+        # Given
+        client_service, hotspot_service, platform, config = create_components()
+        config.concurrent = True
+        hotspot_service.is_active.return_value = True
+        wifi_control = WifiControl(client_service, hotspot_service, platform, config)
+
+        # When
+        wifi_control.follow_client_channel()
+
+        # Then
+        hotspot_service.follow_client_channel.assert_called_once()
+
+    def test_does_not_follow_client_channel_when_not_concurrent(self):
+        # Given
+        client_service, hotspot_service, platform, config = create_components()
+        hotspot_service.is_active.return_value = True
+        wifi_control = WifiControl(client_service, hotspot_service, platform, config)
+
+        # When
+        wifi_control.follow_client_channel()
+
+        # Then
+        hotspot_service.follow_client_channel.assert_not_called()
+
 
 def create_components():
     client = MagicMock(spec=WifiClientService)
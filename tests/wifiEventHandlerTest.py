@@ -1,3 +1,4 @@
+import math
 import unittest
 from unittest import TestCase, mock
 from unittest.mock import MagicMock
@@ -7,7 +8,16 @@ from context_logger import setup_logging
 from wifi_config import WifiNetwork
 from wifi_connection import IConnectionMonitor
 from wifi_event import WifiEventType
-from wifi_manager import WifiEventHandler, IReusableTimer, IWifiControl, WifiControlState
+from wifi_manager import (
+    WifiEventHandler,
+    IReusableTimer,
+    IWifiControl,
+    WifiControlState,
+    NetworkHistory,
+    NetworkRanker,
+    ClientTimeoutConfig,
+    NetworkWatcher,
+)
 from wifi_utility import IBlinkControl
 
 
@@ -68,6 +78,65 @@ class WifiEventHandlerTest(TestCase):
         timer.start.assert_called_once_with(15, event_handler._on_client_connect_timeout)
         monitor.stop.assert_called_once()
 
+    def test_timer_started_with_learned_timeout_when_client_started(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+        wifi_control.get_networks.return_value = [WifiNetwork('"network1"', '"password1"', True, 0),
+                                                  WifiNetwork('"network2"', '"password2"', False, 0)]
+        network_history = MagicMock(spec=NetworkHistory)
+        network_history.get_connect_time_percentile.return_value = 4.0
+        timeout_config = ClientTimeoutConfig(5, 60, 95, 1.5)
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout,
+                                         network_history, client_timeout_config=timeout_config)
+
+        # When
+        event_handler._on_client_started(WifiEventType.CLIENT_STARTED, None)
+
+        # Then
+        timer.start.assert_called_once_with(6, event_handler._on_client_connect_timeout)
+        network_history.get_connect_time_percentile.assert_called_once_with(['network1'], 95, 3)
+
+    def test_learned_timeout_limited_to_minimum_and_maximum(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+        wifi_control.get_networks.return_value = [WifiNetwork('network1', 'password1', True, 0)]
+        network_history = MagicMock(spec=NetworkHistory)
+        timeout_config = ClientTimeoutConfig(10, 60, 95, 1.5)
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout,
+                                         network_history, client_timeout_config=timeout_config)
+
+        # When
+        network_history.get_connect_time_percentile.return_value = 2.0
+        minimum = event_handler._get_client_timeout()
+        network_history.get_connect_time_percentile.return_value = 50.0
+        maximum = event_handler._get_client_timeout()
+        network_history.get_connect_time_percentile.return_value = math.inf
+        overflow = event_handler._get_client_timeout()
+
+        # Then
+        self.assertEqual(10, minimum)
+        self.assertEqual(60, maximum)
+        self.assertEqual(60, overflow)
+
+    def test_static_timeout_used_when_connect_durations_not_learned(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+        wifi_control.get_networks.return_value = [WifiNetwork('network1', 'password1', True, 0)]
+        network_history = MagicMock(spec=NetworkHistory)
+        network_history.get_connect_time_percentile.return_value = None
+        timeout_config = ClientTimeoutConfig(5, 60)
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout,
+                                         network_history, client_timeout_config=timeout_config)
+
+        # When
+        event_handler._on_client_not_connected(WifiEventType.CLIENT_SCANNING, None)
+
+        # Then
+        timer.start.assert_called_once_with(15, event_handler._on_client_connect_timeout)
+
     def test_hotspot_started_when_connecting_timed_out(self):
         # Given
         wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
@@ -106,6 +175,109 @@ class WifiEventHandlerTest(TestCase):
         # Then
         timer.cancel.assert_called_once()
 
+    def test_hotspot_follows_client_channel_when_client_connected_and_concurrent(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks(
+            WifiControlState.CONCURRENT)
+        wifi_control.supports_concurrent_mode.return_value = True
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
+
+        # When
+        event_handler._on_client_connected(WifiEventType.CLIENT_CONNECTED, {})
+
+        # Then
+        wifi_control.follow_client_channel.assert_called_once()
+
+    def test_timer_started_when_client_started_and_concurrent(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks(
+            WifiControlState.CONCURRENT)
+        wifi_control.supports_concurrent_mode.return_value = True
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
+
+        # When
+        event_handler._on_client_started(WifiEventType.CLIENT_STARTED, None)
+
+        # Then
+        timer.start.assert_called_once_with(15, event_handler._on_client_connect_timeout)
+
+    def test_history_recorded_when_client_connected(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+        wifi_control.get_status.return_value = {'ssid': 'test-network', 'ip': None, 'mac': '00:11:22:33:44:55'}
+        network_history = MagicMock(spec=NetworkHistory)
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout,
+                                         network_history)
+
+        # When
+        event_handler._on_client_connected(WifiEventType.CLIENT_CONNECTED, {})
+
+        # Then
+        network_history.record_connected.assert_called_once_with('test-network')
+
+    def test_history_recorded_when_client_ip_acquired(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+        wifi_control.get_status.return_value = {'ssid': 'test-network', 'ip': '1.2.3.4', 'mac': '00:11:22:33:44:55'}
+        network_history = MagicMock(spec=NetworkHistory)
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout,
+                                         network_history)
+
+        # When
+        event_handler._on_client_ip_acquired(WifiEventType.CLIENT_IP_ACQUIRED, {})
+
+        # Then
+        network_history.record_ip_acquired.assert_called_once_with('test-network')
+
+    def test_history_recorded_when_client_disconnected(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+        network_history = MagicMock(spec=NetworkHistory)
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout,
+                                         network_history)
+
+        # When
+        event_handler._on_client_not_connected(WifiEventType.CLIENT_DISCONNECTED, {})
+
+        # Then
+        network_history.record_disconnected.assert_called_once()
+        network_history.start_attempt.assert_called_once()
+
+    def test_history_recorded_when_client_connect_timed_out(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+        network_history = MagicMock(spec=NetworkHistory)
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout,
+                                         network_history)
+
+        # When
+        event_handler._on_client_connect_timeout()
+
+        # Then
+        network_history.record_timeout.assert_called_once()
+
+    def test_ranker_started_and_stopped(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+        network_ranker = MagicMock(spec=NetworkRanker)
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout,
+                                         network_ranker=network_ranker)
+
+        # When
+        event_handler.register_event_handlers()
+        event_handler.shutdown()
+
+        # Then
+        network_ranker.start.assert_called_once()
+        network_ranker.stop.assert_called_once()
+
     def test_monitor_started_when_client_ip_acquire(self):
         # Given
         wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
@@ -135,6 +307,82 @@ class WifiEventHandlerTest(TestCase):
         timer.start.assert_called_once_with(120, event_handler._on_peer_connect_timeout)
         monitor.stop.assert_called_once()
 
+    def test_client_left_running_when_hotspot_started_and_concurrent(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks(
+            WifiControlState.CONCURRENT)
+        wifi_control.supports_concurrent_mode.return_value = True
+        wifi_control.get_network_count.return_value = 3
+        network_watcher = MagicMock(spec=NetworkWatcher)
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout,
+                                         network_watcher=network_watcher)
+
+        # When
+        event_handler._on_hotspot_started(WifiEventType.HOTSPOT_STARTED, {})
+
+        # Then
+        timer.start.assert_not_called()
+        monitor.stop.assert_not_called()
+        network_watcher.start.assert_not_called()
+
+    def test_network_watcher_started_when_hotspot_started(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks(
+            WifiControlState.HOTSPOT)
+        wifi_control.get_network_count.return_value = 1
+        network_watcher = MagicMock(spec=NetworkWatcher)
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout,
+                                         network_watcher=network_watcher)
+
+        # When
+        event_handler._on_hotspot_started(WifiEventType.HOTSPOT_STARTED, {})
+
+        # Then
+        network_watcher.start.assert_called_once_with(event_handler._on_client_network_visible)
+
+    def test_network_watcher_stopped_when_peer_connected(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks(
+            WifiControlState.HOTSPOT)
+        network_watcher = MagicMock(spec=NetworkWatcher)
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout,
+                                         network_watcher=network_watcher)
+
+        # When
+        event_handler._on_peer_connected(WifiEventType.HOTSPOT_PEER_CONNECTED, {})
+
+        # Then
+        network_watcher.stop.assert_called_once()
+
+    def test_client_started_when_stored_network_visible_in_hotspot_mode(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks(
+            WifiControlState.HOTSPOT)
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
+
+        # When
+        event_handler._on_client_network_visible()
+
+        # Then
+        timer.cancel.assert_called_once()
+        wifi_control.start_client_mode.assert_called_once()
+
+    def test_stored_network_visible_ignored_when_not_in_hotspot_mode(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
+
+        # When
+        event_handler._on_client_network_visible()
+
+        # Then
+        wifi_control.start_client_mode.assert_not_called()
+
     def test_timer_not_started_when_hotspot_started_and_no_networks_configured(self):
         # Given
         wifi_status = {'ssid': 'er-edge-12345678', 'ip': '192.168.100.1', 'mac': '00:11:22:33:44:55'}
@@ -166,7 +414,8 @@ class WifiEventHandlerTest(TestCase):
 
     def test_client_started_when_peer_connect_timed_out(self):
         # Given
-        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks(
+            WifiControlState.HOTSPOT)
 
         event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
 
@@ -176,9 +425,25 @@ class WifiEventHandlerTest(TestCase):
         # Then
         wifi_control.start_client_mode.assert_called_once()
 
+    def test_hotspot_kept_when_peer_connect_timed_out_and_no_networks_in_range(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks(
+            WifiControlState.HOTSPOT)
+        wifi_control.is_client_network_visible.return_value = False
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
+
+        # When
+        event_handler._on_peer_connect_timeout()
+
+        # Then
+        wifi_control.start_client_mode.assert_not_called()
+        timer.restart.assert_called_once()
+
     def test_timer_restarted_when_peer_connect_timed_out_and_failed_to_start_client(self):
         # Given
-        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks(
+            WifiControlState.HOTSPOT)
         wifi_control.start_client_mode.side_effect = Exception('Failed to start client')
 
         event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
@@ -246,6 +511,58 @@ class WifiEventHandlerTest(TestCase):
         # Then
         timer.restart.assert_called_once()
 
+    def test_hotspot_kept_when_peer_disconnected_and_no_networks_in_range(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = (
+            create_mocks(WifiControlState.HOTSPOT))
+        wifi_control.is_client_network_visible.return_value = False
+        network_watcher = MagicMock(spec=NetworkWatcher)
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout,
+                                         network_watcher=network_watcher)
+
+        # When
+        event_handler._on_peer_disconnected(WifiEventType.HOTSPOT_PEER_DISCONNECTED,
+                                            {'name': 'test-peer', 'ip': '1.2.3.4', 'mac': '00:11:22:33:44:55'})
+
+        # Then
+        wifi_control.start_client_mode.assert_not_called()
+        timer.restart.assert_called_once()
+        network_watcher.start.assert_called_once_with(event_handler._on_client_network_visible)
+
+    def test_network_watcher_restarted_when_network_visible_and_failed_to_start_client(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks(
+            WifiControlState.HOTSPOT)
+        wifi_control.start_client_mode.side_effect = Exception('Failed to start client')
+        network_watcher = MagicMock(spec=NetworkWatcher)
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout,
+                                         network_watcher=network_watcher)
+
+        # When
+        event_handler._on_client_network_visible()
+
+        # Then
+        timer.restart.assert_called_once()
+        network_watcher.start.assert_called_once_with(event_handler._on_client_network_visible)
+
+    def test_client_started_once_when_network_visible_and_peer_connect_timed_out(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks(
+            WifiControlState.HOTSPOT)
+        wifi_control.start_client_mode.side_effect = (
+            lambda: setattr(wifi_control.get_state, 'return_value', WifiControlState.CLIENT))
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
+
+        # When
+        event_handler._on_client_network_visible()
+        event_handler._on_peer_connect_timeout()
+
+        # Then
+        wifi_control.start_client_mode.assert_called_once()
+
     def test_network_added_with_properties_enabled_and_priority(self):
         # Given
         wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
@@ -294,6 +611,36 @@ class WifiEventHandlerTest(TestCase):
     def test_client_started_when_adding_network_completed(self):
         # Given
         wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+        wifi_control.supports_live_reconfiguration.return_value = False
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
+
+        # When
+        event_handler.on_add_network_completed()
+
+        # Then
+        wifi_control.start_client_mode.assert_called_once()
+        timer.cancel.assert_called_once()
+
+    def test_client_not_restarted_when_adding_network_completed_and_live_reconfiguration_supported(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+        wifi_control.supports_live_reconfiguration.return_value = True
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
+
+        # When
+        event_handler.on_add_network_completed()
+
+        # Then
+        wifi_control.start_client_mode.assert_not_called()
+        timer.cancel.assert_not_called()
+
+    def test_client_started_when_adding_network_completed_in_hotspot_mode(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = (
+            create_mocks(WifiControlState.HOTSPOT))
+        wifi_control.supports_live_reconfiguration.return_value = True
 
         event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
 
@@ -307,6 +654,7 @@ class WifiEventHandlerTest(TestCase):
     def test_timer_restarted_when_adding_network_completed_but_failed_to_start_client(self):
         # Given
         wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+        wifi_control.supports_live_reconfiguration.return_value = False
         wifi_control.start_client_mode.side_effect = Exception('Failed to start client')
 
         event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
@@ -369,12 +717,126 @@ class WifiEventHandlerTest(TestCase):
         # Then
         blink_control.blink.assert_called_once()
 
+    def test_networks_updated_in_single_batch(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+        wifi_control.get_network_count.return_value = 2
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
+        batch = {
+            'networks': [
+                {'ssid': 'site-1', 'password': 'password-1', 'priority': 10},
+                {'ssid': 'site-2', 'password': 'password-2'},
+                {'ssid': 'site-3', 'password': 'password-3', 'enabled': False}
+            ],
+            'remove': ['old-site']
+        }
+
+        # When
+        result = event_handler.on_update_networks_requested(batch)
+
+        # Then
+        self.assertEqual(3, result['added'])
+        self.assertEqual(1, result['removed'])
+        self.assertIn('duration_ms', result)
+        wifi_control.update_networks.assert_called_once_with([
+            WifiNetwork('site-1', 'password-1', True, 10),
+            WifiNetwork('site-2', 'password-2', True, 2),
+            WifiNetwork('site-3', 'password-3', False, 3)
+        ], ['old-site'])
+        wifi_control.add_network.assert_not_called()
+
+    def test_history_removed_for_networks_removed_in_batch(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+        network_history = MagicMock(spec=NetworkHistory)
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout,
+                                         network_history)
+
+        # When
+        event_handler.on_update_networks_requested({'remove': ['site-1', 'site-2']})
+
+        # Then
+        network_history.remove.assert_has_calls([mock.call('site-1'), mock.call('site-2')])
+
+    def test_network_batch_rejected_when_any_password_is_too_short(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
+        batch = {'networks': [{'ssid': 'site-1', 'password': 'password-1'}, {'ssid': 'site-2', 'password': 'short'}]}
+
+        # When
+        result = event_handler.on_update_networks_requested(batch)
+
+        # Then
+        self.assertIsNone(result)
+        wifi_control.update_networks.assert_not_called()
+
+    def test_network_batch_rejected_when_failed_to_update_networks(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+        wifi_control.update_networks.side_effect = Exception('Failed to update networks')
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
+
+        # When
+        result = event_handler.on_update_networks_requested({'remove': ['old-site']})
+
+        # Then
+        self.assertIsNone(result)
+
+    def test_network_batch_rejected_when_enabled_flag_is_not_boolean(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
+        batch = {'networks': [{'ssid': 'site-1', 'password': 'password-1', 'enabled': 'false'}]}
+
+        # When
+        result = event_handler.on_update_networks_requested(batch)
+
+        # Then
+        self.assertIsNone(result)
+        wifi_control.update_networks.assert_not_called()
+
+    def test_client_not_restarted_when_network_batch_completed_and_live_reconfiguration_supported(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks()
+        wifi_control.supports_live_reconfiguration.return_value = True
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
+
+        # When
+        event_handler.on_update_networks_completed()
+
+        # Then
+        wifi_control.start_client_mode.assert_not_called()
+
+    def test_client_started_once_when_network_batch_completed(self):
+        # Given
+        wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout = create_mocks(
+            WifiControlState.HOTSPOT)
+        wifi_control.supports_live_reconfiguration.return_value = True
+
+        event_handler = WifiEventHandler(wifi_control, blink_control, timer, monitor, client_timeout, peer_timeout)
+
+        # When
+        event_handler.on_update_networks_completed()
+
+        # Then
+        wifi_control.start_client_mode.assert_called_once()
+        timer.cancel.assert_called_once()
+
 
 def create_mocks(wifi_state: WifiControlState = WifiControlState.CLIENT):
     client_timeout = 15
     peer_timeout = 120
     wifi_control = MagicMock(spec=IWifiControl)
     wifi_control.get_state.return_value = wifi_state
+    wifi_control.is_client_network_visible.return_value = True
+    wifi_control.supports_concurrent_mode.return_value = False
     blink_control = MagicMock(spec=IBlinkControl)
     monitor = MagicMock(spec=IConnectionMonitor)
     return wifi_control, blink_control, MagicMock(spec=IReusableTimer), monitor, client_timeout, peer_timeout
@@ -43,7 +43,7 @@ class WifiManagerIntegrationTest(TestCase):
         print()
         delete_directory(TEST_FILE_SYSTEM_ROOT)
 
-    def test_application_shuts_down_when_fails_to_add_event_handler_to_network_manager(self):
+    def test_application_keeps_running_while_waiting_for_wireless_device(self):
         # Given
         platform, systemd, timer = setup_mocks()
         services, wifi_control, event_handler, monitor, web_server = setup_components(platform, systemd, timer)
@@ -53,10 +53,14 @@ class WifiManagerIntegrationTest(TestCase):
 
         with WifiManager(services, wifi_control, event_handler, monitor, web_server) as wifi_manager:
             # When
-            wifi_manager.run()
+            Thread(target=wifi_manager.run).start()
 
             # Then
-            self.assertFalse(web_server.is_running())
+            wait_for_initialization(web_server)
+            self.assertTrue(nm_dbus._device_waiter.is_waiting())
+            nm_dbus._client.connect.assert_any_call('device-added', nm_dbus._on_device_added)
+
+        nm_dbus._device_waiter.stop()
 
     def test_dnsmasq_config_reloaded_and_initialization_completed(self):
         # Given
@@ -282,7 +286,7 @@ def setup_components(platform: IPlatformAccess, systemd: Systemd, timer: IReusab
     wifi_device.get_iface.return_value = interface
     nm_client = MagicMock(spec=NM.Client)
     nm_client.get_devices.return_value = [wifi_device]
-    nm_dbus = NetworkManagerDbus(interface, nm_client, 3, 0.1)
+    nm_dbus = NetworkManagerDbus(interface, nm_client, device_timeout=3)
 
     nm_config = NetworkManagerConfig(interface, config_file=nm_config_file, network_dir=network_config_dir)
     dnsmasq_config = DnsmasqConfig(interface, hotspot_ip, dhcp_range, server_port)
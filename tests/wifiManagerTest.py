@@ -7,7 +7,7 @@ from context_logger import setup_logging
 from wifi_connection import IConnectionMonitor
 from wifi_event import WifiEventType
 from wifi_manager import WifiManager, IWebServer, WifiControlState, IWifiControl, IEventHandler
-from wifi_service import IService, ServiceError
+from wifi_service import IService, ServiceError, SetupTransaction
 
 
 class WifiManagerTest(TestCase):
@@ -53,6 +53,32 @@ class WifiManagerTest(TestCase):
         service1.setup.assert_called_once()
         service2.setup.assert_called_once()
 
+    def test_setup_service_units_in_one_transaction(self):
+        # Given
+        services, wifi_control, event_handler, monitor, web_server = create_mocks()
+        service1 = MagicMock(spec=IService)
+        service1.get_name.return_value = 'service1'
+        service2 = MagicMock(spec=IService)
+        service2.get_name.return_value = 'service2'
+        services = {
+            service1.get_name(): service1,
+            service2.get_name(): service2
+        }
+        setup_transaction = MagicMock(spec=SetupTransaction)
+        setup_transaction.__enter__.return_value = setup_transaction
+
+        with WifiManager(services, wifi_control, event_handler, monitor, web_server,
+                         setup_transaction) as wifi_manager:
+            # When
+            wifi_manager.run()
+
+        # Then
+        service1.setup_units.assert_called_once_with(setup_transaction)
+        service2.setup_units.assert_called_once_with(setup_transaction)
+        setup_transaction.__exit__.assert_called_once()
+        service1.setup.assert_called_once()
+        service2.setup.assert_called_once()
+
     def test_shutting_down_when_fatal_service_error_raised(self):
         # Given
         services, wifi_control, event_handler, monitor, web_server = create_mocks()
@@ -138,6 +164,19 @@ class WifiManagerTest(TestCase):
             # Then
             wifi_control.start_client_mode.assert_called()
 
+    def test_hotspot_mode_started_when_no_stored_networks_in_range(self):
+        # Given
+        services, wifi_control, event_handler, monitor, web_server = create_mocks()
+        wifi_control.is_client_network_visible.return_value = False
+
+        with WifiManager(services, wifi_control, event_handler, monitor, web_server) as wifi_manager:
+            # When
+            wifi_manager.run()
+
+            # Then
+            wifi_control.start_client_mode.assert_not_called()
+            wifi_control.start_hotspot_mode.assert_called_once()
+
     def test_client_mode_restarted_when_in_client_mode_and_no_ip_address(self):
         # Given
         wifi_status = {'ssid': 'test-network', 'ip': None, 'mac': '00:11:22:33:44:55'}
@@ -177,12 +216,43 @@ class WifiManagerTest(TestCase):
             wifi_control.start_client_mode.assert_not_called()
             monitor.start.assert_called()
 
+    def test_hotspot_started_alongside_connected_client_when_concurrent(self):
+        # Given
+        wifi_status = {'ssid': 'test-network', 'ip': '1.2.3.4', 'mac': '00:11:22:33:44:55'}
+        services, wifi_control, event_handler, monitor, web_server = create_mocks(wifi_status=wifi_status)
+        wifi_control.supports_concurrent_mode.return_value = True
+
+        with WifiManager(services, wifi_control, event_handler, monitor, web_server) as wifi_manager:
+            # When
+            wifi_manager.run()
+
+            # Then
+            wifi_control.start_client_mode.assert_not_called()
+            wifi_control.start_hotspot_mode.assert_called_once()
+            monitor.start.assert_called()
+
+    def test_client_mode_started_when_concurrent_and_no_stored_networks_in_range(self):
+        # Given
+        services, wifi_control, event_handler, monitor, web_server = create_mocks()
+        wifi_control.supports_concurrent_mode.return_value = True
+        wifi_control.is_client_network_visible.return_value = False
+
+        with WifiManager(services, wifi_control, event_handler, monitor, web_server) as wifi_manager:
+            # When
+            wifi_manager.run()
+
+            # Then
+            wifi_control.start_client_mode.assert_called_once()
+            wifi_control.start_hotspot_mode.assert_not_called()
+
 
 def create_mocks(wifi_state=WifiControlState.CLIENT, wifi_status=None):
     wifi_control = MagicMock(spec=IWifiControl)
     wifi_control.get_state.return_value = wifi_state
     wifi_control.get_status.return_value = wifi_status
     wifi_control.is_hotspot_ip_set.return_value = False
+    wifi_control.is_client_network_visible.return_value = True
+    wifi_control.supports_concurrent_mode.return_value = False
     return {}, wifi_control, MagicMock(spec=IEventHandler), MagicMock(spec=IConnectionMonitor), MagicMock(
         spec=IWebServer)
 
@@ -0,0 +1,205 @@
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock, call
+
+from context_logger import setup_logging
+
+from wifi_utility import WifiScanner, IPlatformAccess
+
+SCAN_OUTPUT = b'''BSS 00:11:22:33:44:55(on wlan0)
+\tTSF: 1234 usec (0d, 00:00:00)
+\tfreq: 2412
+\tsignal: -67.00 dBm
+\tlast seen: 10 ms ago
+\tSSID: network1
+BSS 00:11:22:33:44:66(on wlan0)
+\tfreq: 5180
+\tsignal: -52.00 dBm
+\tSSID: network1
+BSS 00:11:22:33:44:77(on wlan0) -- associated
+\tfreq: 2437
+\tsignal: -71.00 dBm
+\tSSID: caf\\xc3\\xa9
+BSS 00:11:22:33:44:88(on wlan0)
+\tfreq: 2462
+\tsignal: -80.00 dBm
+\tSSID:
+'''
+
+
+class WifiScannerTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+
+    def test_scans_for_requested_networks(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        platform.execute_command.return_value = SCAN_OUTPUT
+        wifi_scanner = WifiScanner(platform, 'wlan0')
+
+        # When
+        result = wifi_scanner.scan(['network1', 'my network'])
+
+        # Then
+        self.assertEqual({'network1': -52, 'café': -71}, result.networks)
+        platform.execute_command.assert_called_once_with("iw dev wlan0 scan ssid network1 'my network'")
+
+    def test_scans_with_ap_force_in_hotspot_mode(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        platform.execute_command.return_value = b''
+        wifi_scanner = WifiScanner(platform, 'wlan0')
+
+        # When
+        wifi_scanner.scan(['network1'], ap_force=True)
+
+        # Then
+        platform.execute_command.assert_called_once_with('iw dev wlan0 scan ap-force ssid network1')
+
+    def test_retries_without_ap_force_when_rejected(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        platform.execute_command.side_effect = [Exception('Operation not supported'), SCAN_OUTPUT]
+        wifi_scanner = WifiScanner(platform, 'wlan0')
+
+        # When
+        result = wifi_scanner.scan(['network1'], ap_force=True)
+
+        # Then
+        self.assertEqual({'network1': -52, 'café': -71}, result.networks)
+        platform.execute_command.assert_has_calls([call('iw dev wlan0 scan ap-force ssid network1'),
+                                                   call('iw dev wlan0 scan ssid network1')])
+
+    def test_scans_via_scan_source(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        scan_source = MagicMock(return_value={'network1': -48})
+        wifi_scanner = WifiScanner(platform, 'wlan0', scan_source=scan_source)
+
+        # When
+        result = wifi_scanner.scan(['network1'], ap_force=True)
+
+        # Then
+        self.assertEqual({'network1': -48}, result.networks)
+        scan_source.assert_called_once_with(['network1'])
+        platform.execute_command.assert_not_called()
+
+    def test_scans_with_iw_when_scan_source_not_available(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        platform.execute_command.return_value = SCAN_OUTPUT
+        scan_source = MagicMock(return_value=None)
+        wifi_scanner = WifiScanner(platform, 'wlan0', scan_source=scan_source)
+
+        # When
+        result = wifi_scanner.scan(['network1'])
+
+        # Then
+        self.assertEqual({'network1': -52, 'café': -71}, result.networks)
+        platform.execute_command.assert_called_once_with('iw dev wlan0 scan ssid network1')
+
+    def test_scans_with_iw_when_scan_source_failed(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        platform.execute_command.return_value = SCAN_OUTPUT
+        scan_source = MagicMock(side_effect=Exception('Interface unknown'))
+        wifi_scanner = WifiScanner(platform, 'wlan0', scan_source=scan_source)
+
+        # When
+        result = wifi_scanner.scan(['network1'])
+
+        # Then
+        self.assertEqual({'network1': -52, 'café': -71}, result.networks)
+
+    def test_returns_cached_result_when_fresh(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        platform.execute_command.return_value = SCAN_OUTPUT
+        wifi_scanner = WifiScanner(platform, 'wlan0', 30)
+        expected = wifi_scanner.scan(['network1', 'network2'])
+
+        # When
+        result = wifi_scanner.scan(['network2'])
+
+        # Then
+        self.assertIs(expected, result)
+        self.assertIs(expected, wifi_scanner.get_cached_result())
+        platform.execute_command.assert_called_once()
+
+    def test_scans_again_when_cached_result_expired(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        platform.execute_command.return_value = SCAN_OUTPUT
+        wifi_scanner = WifiScanner(platform, 'wlan0', 0)
+        wifi_scanner.scan(['network1'])
+        wifi_scanner._result.timestamp -= 1
+
+        # When
+        wifi_scanner.scan(['network1'])
+
+        # Then
+        self.assertEqual(2, platform.execute_command.call_count)
+        self.assertIsNone(wifi_scanner.get_cached_result())
+
+    def test_scans_again_when_cached_result_older_than_max_age(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        platform.execute_command.return_value = SCAN_OUTPUT
+        wifi_scanner = WifiScanner(platform, 'wlan0', 30)
+        wifi_scanner.scan(['network1'])
+        wifi_scanner._result.timestamp -= 20
+
+        # When
+        wifi_scanner.scan(['network1'], max_age=15)
+
+        # Then
+        self.assertEqual(2, platform.execute_command.call_count)
+
+    def test_scans_again_when_cached_result_does_not_cover_requested_networks(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        platform.execute_command.return_value = SCAN_OUTPUT
+        wifi_scanner = WifiScanner(platform, 'wlan0', 30)
+        wifi_scanner.scan(['network1'])
+
+        # When
+        wifi_scanner.scan(['network1', 'network2'])
+
+        # Then
+        self.assertEqual(2, platform.execute_command.call_count)
+
+    def test_notifies_result_handlers(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        platform.execute_command.return_value = SCAN_OUTPUT
+        wifi_scanner = WifiScanner(platform, 'wlan0')
+        handler = MagicMock()
+        wifi_scanner.add_result_handler(handler)
+
+        # When
+        wifi_scanner.scan(['network1'])
+
+        # Then
+        handler.assert_called_once_with({'network1': -52, 'café': -71})
+
+    def test_returns_none_when_scan_failed(self):
+        # Given
+        platform = MagicMock(spec=IPlatformAccess)
+        platform.execute_command.side_effect = Exception('Device or resource busy')
+        wifi_scanner = WifiScanner(platform, 'wlan0')
+
+        # When
+        result = wifi_scanner.scan(['network1'])
+
+        # Then
+        self.assertIsNone(result)
+        self.assertIsNone(wifi_scanner.get_cached_result())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -381,6 +381,120 @@ class WifiWebServerTest(TestCase):
             platform.execute_command.assert_called_with('abc')
             self.assertIn('Exit code: <span class="result">1</span>', response.text)
 
+    def test_returned_200_and_timing_when_networks_updated_by_api(self):
+        # Given
+        configuration = create_configuration()
+        platform, event_handler = create_mocks()
+        event_handler.on_update_networks_requested.return_value = {'added': 2, 'removed': 1, 'duration_ms': 1.5}
+
+        with WifiWebServer(configuration, platform, event_handler, []) as web_server:
+            client = web_server._app.test_client()
+            Thread(target=web_server.run).start()
+
+            # When
+            response = client.post('/api/networks', json={
+                'networks': [
+                    {'ssid': 'site-1', 'password': 'password-1'},
+                    {'ssid': 'site-2', 'password': 'password-2'}
+                ],
+                'remove': ['old-site']
+            })
+
+            # Then
+            event_handler.on_update_networks_requested.assert_called_once_with({
+                'networks': [
+                    {'ssid': 'site-1', 'password': 'password-1'},
+                    {'ssid': 'site-2', 'password': 'password-2'}
+                ],
+                'remove': ['old-site']
+            })
+            self.assertEqual(200, response.status_code)
+            self.assertEqual({'added': 2, 'removed': 1, 'duration_ms': 1.5}, response.json)
+            wait_for_assertion(1, event_handler.on_update_networks_completed.assert_called_once)
+            event_handler.on_add_network_completed.assert_not_called()
+
+    def test_returned_200_when_networks_removed_by_api(self):
+        # Given
+        configuration = create_configuration()
+        platform, event_handler = create_mocks()
+        event_handler.on_update_networks_requested.return_value = {'added': 0, 'removed': 2, 'duration_ms': 1.0}
+
+        with WifiWebServer(configuration, platform, event_handler, []) as web_server:
+            client = web_server._app.test_client()
+            Thread(target=web_server.run).start()
+
+            # When
+            response = client.delete('/api/networks', json={'ssids': ['site-1', 'site-2']})
+
+            # Then
+            event_handler.on_update_networks_requested.assert_called_once_with({'remove': ['site-1', 'site-2']})
+            self.assertEqual(200, response.status_code)
+
+    def test_returned_400_when_network_batch_rejected(self):
+        # Given
+        configuration = create_configuration()
+        platform, event_handler = create_mocks()
+        event_handler.on_update_networks_requested.return_value = None
+
+        with WifiWebServer(configuration, platform, event_handler, []) as web_server:
+            client = web_server._app.test_client()
+            Thread(target=web_server.run).start()
+
+            # When
+            response = client.post('/api/networks', json={'networks': [{'ssid': 'site-1', 'password': 'short'}]})
+
+            # Then
+            self.assertEqual(400, response.status_code)
+            event_handler.on_update_networks_completed.assert_not_called()
+
+    def test_returned_400_when_removed_ssids_is_not_a_list(self):
+        # Given
+        configuration = create_configuration()
+        platform, event_handler = create_mocks()
+
+        with WifiWebServer(configuration, platform, event_handler, []) as web_server:
+            client = web_server._app.test_client()
+            Thread(target=web_server.run).start()
+
+            # When
+            response = client.delete('/api/networks', json={'ssids': 'site-1'})
+
+            # Then
+            self.assertEqual(400, response.status_code)
+            event_handler.on_update_networks_requested.assert_not_called()
+
+    def test_returned_400_when_remove_field_contains_non_string(self):
+        # Given
+        configuration = create_configuration()
+        platform, event_handler = create_mocks()
+
+        with WifiWebServer(configuration, platform, event_handler, []) as web_server:
+            client = web_server._app.test_client()
+            Thread(target=web_server.run).start()
+
+            # When
+            response = client.post('/api/networks', json={'networks': [], 'remove': ['site-1', 2]})
+
+            # Then
+            self.assertEqual(400, response.status_code)
+            event_handler.on_update_networks_requested.assert_not_called()
+
+    def test_returned_400_when_remove_field_is_a_string(self):
+        # Given
+        configuration = create_configuration()
+        platform, event_handler = create_mocks()
+
+        with WifiWebServer(configuration, platform, event_handler, []) as web_server:
+            client = web_server._app.test_client()
+            Thread(target=web_server.run).start()
+
+            # When
+            response = client.post('/api/networks', json={'remove': 'old-site'})
+
+            # Then
+            self.assertEqual(400, response.status_code)
+            event_handler.on_update_networks_requested.assert_not_called()
+
 
 def create_configuration(hotspot_ip='192.168.100.1', server_port=0):
     return WebServerConfig(hotspot_ip, server_port, RESOURCE_ROOT)
@@ -1,5 +1,7 @@
+import os
 import unittest
 from unittest import TestCase
+from unittest.mock import MagicMock
 
 from common_utility import delete_directory, copy_file
 from context_logger import setup_logging
@@ -8,6 +10,7 @@ from test_utility import compare_files
 from tests import TEST_FILE_SYSTEM_ROOT, TEST_RESOURCE_ROOT
 from wifi_config import WifiNetwork
 from wifi_config.wsConfig import WpaSupplicantConfig
+from wifi_utility import FileMonitor, AtomicFileWriter
 
 
 class WpaSupplicantConfigTest(TestCase):
@@ -92,6 +95,34 @@ class WpaSupplicantConfigTest(TestCase):
         # Then
         self.assertTrue(compare_files(self.get_expected_config_file('updated'), self.WS_CONFIG_FILE))
 
+    def test_add_network_does_not_rewrite_config_file_when_unchanged(self):
+        # Given
+        copy_file(self.SOURCE_WS_CONFIG_FILE, self.WS_CONFIG_FILE)
+        ws_config = WpaSupplicantConfig('HU', self.WS_CONFIG_FILE)
+        ws_config.add_network(WifiNetwork('test-network3', 'test-password3', True, 2))
+        os.utime(self.WS_CONFIG_FILE, ns=(0, 0))
+
+        # When
+        ws_config.add_network(WifiNetwork('test-network3', 'test-password3', True, 2))
+
+        # Then
+        self.assertEqual(0, os.stat(self.WS_CONFIG_FILE).st_mtime_ns)
+        self.assertTrue(compare_files(self.get_expected_config_file('added'), self.WS_CONFIG_FILE))
+
+    def test_add_network_writes_precomputed_psk_without_quotes(self):
+        # Given
+        copy_file(self.SOURCE_WS_CONFIG_FILE, self.WS_CONFIG_FILE)
+        ws_config = WpaSupplicantConfig('HU', self.WS_CONFIG_FILE)
+        psk = 'f42c6fc52df0ebef9ebb4b90b38a5f902e83fe1b135a70e23aed762e9710a12e'
+
+        # When
+        ws_config.add_network(WifiNetwork('IEEE', psk, True, 2))
+
+        # Then
+        with open(self.WS_CONFIG_FILE, 'r') as file:
+            self.assertIn(f'\tpsk={psk}\n', file.read())
+        self.assertEqual(WifiNetwork('"IEEE"', psk, True, 2), ws_config.get_network('IEEE'))
+
     def test_remove_network_removes_network_by_ssid(self):
         # Given
         copy_file(self.SOURCE_WS_CONFIG_FILE, self.WS_CONFIG_FILE)
@@ -136,6 +167,130 @@ class WpaSupplicantConfigTest(TestCase):
         # Then
         self.assertTrue(compare_files(self.get_expected_config_file('setup'), self.WS_CONFIG_FILE))
 
+    def test_get_networks_parses_config_file_once_when_unchanged(self):
+        # Given
+        copy_file(self.SOURCE_WS_CONFIG_FILE, self.WS_CONFIG_FILE)
+        ws_config = WpaSupplicantConfig('HU', self.WS_CONFIG_FILE)
+
+        # When
+        ws_config.get_networks()
+        ws_config.get_network('test-network1')
+        result = ws_config.get_network_count()
+
+        # Then
+        self.assertEqual(2, result)
+        self.assertEqual(1, ws_config.get_parse_count())
+
+    def test_get_networks_parses_config_file_again_when_changed_externally(self):
+        # Given
+        copy_file(self.SOURCE_WS_CONFIG_FILE, self.WS_CONFIG_FILE)
+        ws_config = WpaSupplicantConfig('HU', self.WS_CONFIG_FILE)
+        ws_config.get_networks()
+        with open(self.WS_CONFIG_FILE, 'a') as file:
+            file.write('\nnetwork={\n\tssid="test-network3"\n\tpsk="test-password3"\n}\n')
+
+        # When
+        result = ws_config.get_network_count()
+
+        # Then
+        self.assertEqual(3, result)
+        self.assertEqual(2, ws_config.get_parse_count())
+
+    def test_add_network_updates_cache_in_place(self):
+        # Given
+        copy_file(self.SOURCE_WS_CONFIG_FILE, self.WS_CONFIG_FILE)
+        ws_config = WpaSupplicantConfig('HU', self.WS_CONFIG_FILE)
+
+        # When
+        ws_config.add_network(WifiNetwork('test-network3', 'test-password3', True, 2))
+        ws_config.remove_network('test-network2')
+
+        # Then
+        self.assertEqual(WifiNetwork('"test-network3"', '"test-password3"', True, 2),
+                         ws_config.get_network('test-network3'))
+        self.assertEqual(2, ws_config.get_network_count())
+        self.assertEqual(1, ws_config.get_parse_count())
+
+    def test_get_networks_trusts_cache_while_monitored(self):
+        # Given
+        copy_file(self.SOURCE_WS_CONFIG_FILE, self.WS_CONFIG_FILE)
+        file_monitor = MagicMock(spec=FileMonitor)
+        file_monitor.is_active.return_value = True
+        ws_config = WpaSupplicantConfig('HU', self.WS_CONFIG_FILE, file_monitor)
+        ws_config.get_networks()
+        os.utime(self.WS_CONFIG_FILE, ns=(0, 0))
+
+        # When
+        ws_config.get_networks()
+
+        # Then
+        self.assertEqual(1, ws_config.get_parse_count())
+
+    def test_monitor_event_invalidates_cache_when_file_changed(self):
+        # Given
+        copy_file(self.SOURCE_WS_CONFIG_FILE, self.WS_CONFIG_FILE)
+        file_monitor = MagicMock(spec=FileMonitor)
+        file_monitor.is_active.return_value = True
+        ws_config = WpaSupplicantConfig('HU', self.WS_CONFIG_FILE, file_monitor)
+        ws_config.get_networks()
+        handler = file_monitor.add_handler.call_args.args[0]
+        os.remove(self.WS_CONFIG_FILE)
+
+        # When
+        handler(self.WS_CONFIG_FILE)
+
+        # Then
+        self.assertEqual(0, ws_config.get_network_count())
+
+    def test_monitor_event_keeps_cache_after_own_write(self):
+        # Given
+        copy_file(self.SOURCE_WS_CONFIG_FILE, self.WS_CONFIG_FILE)
+        file_monitor = MagicMock(spec=FileMonitor)
+        file_monitor.is_active.return_value = True
+        ws_config = WpaSupplicantConfig('HU', self.WS_CONFIG_FILE, file_monitor)
+        ws_config.add_network(WifiNetwork('test-network3', 'test-password3', True, 2))
+        handler = file_monitor.add_handler.call_args.args[0]
+
+        # When
+        handler(self.WS_CONFIG_FILE)
+
+        # Then
+        self.assertEqual(3, ws_config.get_network_count())
+        self.assertEqual(1, ws_config.get_parse_count())
+
+    def test_get_network_parses_config_file_once_for_repeated_lookups(self):
+        # Given
+        networks = [WifiNetwork(f'"network{index}"', '"password"', True, index) for index in range(100)]
+        os.makedirs(os.path.dirname(self.WS_CONFIG_FILE), exist_ok=True)
+        with open(self.WS_CONFIG_FILE, 'w') as file:
+            file.write(WpaSupplicantConfig('HU', self.WS_CONFIG_FILE)._render_config(networks))
+        ws_config = WpaSupplicantConfig('HU', self.WS_CONFIG_FILE)
+
+        # When
+        results = [ws_config.get_network('network99') for _ in range(10)]
+
+        # Then
+        self.assertTrue(all(result and result.priority == 99 for result in results))
+        self.assertEqual(100, ws_config.get_network_count())
+        self.assertEqual(1, ws_config.get_parse_count())
+
+    def test_update_networks_writes_config_file_once(self):
+        # Given
+        copy_file(self.SOURCE_WS_CONFIG_FILE, self.WS_CONFIG_FILE)
+        file_writer = AtomicFileWriter()
+        ws_config = WpaSupplicantConfig('HU', self.WS_CONFIG_FILE, file_writer=file_writer)
+
+        # When
+        ws_config.update_networks([
+            WifiNetwork('test-network3', 'test-password3', True, 2),
+            WifiNetwork('test-network4', 'test-password4', True, 3)
+        ], ['test-network2'])
+
+        # Then
+        self.assertEqual(1, file_writer.get_writes())
+        self.assertEqual(['"test-network1"', '"test-network3"', '"test-network4"'],
+                         [network.ssid for network in ws_config.get_networks()])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from context_logger import setup_logging
+import dbus
+from dbus import SystemBus
+
+from wifi_config import WifiNetwork
+from wifi_dbus import WpaSupplicantDbus, WpaSupplicantInterface, WpaSupplicantNetwork, DbusProxyCache
+
+NETWORK_PATH = '/fi/w1/wpa_supplicant1/Interfaces/0/Networks/0'
+
+
+class WpaSupplicantDbusTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        setup_logging('wifi-manager', 'DEBUG', warn_on_overwrite=False)
+
+    def setUp(self):
+        print()
+
+    def test_add_network_enables_network_without_disabling_others(self):
+        # Given
+        ws_dbus, dbus_interface, dbus_network = create_components()
+        dbus_interface.get_networks.return_value = []
+        dbus_interface.add_network.return_value = NETWORK_PATH
+
+        # When
+        ws_dbus.add_network(WifiNetwork('network1', 'password1', True, 1))
+
+        # Then
+        dbus_network.enable_network.assert_called_once_with(NETWORK_PATH)
+        dbus_interface.select_network.assert_not_called()
+
+    def test_add_network_does_not_enable_disabled_network(self):
+        # Given
+        ws_dbus, dbus_interface, dbus_network = create_components()
+        dbus_interface.get_networks.return_value = []
+        dbus_interface.add_network.return_value = NETWORK_PATH
+
+        # When
+        ws_dbus.add_network(WifiNetwork('network1', 'password1', False, 1))
+
+        # Then
+        dbus_network.enable_network.assert_not_called()
+        dbus_interface.select_network.assert_not_called()
+
+    def test_remove_network_passes_object_path(self):
+        # Given
+        proxy_cache = MagicMock(spec=DbusProxyCache)
+        interface = proxy_cache.get_interface.return_value
+        dbus_interface = WpaSupplicantInterface('wlan0', MagicMock(spec=SystemBus), proxy_cache)
+
+        # When
+        dbus_interface.remove_network(NETWORK_PATH)
+
+        # Then
+        interface.RemoveNetwork.assert_called_once_with(NETWORK_PATH)
+        self.assertIsInstance(interface.RemoveNetwork.call_args.args[0], dbus.ObjectPath)
+
+    def test_update_networks_removes_network_by_object_path(self):
+        # Given
+        ws_dbus, dbus_interface, dbus_network = create_components()
+        dbus_interface.get_networks.return_value = [dbus.ObjectPath(NETWORK_PATH)]
+        dbus_network.get_network_ssid.return_value = 'network1'
+
+        # When
+        ws_dbus.update_networks([], ['network1'])
+
+        # Then
+        dbus_interface.remove_network.assert_called_once_with(NETWORK_PATH)
+        self.assertIsInstance(dbus_interface.remove_network.call_args.args[0], dbus.ObjectPath)
+
+    def test_set_network_properties_sets_variant_property(self):
+        # Given
+        proxy_cache = MagicMock(spec=DbusProxyCache)
+        properties_interface = proxy_cache.get_interface.return_value
+        dbus_network = WpaSupplicantNetwork(MagicMock(spec=SystemBus), proxy_cache)
+
+        # When
+        dbus_network.set_network_properties(NETWORK_PATH, {'priority': '2'})
+
+        # Then
+        properties_interface.Set.assert_called_once_with(
+            'fi.w1.wpa_supplicant1.Network', 'Properties', {'priority': '2'}, signature='ssv')
+        self.assertEqual('sv', properties_interface.Set.call_args.args[2].signature)
+
+    def test_enable_network_sets_boolean_variant_property(self):
+        # Given
+        proxy_cache = MagicMock(spec=DbusProxyCache)
+        properties_interface = proxy_cache.get_interface.return_value
+        dbus_network = WpaSupplicantNetwork(MagicMock(spec=SystemBus), proxy_cache)
+
+        # When
+        dbus_network.enable_network(NETWORK_PATH)
+
+        # Then
+        properties_interface.Set.assert_called_once_with(
+            'fi.w1.wpa_supplicant1.Network', 'Enabled', True, signature='ssv')
+        self.assertIsInstance(properties_interface.Set.call_args.args[2], dbus.Boolean)
+
+
+def create_components():
+    ws_dbus = WpaSupplicantDbus('wlan0', MagicMock(spec=SystemBus))
+    dbus_interface = MagicMock(spec=WpaSupplicantInterface)
+    dbus_network = MagicMock(spec=WpaSupplicantNetwork)
+    ws_dbus._dbus_interface = dbus_interface
+    ws_dbus._dbus_network = dbus_network
+    return ws_dbus, dbus_interface, dbus_network
+
+
+if __name__ == '__main__':
+    unittest.main()
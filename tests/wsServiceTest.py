@@ -167,10 +167,7 @@ class WpaSupplicantServiceTest(TestCase):
     def test_returns_network_count(self):
         # Given
         dependencies, wifi_config, wifi_dbus, dhcp_client = create_components()
-        wifi_config.get_networks.return_value = [
-            WifiNetwork('"test-network1"', '"test-password1"', True, 0),
-            WifiNetwork('test-network2', 'test-password2', False, 1)
-        ]
+        wifi_config.get_network_count.return_value = 2
         wpa_supplicant_service = WpaSupplicantService(dependencies, wifi_config, wifi_dbus, dhcp_client,
                                                       service_file=self.WPA_SERVICE_FILE)
 
@@ -212,6 +209,48 @@ class WpaSupplicantServiceTest(TestCase):
         wifi_dbus.add_network.assert_called_once_with(network)
         wifi_config.add_network.assert_called_once_with(network)
 
+    def test_updates_networks_via_dbus_and_config_when_active(self):
+        # Given
+        dependencies, wifi_config, wifi_dbus, dhcp_client = create_components()
+        dependencies.systemd.is_active.return_value = True
+        wpa_supplicant_service = WpaSupplicantService(dependencies, wifi_config, wifi_dbus, dhcp_client,
+                                                      service_file=self.WPA_SERVICE_FILE)
+        networks = [WifiNetwork('test-network1', 'test-password1', True, 1)]
+
+        # When
+        wpa_supplicant_service.update_networks(networks, ['test-network2'])
+
+        # Then
+        wifi_dbus.update_networks.assert_called_once_with(networks, ['test-network2'])
+        wifi_config.update_networks.assert_called_once_with(networks, ['test-network2'])
+
+    def test_supports_live_reconfiguration(self):
+        # Given
+        dependencies, wifi_config, wifi_dbus, dhcp_client = create_components()
+        wpa_supplicant_service = WpaSupplicantService(dependencies, wifi_config, wifi_dbus, dhcp_client,
+                                                      service_file=self.WPA_SERVICE_FILE)
+
+        # When
+        result = wpa_supplicant_service.supports_live_reconfiguration()
+
+        # Then
+        self.assertTrue(result)
+
+    def test_scans_networks_via_dbus_when_active(self):
+        # Given
+        dependencies, wifi_config, wifi_dbus, dhcp_client = create_components()
+        dependencies.systemd.is_active.return_value = True
+        wifi_dbus.scan.return_value = {'test-network1': -50}
+        wpa_supplicant_service = WpaSupplicantService(dependencies, wifi_config, wifi_dbus, dhcp_client,
+                                                      service_file=self.WPA_SERVICE_FILE)
+
+        # When
+        result = wpa_supplicant_service.scan_networks(['test-network1'])
+
+        # Then
+        self.assertEqual({'test-network1': -50}, result)
+        wifi_dbus.scan.assert_called_once_with(['test-network1'])
+
     def test_resets_wireless(self):
         # Given
         dependencies, wifi_config, wifi_dbus, dhcp_client = create_components()
@@ -1,3 +1,4 @@
 from .wifiConfig import *
 from .wsConfig import *
 from .nmConfig import *
+from .nmClientConfig import *
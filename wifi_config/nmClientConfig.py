@@ -0,0 +1,140 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+from threading import RLock
+from typing import Optional
+
+import gi
+
+gi.require_version('NM', '1.0')
+
+from context_logger import get_logger
+from gi.repository import NM
+from gi.repository.NM import Client, RemoteConnection
+
+from wifi_config import NetworkManagerConfig, WifiNetwork
+from wifi_utility import AtomicFileWriter
+
+log = get_logger('NetworkManagerClientConfig')
+
+
+class NetworkManagerClientConfig(NetworkManagerConfig):
+
+    def __init__(self, interface: str, client: Client,
+                 config_file: str = '/etc/NetworkManager/NetworkManager.conf',
+                 network_dir: str = '/etc/NetworkManager/system-connections',
+                 file_writer: Optional[AtomicFileWriter] = None) -> None:
+        super().__init__(interface, config_file, network_dir, file_writer=file_writer)
+        self._client = client
+        self._networks: dict[str, WifiNetwork] = {}
+        self._paths: dict[str, str] = {}
+        self._change_handlers: dict[str, tuple[RemoteConnection, int]] = {}
+        self._subscribed = False
+        self._client_lock = RLock()
+
+    def get_network(self, ssid: str) -> Optional[WifiNetwork]:
+        if not self._client.get_nm_running():
+            return super().get_network(ssid)
+
+        with self._client_lock:
+            self._subscribe()
+            if path := self._paths.get(ssid):
+                return self._networks[path]
+            return None
+
+    def get_networks(self) -> list[WifiNetwork]:
+        if not self._client.get_nm_running():
+            return super().get_networks()
+
+        with self._client_lock:
+            self._subscribe()
+            return list(self._networks.values())
+
+    def get_network_count(self) -> int:
+        if not self._client.get_nm_running():
+            return super().get_network_count()
+
+        with self._client_lock:
+            self._subscribe()
+            return len(self._paths)
+
+    def _subscribe(self) -> None:
+        if self._subscribed:
+            return
+
+        self._client.connect('connection-added', self._on_connection_added)
+        self._client.connect('connection-removed', self._on_connection_removed)
+
+        for connection in self._client.get_connections():
+            self._add_connection(connection)
+
+        self._subscribed = True
+
+        log.info('Network profiles loaded from NetworkManager', interface=self._interface,
+                 networks=len(self._networks))
+
+    def _on_connection_added(self, client: Client, connection: RemoteConnection) -> None:
+        with self._client_lock:
+            self._add_connection(connection)
+
+    def _on_connection_removed(self, client: Client, connection: RemoteConnection) -> None:
+        with self._client_lock:
+            path = connection.get_path()
+
+            if entry := self._change_handlers.pop(path, None):
+                entry[0].disconnect(entry[1])
+
+            self._remove_network(path)
+
+    def _on_connection_changed(self, connection: RemoteConnection) -> None:
+        with self._client_lock:
+            self._update_network(connection)
+
+    def _add_connection(self, connection: RemoteConnection) -> None:
+        path = connection.get_path()
+
+        if path not in self._change_handlers:
+            handler_id = connection.connect('changed', self._on_connection_changed)
+            self._change_handlers[path] = (connection, handler_id)
+
+        self._update_network(connection)
+
+    def _update_network(self, connection: RemoteConnection) -> None:
+        path = connection.get_path()
+        self._remove_network(path)
+
+        if network := self._to_network(connection):
+            self._networks[path] = network
+            self._paths[network.ssid] = path
+            log.debug('Network profile indexed', ssid=network.ssid, path=path)
+
+    def _remove_network(self, path: str) -> None:
+        if network := self._networks.pop(path, None):
+            if self._paths.get(network.ssid) == path:
+                del self._paths[network.ssid]
+
+    def _to_network(self, connection: RemoteConnection) -> Optional[WifiNetwork]:
+        if connection.get_connection_type() != NM.SETTING_WIRELESS_SETTING_NAME:
+            return None
+
+        if connection.get_interface_name() not in (None, self._interface):
+            return None
+
+        setting_wireless = connection.get_setting_wireless()
+        if not setting_wireless or not setting_wireless.get_ssid():
+            return None
+
+        if setting_wireless.get_mode() not in (None, NM.SETTING_WIRELESS_MODE_INFRA):
+            return None
+
+        ssid_data = setting_wireless.get_ssid().get_data()
+        setting_connection = connection.get_setting_connection()
+        setting_security = connection.get_setting_wireless_security()
+
+        return WifiNetwork(
+            ssid_data.decode('utf-8', errors='replace') if ssid_data else '',
+            (setting_security.get_psk() or '') if setting_security else '',
+            bool(setting_connection.get_autoconnect()),
+            int(setting_connection.get_autoconnect_priority())
+        )
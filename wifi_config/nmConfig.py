@@ -3,13 +3,16 @@
 # SPDX-License-Identifier: MIT
 
 import os
-from configparser import ConfigParser
+from configparser import ConfigParser, Error
+from io import StringIO
+from threading import RLock
 from typing import Optional
 from uuid import uuid4
 
 from context_logger import get_logger
 
 from wifi_config import IWifiConfig, WifiNetwork
+from wifi_utility import FileMonitor, AtomicFileWriter
 
 log = get_logger('NetworkManagerConfig')
 
@@ -19,25 +22,45 @@ class NetworkManagerConfig(IWifiConfig):
 
     def __init__(self, interface: str,
                  config_file: str = '/etc/NetworkManager/NetworkManager.conf',
-                 network_dir: str = '/etc/NetworkManager/system-connections') -> None:
+                 network_dir: str = '/etc/NetworkManager/system-connections',
+                 dir_monitor: Optional[FileMonitor] = None, file_writer: Optional[AtomicFileWriter] = None) -> None:
         self._interface = interface
         self._config_file = config_file
         self._network_dir = network_dir
+        self._dir_monitor = dir_monitor
+        self._file_writer = file_writer or AtomicFileWriter()
+        self._files: dict[str, tuple[tuple[int, int, int], Optional[WifiNetwork]]] = {}
+        self._ssids: dict[str, str] = {}
+        self._dirty: set[str] = set()
+        self._indexed = False
+        self._parse_count = 0
+        self._lock = RLock()
+
+        if self._dir_monitor:
+            self._dir_monitor.add_handler(self._on_network_dir_changed)
 
     def get_config_file(self) -> str:
         return self._config_file
 
     def get_network(self, ssid: str) -> Optional[WifiNetwork]:
-        file_name = self._get_network_file_name(ssid)
+        with self._lock:
+            self._update_index()
+            if file_name := self._ssids.get(ssid):
+                return self._files[file_name][1]
+            return None
 
-        if os.path.exists(file_name):
-            return self._get_network_from_file(file_name)
+    def get_networks(self) -> list[WifiNetwork]:
+        with self._lock:
+            self._update_index()
+            return [network for _, network in self._files.values() if network]
 
-        return None
+    def get_network_count(self) -> int:
+        with self._lock:
+            self._update_index()
+            return sum(1 for _, network in self._files.values() if network)
 
-    def get_networks(self) -> list[WifiNetwork]:
-        return [self._get_network_from_file(f'{self._network_dir}/{file_name}') for file_name in
-                os.listdir(self._network_dir) if file_name.endswith(self.NETWORK_FILE_EXTENSION)]
+    def get_parse_count(self) -> int:
+        return self._parse_count
 
     def add_network(self, network: WifiNetwork) -> None:
         ssid = network.ssid
@@ -89,10 +112,12 @@ class NetworkManagerConfig(IWifiConfig):
             config.add_section('ipv6')
             config.set('ipv6', 'method', 'disabled')
 
-        with open(file_name, 'w') as config_file:
-            config.write(config_file)
+        content = StringIO()
+        config.write(content)
+
+        self._file_writer.write(file_name, content.getvalue(), 0o600)
 
-        os.chmod(file_name, 0o600)
+        self._refresh_indexed_file(file_name)
 
     def remove_network(self, ssid: str) -> None:
         file_name = self._get_network_file_name(ssid)
@@ -100,13 +125,88 @@ class NetworkManagerConfig(IWifiConfig):
         if os.path.exists(file_name):
             os.remove(file_name)
 
+        self._refresh_indexed_file(file_name)
+
+    def update_networks(self, networks: list[WifiNetwork], removed_ssids: list[str]) -> None:
+        for ssid in removed_ssids:
+            self.remove_network(ssid)
+
+        for network in networks:
+            self.add_network(network)
+
     def need_config_file_setup(self) -> bool:
         return False
 
     def _get_network_file_name(self, ssid: str) -> str:
         return os.path.join(self._network_dir, f'{ssid}{self.NETWORK_FILE_EXTENSION}')
 
+    def _update_index(self) -> None:
+        if not self._indexed or not self._dir_monitor or not self._dir_monitor.is_active():
+            self._scan_network_dir()
+            self._indexed = True
+            self._dirty.clear()
+        else:
+            dirty, self._dirty = self._dirty, set()
+            for file_name in dirty:
+                self._refresh_file(file_name)
+
+    def _scan_network_dir(self) -> None:
+        file_names: set[str] = set()
+
+        if os.path.isdir(self._network_dir):
+            with os.scandir(self._network_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(self.NETWORK_FILE_EXTENSION):
+                        file_names.add(entry.path)
+                        self._refresh_file(entry.path)
+
+        for file_name in set(self._files) - file_names:
+            self._remove_file(file_name)
+
+    def _refresh_indexed_file(self, file_name: str) -> None:
+        with self._lock:
+            if self._indexed:
+                self._refresh_file(file_name)
+
+    def _refresh_file(self, file_name: str) -> None:
+        try:
+            file_stat = os.stat(file_name)
+        except OSError:
+            self._remove_file(file_name)
+            return
+
+        file_key = (file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size)
+
+        if (entry := self._files.get(file_name)) and entry[0] == file_key:
+            return
+
+        self._remove_file(file_name)
+
+        try:
+            network: Optional[WifiNetwork] = self._get_network_from_file(file_name)
+        except (Error, ValueError) as error:
+            log.debug('Skipping non-wireless connection file', file=file_name, error=str(error))
+            network = None
+
+        self._files[file_name] = (file_key, network)
+        if network:
+            self._ssids[network.ssid] = file_name
+
+    def _remove_file(self, file_name: str) -> None:
+        if entry := self._files.pop(file_name, None):
+            if entry[1] and self._ssids.get(entry[1].ssid) == file_name:
+                del self._ssids[entry[1].ssid]
+
+    def _on_network_dir_changed(self, path: str) -> None:
+        if path.endswith(self.NETWORK_FILE_EXTENSION):
+            with self._lock:
+                self._dirty.add(path)
+        elif path == self._network_dir:
+            with self._lock:
+                self._indexed = False
+
     def _get_network_from_file(self, file_name: str) -> WifiNetwork:
+        self._parse_count += 1
         config = ConfigParser(allow_no_value=True)
         config.read(file_name)
 
@@ -2,9 +2,14 @@
 # SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
 # SPDX-License-Identifier: MIT
 
+import hashlib
+import string
 from dataclasses import dataclass
 from typing import Optional
 
+WPA_PSK_ITERATIONS = 4096
+WPA_PSK_LENGTH = 32
+
 
 @dataclass
 class WifiNetwork(object):
@@ -14,6 +19,14 @@ class WifiNetwork(object):
     priority: int
 
 
+def derive_wpa_psk(ssid: str, passphrase: str) -> str:
+    return hashlib.pbkdf2_hmac('sha1', passphrase.encode(), ssid.encode(), WPA_PSK_ITERATIONS, WPA_PSK_LENGTH).hex()
+
+
+def is_wpa_psk(value: str) -> bool:
+    return len(value) == WPA_PSK_LENGTH * 2 and all(char in string.hexdigits for char in value)
+
+
 class IWifiConfig(object):
 
     def get_config_file(self) -> str:
@@ -25,12 +38,18 @@ class IWifiConfig(object):
     def get_networks(self) -> list[WifiNetwork]:
         raise NotImplementedError()
 
+    def get_network_count(self) -> int:
+        raise NotImplementedError()
+
     def add_network(self, network: WifiNetwork) -> None:
         raise NotImplementedError()
 
     def remove_network(self, ssid: str) -> None:
         raise NotImplementedError()
 
+    def update_networks(self, networks: list[WifiNetwork], removed_ssids: list[str]) -> None:
+        raise NotImplementedError()
+
     def need_config_file_setup(self) -> bool:
         raise NotImplementedError()
 
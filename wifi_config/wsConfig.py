@@ -3,12 +3,14 @@
 # SPDX-License-Identifier: MIT
 
 import os
+from threading import RLock
 from typing import Optional
 
 from common_utility import is_file_matches_pattern
 from context_logger import get_logger
 
-from wifi_config import IWifiConfig, WifiNetwork
+from wifi_config import IWifiConfig, WifiNetwork, is_wpa_psk
+from wifi_utility import FileMonitor, AtomicFileWriter
 
 log = get_logger('WpaSupplicantConfig')
 
@@ -17,9 +19,19 @@ class WpaSupplicantConfig(IWifiConfig):
     NETWORK_START = 'network={'
     NETWORK_END = '}'
 
-    def __init__(self, country: str, config_file: str = '/etc/wpa_supplicant/wpa_supplicant.conf') -> None:
+    def __init__(self, country: str, config_file: str = '/etc/wpa_supplicant/wpa_supplicant.conf',
+                 file_monitor: Optional[FileMonitor] = None, file_writer: Optional[AtomicFileWriter] = None) -> None:
         self._country = country
         self._config_file = config_file
+        self._file_monitor = file_monitor
+        self._file_writer = file_writer or AtomicFileWriter()
+        self._network_map: Optional[dict[str, WifiNetwork]] = None
+        self._file_key: Optional[tuple[int, int, int]] = None
+        self._parse_count = 0
+        self._lock = RLock()
+
+        if self._file_monitor:
+            self._file_monitor.add_handler(self._on_config_file_changed)
 
     def get_config_file(self) -> str:
         return self._config_file
@@ -30,29 +42,50 @@ class WpaSupplicantConfig(IWifiConfig):
     def get_networks(self) -> list[WifiNetwork]:
         return list(self._get_network_map().values())
 
+    def get_network_count(self) -> int:
+        return len(self._get_network_map())
+
     def add_network(self, network: WifiNetwork) -> None:
-        network_map = self._get_network_map()
+        with self._lock:
+            network_map = self._get_network_map()
 
-        network.ssid = self._add_quotes(network.ssid)
-        network.password = self._add_quotes(network.password)
+            self._prepare_network(network)
 
-        network_map[network.ssid] = network
+            network_map[network.ssid] = network
 
-        self._save_networks_with_config(list(network_map.values()))
+            self._save_network_map(network_map)
 
     def remove_network(self, ssid: str) -> None:
-        network_map = self._get_network_map()
+        with self._lock:
+            network_map = self._get_network_map()
+
+            network_map.pop(self._add_quotes(ssid), None)
+
+            self._save_network_map(network_map)
+
+    def update_networks(self, networks: list[WifiNetwork], removed_ssids: list[str]) -> None:
+        with self._lock:
+            network_map = self._get_network_map()
+
+            for ssid in removed_ssids:
+                network_map.pop(self._add_quotes(ssid), None)
 
-        network_map.pop(self._add_quotes(ssid), None)
+            for network in networks:
+                self._prepare_network(network)
+                network_map[network.ssid] = network
+
+            self._save_network_map(network_map)
 
-        self._save_networks_with_config(list(network_map.values()))
+    def get_parse_count(self) -> int:
+        return self._parse_count
 
     def need_config_file_setup(self) -> bool:
         pattern = '\n+'.join([f'({line})' for line in self._get_config_lines()])
         return not is_file_matches_pattern(self._config_file, pattern)
 
     def setup_config_file(self) -> None:
-        self._save_networks_with_config(self.get_networks())
+        with self._lock:
+            self._save_network_map(self._get_network_map())
 
     def _get_config_lines(self) -> list[str]:
         return [
@@ -66,11 +99,46 @@ class WpaSupplicantConfig(IWifiConfig):
         return line.strip().replace(' ', '')
 
     def _get_network_map(self) -> dict[str, WifiNetwork]:
-        networks: dict[str, WifiNetwork] = {}
+        with self._lock:
+            if self._network_map is not None and self._is_cache_valid():
+                return self._network_map
+
+            file_key = self._get_file_key()
+            self._network_map = self._parse_networks() if file_key else {}
+            self._file_key = file_key
+
+            if not file_key:
+                log.warn('Configuration file does not exist', file=self._config_file)
+
+            return self._network_map
+
+    def _is_cache_valid(self) -> bool:
+        if self._file_monitor and self._file_monitor.is_active():
+            return True
 
-        if not os.path.exists(self._config_file):
-            log.warn('Configuration file does not exist', file=self._config_file)
-            return networks
+        return self._get_file_key() == self._file_key
+
+    def _get_file_key(self) -> Optional[tuple[int, int, int]]:
+        try:
+            file_stat = os.stat(self._config_file)
+            return file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size
+        except OSError:
+            return None
+
+    def _invalidate(self) -> None:
+        with self._lock:
+            self._network_map = None
+            self._file_key = None
+
+    def _on_config_file_changed(self, path: str) -> None:
+        with self._lock:
+            if self._network_map is not None and self._get_file_key() != self._file_key:
+                log.debug('Configuration file changed externally', file=self._config_file)
+                self._invalidate()
+
+    def _parse_networks(self) -> dict[str, WifiNetwork]:
+        networks: dict[str, WifiNetwork] = {}
+        self._parse_count += 1
 
         with open(self._config_file, 'r') as file:
             lines = file.readlines()
@@ -100,19 +168,37 @@ class WpaSupplicantConfig(IWifiConfig):
         elif key_value[0] == 'priority':
             network.priority = int(key_value[1])
 
+    def _save_network_map(self, network_map: dict[str, WifiNetwork]) -> None:
+        try:
+            self._save_networks_with_config(list(network_map.values()))
+        except Exception:
+            self._invalidate()
+            raise
+
+        self._network_map = network_map
+        self._file_key = self._get_file_key()
+
     def _save_networks_with_config(self, networks: list[WifiNetwork]) -> None:
-        os.makedirs(os.path.dirname(self._config_file), exist_ok=True)
-        with open(self._config_file, 'w') as file:
-            for line in self._get_config_lines():
-                file.write(f'{line}\n')
+        self._file_writer.write(self._config_file, self._render_config(networks))
 
-            for network in networks:
-                file.write(f'\n{self.NETWORK_START}\n')
-                file.write(f'\tssid={network.ssid}\n')
-                file.write(f'\tpsk={network.password}\n')
-                file.write(f'\tdisabled={int(not network.enabled)}\n')
-                file.write(f'\tpriority={network.priority}\n')
-                file.write(f'{self.NETWORK_END}\n')
+    def _render_config(self, networks: list[WifiNetwork]) -> str:
+        lines = [f'{line}\n' for line in self._get_config_lines()]
+
+        for network in networks:
+            lines.append(f'\n{self.NETWORK_START}\n')
+            lines.append(f'\tssid={network.ssid}\n')
+            lines.append(f'\tpsk={network.password}\n')
+            lines.append(f'\tdisabled={int(not network.enabled)}\n')
+            lines.append(f'\tpriority={network.priority}\n')
+            lines.append(f'{self.NETWORK_END}\n')
+
+        return ''.join(lines)
+
+    def _prepare_network(self, network: WifiNetwork) -> None:
+        network.ssid = self._add_quotes(network.ssid)
+
+        if not is_wpa_psk(network.password):
+            network.password = self._add_quotes(network.password)
 
     def _add_quotes(self, value: str) -> str:
         return value if value.startswith('"') else f'"{value}"'
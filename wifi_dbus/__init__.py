@@ -1,3 +1,11 @@
+from .signalWaiter import *
+from .mainLoopEvent import *
 from .wifiDbus import *
+from .dbusProxyCache import *
+from .dbusPropertyMirror import *
+from .asyncDbus import *
+from .gioSystemBus import *
+from .systemdUnitMonitor import *
+from .unitSnapshot import *
 from .wsDbus import *
 from .nmDbus import *
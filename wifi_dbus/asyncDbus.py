@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+import time
+from concurrent import futures
+from concurrent.futures import Future
+from typing import Any, Optional
+
+import dbus
+from context_logger import get_logger
+from dbus import SystemBus
+from gi.repository import GLib
+
+from wifi_dbus import DbusProxyCache
+
+log = get_logger('AsyncDbus')
+
+
+class AsyncDbus(object):
+    _POLL_INTERVAL = 0.005
+
+    def __init__(self, system_bus: SystemBus, proxy_cache: Optional[DbusProxyCache] = None,
+                 timeout: float = 5) -> None:
+        self._proxy_cache = proxy_cache if proxy_cache else DbusProxyCache(system_bus)
+        self._timeout = timeout
+
+    def call(self, bus_name: str, object_path: str, interface_name: str, method_name: str, *args: Any,
+             timeout: Optional[float] = None) -> Future[Any]:
+        future: Future[Any] = Future()
+        future.set_running_or_notify_cancel()
+
+        def on_reply(*result: Any) -> None:
+            self._complete(future, result=result[0] if len(result) == 1 else result if result else None)
+
+        def on_error(error: Exception) -> None:
+            log.debug('Call failed', method=method_name, path=object_path, error=str(error))
+            self._complete(future, error=error)
+
+        try:
+            proxy = self._proxy_cache.get_interface(bus_name, object_path, interface_name)
+            proxy.get_dbus_method(method_name)(*args, reply_handler=on_reply, error_handler=on_error,
+                                               timeout=timeout if timeout else self._timeout)
+        except (dbus.DBusException, TypeError, ValueError) as error:
+            on_error(error)
+
+        return future
+
+    def get_property(self, bus_name: str, object_path: str, interface_name: str, property_name: str,
+                     timeout: Optional[float] = None) -> Future[Any]:
+        return self.call(bus_name, object_path, dbus.PROPERTIES_IFACE, 'Get', interface_name, property_name,
+                         timeout=timeout)
+
+    def wait(self, pending: list[Future[Any]], timeout: Optional[float] = None) -> None:
+        deadline = time.monotonic() + (timeout if timeout else self._timeout)
+        context = GLib.MainContext.default()
+
+        if context.acquire():
+            try:
+                while not all(future.done() for future in pending) and time.monotonic() < deadline:
+                    if not context.iteration(False):
+                        futures.wait(pending, self._POLL_INTERVAL)
+            finally:
+                context.release()
+        else:
+            futures.wait(pending, max(0.0, deadline - time.monotonic()))
+
+        for future in pending:
+            self._complete(future, error=TimeoutError('D-Bus call timed out'))
+
+    def gather(self, pending: list[Future[Any]], timeout: Optional[float] = None) -> list[Any]:
+        self.wait(pending, timeout)
+        return [future.exception() or future.result() for future in pending]
+
+    def _complete(self, future: Future[Any], result: Any = None, error: Optional[BaseException] = None) -> None:
+        try:
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except futures.InvalidStateError:
+            pass
@@ -0,0 +1,52 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+from threading import Lock
+from typing import Any, Optional
+
+from context_logger import get_logger
+
+log = get_logger('DbusPropertyMirror')
+
+
+class DbusPropertyMirror(object):
+
+    def __init__(self, name: str, property_names: Optional[set[str]] = None) -> None:
+        self._name = name
+        self._property_names = property_names
+        self._properties: dict[str, Any] = {}
+        self._seeded = False
+        self._lock = Lock()
+
+    def seed(self, properties: dict[str, Any]) -> None:
+        with self._lock:
+            self._properties = self._filter(properties)
+            self._seeded = True
+
+        log.debug('Property mirror seeded', name=self._name, properties=list(self._properties))
+
+    def update(self, properties: dict[str, Any]) -> None:
+        with self._lock:
+            if self._seeded:
+                self._properties.update(self._filter(properties))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._properties.clear()
+            self._seeded = False
+
+    def is_seeded(self) -> bool:
+        return self._seeded
+
+    def contains(self, property_name: str) -> bool:
+        with self._lock:
+            return property_name in self._properties
+
+    def get(self, property_name: str) -> Any:
+        with self._lock:
+            return self._properties.get(property_name)
+
+    def _filter(self, properties: dict[str, Any]) -> dict[str, Any]:
+        return {str(key): value for key, value in properties.items()
+                if self._property_names is None or key in self._property_names}
@@ -0,0 +1,76 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+from threading import RLock
+from typing import Any, Optional
+
+from context_logger import get_logger
+from dbus import SystemBus, Interface
+
+log = get_logger('DbusProxyCache')
+
+
+class DbusProxyCache(object):
+    _DBUS_NAME = 'org.freedesktop.DBus'
+
+    def __init__(self, system_bus: SystemBus) -> None:
+        self._system_bus = system_bus
+        self._proxies: dict[tuple[str, str, str], Interface] = {}
+        self._watched_names: set[str] = set()
+        self._invalidation_handlers: dict[str, list[Any]] = {}
+        self._lock = RLock()
+
+    def get_interface(self, bus_name: str, object_path: str, interface_name: str) -> Interface:
+        key = (bus_name, str(object_path), interface_name)
+
+        with self._lock:
+            if proxy := self._proxies.get(key):
+                return proxy
+
+            self._watch_name_owner(bus_name)
+            dbus_object = self._system_bus.get_object(bus_name, object_path)
+            proxy = Interface(dbus_object, interface_name)
+            self._proxies[key] = proxy
+
+            return proxy
+
+    def add_invalidation_handler(self, bus_name: str, handler: Any) -> None:
+        with self._lock:
+            self._watch_name_owner(bus_name)
+            self._invalidation_handlers.setdefault(bus_name, []).append(handler)
+
+    def invalidate(self, bus_name: str, object_path: Optional[str] = None) -> None:
+        with self._lock:
+            for key in list(self._proxies):
+                if key[0] == bus_name and (object_path is None or self._is_under_path(key[1], str(object_path))):
+                    del self._proxies[key]
+
+        log.debug('Proxies invalidated', bus_name=bus_name, path=object_path)
+
+    def get_size(self) -> int:
+        return len(self._proxies)
+
+    def _is_under_path(self, proxy_path: str, object_path: str) -> bool:
+        return proxy_path == object_path or proxy_path.startswith(f'{object_path}/')
+
+    def _watch_name_owner(self, bus_name: str) -> None:
+        if bus_name not in self._watched_names:
+            self._system_bus.add_signal_receiver(self._on_name_owner_changed,
+                                                 signal_name='NameOwnerChanged',
+                                                 dbus_interface=self._DBUS_NAME,
+                                                 bus_name=self._DBUS_NAME,
+                                                 arg0=bus_name)
+            self._watched_names.add(bus_name)
+
+    def _on_name_owner_changed(self, name: str, old_owner: str, new_owner: str) -> None:
+        bus_name = str(name)
+
+        log.info('Bus name owner changed', bus_name=bus_name, old_owner=old_owner, new_owner=new_owner)
+        self.invalidate(bus_name)
+
+        with self._lock:
+            handlers = list(self._invalidation_handlers.get(bus_name, []))
+
+        for handler in handlers:
+            handler()
@@ -0,0 +1,334 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+from threading import RLock
+from typing import Any, Optional
+
+from context_logger import get_logger
+from gi.repository import Gio, GLib
+
+log = get_logger('GioSystemBus')
+
+SignalRule = tuple[Optional[str], Optional[str], Optional[str], Optional[str], Optional[str]]
+
+
+class GioSignalMatch(object):
+
+    def __init__(self, system_bus: 'GioSystemBus', rule: SignalRule, handler: Any,
+                 path_keyword: Optional[str]) -> None:
+        self.rule = rule
+        self.handler = handler
+        self.path_keyword = path_keyword
+        self._system_bus = system_bus
+
+    def remove(self) -> None:
+        self._system_bus.remove_signal_receiver(self)
+
+
+class GioProxyMethod(object):
+
+    def __init__(self, system_bus: 'GioSystemBus', bus_name: str, object_path: str, member: str,
+                 dbus_interface: Optional[str]) -> None:
+        self._system_bus = system_bus
+        self._bus_name = bus_name
+        self._object_path = object_path
+        self._member = member
+        self._dbus_interface = dbus_interface
+
+    def __call__(self, *args: Any, **keywords: Any) -> Any:
+        return self._system_bus.call_method(self._bus_name, self._object_path,
+                                            keywords.get('dbus_interface', self._dbus_interface),
+                                            self._member, args,
+                                            reply_handler=keywords.get('reply_handler'),
+                                            error_handler=keywords.get('error_handler'),
+                                            timeout=keywords.get('timeout'),
+                                            signature=keywords.get('signature'))
+
+
+class GioProxyObject(object):
+
+    def __init__(self, system_bus: 'GioSystemBus', bus_name: str, object_path: str) -> None:
+        self._system_bus = system_bus
+        self.bus_name = bus_name
+        self.requested_bus_name = bus_name
+        self.object_path = object_path
+        self.__dbus_object_path__ = object_path
+
+    def get_dbus_method(self, member: str, dbus_interface: Optional[str] = None) -> GioProxyMethod:
+        return GioProxyMethod(self._system_bus, self.bus_name, self.object_path, member, dbus_interface)
+
+    def connect_to_signal(self, signal_name: str, handler_function: Any, dbus_interface: Optional[str] = None,
+                          **keywords: Any) -> GioSignalMatch:
+        return self._system_bus.add_signal_receiver(handler_function, signal_name=signal_name,
+                                                    dbus_interface=dbus_interface, bus_name=self.bus_name,
+                                                    path=self.object_path, **keywords)
+
+    def __getattr__(self, member: str) -> GioProxyMethod:
+        if member.startswith('__') and member.endswith('__'):
+            raise AttributeError(member)
+
+        return self.get_dbus_method(member)
+
+
+class GioSystemBus(object):
+    _PROPERTIES_INTERFACE = 'org.freedesktop.DBus.Properties'
+    _INTROSPECTABLE_INTERFACE = 'org.freedesktop.DBus.Introspectable'
+    _STANDARD_SIGNATURES = {
+        (_PROPERTIES_INTERFACE, 'Get'): 'ss',
+        (_PROPERTIES_INTERFACE, 'GetAll'): 's',
+        (_PROPERTIES_INTERFACE, 'Set'): 'ssv',
+        (_INTROSPECTABLE_INTERFACE, 'Introspect'): '',
+    }
+    _DBUS_TYPE_SIGNATURES = {
+        'Boolean': 'b', 'Byte': 'y', 'Int16': 'n', 'UInt16': 'q', 'Int32': 'i', 'UInt32': 'u', 'Int64': 'x',
+        'UInt64': 't', 'Double': 'd', 'ObjectPath': 'o', 'Signature': 'g', 'String': 's', 'ByteArray': 'ay',
+    }
+    _BASIC_SIGNATURES = [
+        (bool, 'b'), (int, 'i'), (float, 'd'), (str, 's'), (bytes, 'ay'),
+    ]
+
+    def __init__(self, connection: Gio.DBusConnection, timeout: float = 25) -> None:
+        self._connection = connection
+        self._timeout = timeout
+        self._interface_infos: dict[tuple[str, str], Gio.DBusInterfaceInfo] = {}
+        self._subscriptions: dict[SignalRule, int] = {}
+        self._matches: dict[SignalRule, list[GioSignalMatch]] = {}
+        self._lock = RLock()
+
+    def get_connection(self) -> Gio.DBusConnection:
+        return self._connection
+
+    def get_object(self, bus_name: str, object_path: str, introspect: bool = True,
+                   follow_name_owner_changes: bool = False) -> GioProxyObject:
+        return GioProxyObject(self, bus_name, str(object_path))
+
+    def add_signal_receiver(self, handler_function: Any, signal_name: Optional[str] = None,
+                            dbus_interface: Optional[str] = None, bus_name: Optional[str] = None,
+                            path: Optional[str] = None, arg0: Optional[str] = None,
+                            path_keyword: Optional[str] = None, **keywords: Any) -> GioSignalMatch:
+        if keywords:
+            raise TypeError(f'Unsupported signal receiver keywords: {", ".join(sorted(keywords))}')
+
+        rule = (bus_name, dbus_interface, signal_name, str(path) if path else None, arg0)
+        match = GioSignalMatch(self, rule, handler_function, path_keyword)
+
+        with self._lock:
+            if rule not in self._subscriptions:
+                self._subscriptions[rule] = self._connection.signal_subscribe(
+                    bus_name, dbus_interface, signal_name, rule[3], rule[4], Gio.DBusSignalFlags.NONE,
+                    self._on_signal, rule)
+                self._matches[rule] = []
+
+            self._matches[rule].append(match)
+
+        return match
+
+    def remove_signal_receiver(self, match: GioSignalMatch) -> None:
+        with self._lock:
+            matches = self._matches.get(match.rule, [])
+            if match in matches:
+                matches.remove(match)
+
+            if not matches and match.rule in self._subscriptions:
+                self._connection.signal_unsubscribe(self._subscriptions.pop(match.rule))
+                self._matches.pop(match.rule, None)
+
+    def get_match_rule_count(self) -> int:
+        return len(self._subscriptions)
+
+    def call_method(self, bus_name: str, object_path: str, interface_name: Optional[str], method_name: str,
+                    args: tuple[Any, ...], reply_handler: Any = None, error_handler: Any = None,
+                    timeout: Optional[float] = None, signature: Optional[str] = None) -> Any:
+        parameters = self._build_parameters(bus_name, object_path, interface_name, method_name, args, signature)
+        timeout_msec = int((timeout if timeout else self._timeout) * 1000)
+
+        if reply_handler or error_handler:
+            self._connection.call(bus_name, object_path, interface_name, method_name, parameters, None,
+                                  Gio.DBusCallFlags.NONE, timeout_msec, None, self._on_call_finished,
+                                  (reply_handler, error_handler))
+            return None
+
+        try:
+            result = self._connection.call_sync(bus_name, object_path, interface_name, method_name, parameters,
+                                                None, Gio.DBusCallFlags.NONE, timeout_msec, None)
+        except GLib.Error as error:
+            raise self._to_dbus_exception(error)
+
+        values = self._to_python(result)
+        return values[0] if len(values) == 1 else values if values else None
+
+    def close(self) -> None:
+        with self._lock:
+            for subscription_id in self._subscriptions.values():
+                self._connection.signal_unsubscribe(subscription_id)
+            self._subscriptions.clear()
+            self._matches.clear()
+
+    def _on_call_finished(self, connection: Gio.DBusConnection, result: Gio.AsyncResult, handlers: Any) -> None:
+        reply_handler, error_handler = handlers
+
+        try:
+            values = self._to_python(connection.call_finish(result))
+        except GLib.Error as error:
+            if error_handler:
+                error_handler(self._to_dbus_exception(error))
+            return
+
+        if reply_handler:
+            reply_handler(*values)
+
+    def _on_signal(self, connection: Gio.DBusConnection, sender: str, object_path: str, interface_name: str,
+                   signal_name: str, parameters: GLib.Variant, rule: SignalRule) -> None:
+        with self._lock:
+            matches = list(self._matches.get(rule, []))
+
+        args = self._to_python(parameters)
+
+        for match in matches:
+            if match.path_keyword:
+                match.handler(*args, **{match.path_keyword: object_path})
+            else:
+                match.handler(*args)
+
+    def _build_parameters(self, bus_name: str, object_path: str, interface_name: Optional[str], method_name: str,
+                          args: tuple[Any, ...], signature: Optional[str]) -> Optional[GLib.Variant]:
+        if signature is None:
+            signature = self._get_in_signature(bus_name, object_path, interface_name, method_name)
+
+        if signature is None:
+            signature = ''.join(self._guess_signature(arg) for arg in args)
+
+        if not args and not signature:
+            return None
+
+        variant_type = GLib.VariantType.new(f'({signature})')
+        return GLib.Variant(variant_type.dup_string(), self._to_native(variant_type, args))
+
+    def _get_in_signature(self, bus_name: str, object_path: str, interface_name: Optional[str],
+                          method_name: str) -> Optional[str]:
+        if interface_name is None:
+            return None
+
+        if (interface_name, method_name) in self._STANDARD_SIGNATURES:
+            return self._STANDARD_SIGNATURES[(interface_name, method_name)]
+
+        if interface_info := self._get_interface_info(bus_name, object_path, interface_name):
+            if method_info := interface_info.lookup_method(method_name):
+                return ''.join(arg.signature for arg in method_info.in_args)
+
+        return None
+
+    def _get_interface_info(self, bus_name: str, object_path: str,
+                            interface_name: str) -> Optional[Gio.DBusInterfaceInfo]:
+        key = (bus_name, interface_name)
+
+        with self._lock:
+            if interface_info := self._interface_infos.get(key):
+                return interface_info
+
+        try:
+            result = self._connection.call_sync(bus_name, object_path, self._INTROSPECTABLE_INTERFACE, 'Introspect',
+                                                None, GLib.VariantType.new('(s)'), Gio.DBusCallFlags.NONE,
+                                                int(self._timeout * 1000), None)
+            interface_info = Gio.DBusNodeInfo.new_for_xml(result.unpack()[0]).lookup_interface(interface_name)
+        except GLib.Error as error:
+            log.debug('Failed to introspect object', bus_name=bus_name, path=object_path, error=error.message)
+            return None
+
+        if interface_info:
+            with self._lock:
+                self._interface_infos[key] = interface_info
+
+        return interface_info
+
+    def _guess_signature(self, value: Any) -> str:
+        if isinstance(value, GLib.Variant):
+            return 'v'
+
+        value_class = type(value)
+        if value_class.__module__.startswith('dbus') and value_class.__name__ in self._DBUS_TYPE_SIGNATURES:
+            return self._DBUS_TYPE_SIGNATURES[value_class.__name__]
+
+        for value_type, signature in self._BASIC_SIGNATURES:
+            if isinstance(value, value_type):
+                return signature
+
+        if isinstance(value, dict):
+            return f'a{{{getattr(value, "signature", None) or "sv"}}}'
+
+        if isinstance(value, (list, tuple)):
+            if element_signature := getattr(value, 'signature', None):
+                return f'a{element_signature}'
+            return f'a{self._guess_signature(value[0])}' if value else 'av'
+
+        raise TypeError(f'Cannot convert {type(value).__name__} to a D-Bus value')
+
+    def _to_native(self, variant_type: GLib.VariantType, value: Any) -> Any:
+        if variant_type.is_variant():
+            if isinstance(value, GLib.Variant):
+                return value
+            signature = self._guess_signature(value)
+            return GLib.Variant(signature, self._to_native(GLib.VariantType.new(signature), value))
+
+        if isinstance(value, GLib.Variant):
+            return value.unpack()
+
+        if variant_type.is_tuple():
+            items = []
+            item_type = variant_type.first()
+            for item in value:
+                items.append(self._to_native(item_type, item))
+                item_type = item_type.next()
+            return tuple(items)
+
+        if variant_type.is_array():
+            return self._to_native_array(variant_type.element(), value)
+
+        return self._to_native_basic(variant_type.dup_string(), value)
+
+    def _to_native_array(self, element_type: GLib.VariantType, value: Any) -> Any:
+        if element_type.is_dict_entry():
+            return {self._to_native(element_type.key(), key): self._to_native(element_type.value(), item)
+                    for key, item in value.items()}
+
+        if element_type.dup_string() == 'y':
+            return value.encode() if isinstance(value, str) else bytes(value)
+
+        return [self._to_native(element_type, item) for item in value]
+
+    def _to_native_basic(self, signature: str, value: Any) -> Any:
+        if signature in ('s', 'o', 'g'):
+            return str(value)
+        elif signature == 'b':
+            return bool(value)
+        elif signature == 'd':
+            return float(value)
+        else:
+            return int(value)
+
+    def _to_python(self, value: GLib.Variant) -> Any:
+        type_string = value.get_type_string()
+
+        if type_string == 'v':
+            return self._to_python(value.get_variant())
+
+        if type_string == 'ay':
+            return bytes(value.get_data_as_bytes().get_data() or b'')
+
+        if type_string.startswith('a{'):
+            return {self._to_python(entry.get_child_value(0)): self._to_python(entry.get_child_value(1))
+                    for entry in (value.get_child_value(index) for index in range(value.n_children()))}
+
+        if type_string.startswith(('a', '(')):
+            items = [self._to_python(value.get_child_value(index)) for index in range(value.n_children())]
+            return tuple(items) if type_string.startswith('(') else items
+
+        return value.unpack()
+
+    def _to_dbus_exception(self, error: GLib.Error) -> Any:
+        from dbus import DBusException
+
+        name = Gio.DBusError.get_remote_error(error)
+        Gio.DBusError.strip_remote_error(error)
+        return DBusException(error.message, name=name)
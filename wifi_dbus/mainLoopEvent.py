@@ -0,0 +1,30 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+import time
+from threading import Event
+from typing import Optional
+
+from gi.repository import GLib
+
+
+class MainLoopEvent(Event):
+    _POLL_INTERVAL = 0.005
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        context = GLib.MainContext.default()
+
+        if not context.acquire():
+            return super().wait(timeout)
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        try:
+            while not self.is_set() and (deadline is None or time.monotonic() < deadline):
+                if not context.iteration(False):
+                    super().wait(self._POLL_INTERVAL)
+        finally:
+            context.release()
+
+        return self.is_set()
@@ -3,6 +3,8 @@
 # SPDX-License-Identifier: MIT
 
 import time
+from functools import partial
+from threading import Lock, RLock
 
 import gi
 
@@ -14,44 +16,110 @@ from typing import Any, Optional
 
 from context_logger import get_logger
 
-from gi.repository import NM
+from gi.repository import NM, GLib
 from gi.repository.Gio import AsyncResult
-from gi.repository.NM import DeviceWifi, Client, Connection
+from gi.repository.NM import DeviceWifi, Client, Connection, Device, AccessPoint, RemoteConnection
 
-from wifi_dbus import IWifiDbus, bytes_to_str, str_to_bytes
+from wifi_dbus import IWifiDbus, SignalWaiter, MainLoopEvent, bytes_to_str, str_to_bytes
 
 log = get_logger('NetworkManagerDbus')
 
 
+class AccessPointIndex(object):
+
+    def __init__(self) -> None:
+        self._access_points: dict[str, dict[str, AccessPoint]] = {}
+        self._ssids: dict[str, str] = {}
+        self._unnamed: dict[str, AccessPoint] = {}
+        self._lock = Lock()
+
+    def add(self, access_point: AccessPoint) -> None:
+        path = access_point.get_path()
+
+        with self._lock:
+            self._remove(path)
+
+            if not self._index(path, access_point):
+                self._unnamed[path] = access_point
+
+    def remove(self, access_point: AccessPoint) -> None:
+        with self._lock:
+            self._remove(access_point.get_path())
+
+    def find(self, ssid: str) -> list[AccessPoint]:
+        with self._lock:
+            if ssid not in self._access_points and self._unnamed:
+                self._index_unnamed()
+
+            return list(self._access_points.get(ssid, {}).values())
+
+    def get_strengths(self, ssids: list[str]) -> dict[str, int]:
+        return {ssid: max(int(ap.get_strength()) for ap in access_points)
+                for ssid in ssids if (access_points := self.find(ssid))}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._access_points.clear()
+            self._ssids.clear()
+            self._unnamed.clear()
+
+    def _index(self, path: str, access_point: AccessPoint) -> bool:
+        if ssid_bytes := access_point.get_ssid():
+            ssid = bytes_to_str(ssid_bytes)
+            self._ssids[path] = ssid
+            self._access_points.setdefault(ssid, {})[path] = access_point
+            return True
+
+        return False
+
+    def _index_unnamed(self) -> None:
+        for path, access_point in list(self._unnamed.items()):
+            if self._index(path, access_point):
+                del self._unnamed[path]
+
+    def _remove(self, path: str) -> None:
+        self._unnamed.pop(path, None)
+        if (ssid := self._ssids.pop(path, None)) is not None:
+            access_points = self._access_points[ssid]
+            access_points.pop(path, None)
+            if not access_points:
+                del self._access_points[ssid]
+
+
 class NetworkManagerDbus(IWifiDbus):
+    _NOISE_FLOOR_DBM = -90
+    _SIGNAL_MAX_DBM = -20
 
-    def __init__(self, interface: str, client: Client, max_retries: int = 5, retry_delay: float = 1) -> None:
+    def __init__(self, interface: str, client: Client, device_timeout: float = 30, reset_timeout: float = 30,
+                 scan_timeout: float = 10) -> None:
         self._interface = interface
         self._client = client
-        self._max_retries = max_retries
-        self._retry_delay = retry_delay
+        self._scan_timeout = scan_timeout
+        self._scan_waiters: dict[str, SignalWaiter] = {}
+        self._device_waiter = SignalWaiter('wireless-device', device_timeout, self._on_device_timeout)
+        self._pending_handlers: list[Any] = []
+        self._pending_lock = Lock()
+        self._reset_waiter = SignalWaiter('wireless-reset', reset_timeout, self._on_reset_timeout)
+        self._reset_started = 0.0
+        self._device: Optional[DeviceWifi] = None
+        self._device_handlers: list[tuple[Any, int]] = []
+        self._device_lock = RLock()
+        self._access_points = AccessPointIndex()
 
     def get_interface(self) -> str:
         return self._interface
 
     def add_connection_handler(self, on_connection_changed: Any) -> None:
-        handler_added = False
-        retry_count = 0
-
-        while not handler_added and retry_count <= self._max_retries:
-            if device := self._get_device():
-                device.connect('state-changed', on_connection_changed)
-                handler_added = True
-                log.info('Added connection handler', interface=self._interface)
-            else:
-                retry_count += 1
-                log.warning('Failed to add connection handler, retrying...',
-                            interface=self._interface, retry_count=retry_count)
-                time.sleep(self._retry_delay)
+        with self._pending_lock:
+            self._pending_handlers.append(on_connection_changed)
+
+        if not self._device_waiter.is_waiting():
+            self._wait_for_device()
 
-        if not handler_added:
-            log.error('Failed to add connection handler, giving up', interface=self._interface)
-            raise Exception('Failed to add connection handler')
+        if device := self._get_device():
+            self._add_pending_handlers(device)
+        else:
+            log.warning('Wireless device not found, waiting for it to appear', interface=self._interface)
 
     def get_active_ssid(self) -> Optional[str]:
         if device := self._get_device():
@@ -61,53 +129,344 @@ class NetworkManagerDbus(IWifiDbus):
         return None
 
     def add_network(self, network: WifiNetwork) -> None:
-        ssid_bytes = str_to_bytes(network.ssid)
+        if connection := self._find_connection(network.ssid):
+            log.info('Updating existing network connection', ssid=network.ssid, interface=self._interface)
+            self._apply_network_settings(connection, network)
+            connection.commit_changes_async(True, None, self._on_updated, network)
+        else:
+            log.info('Adding new network connection', ssid=network.ssid, interface=self._interface)
+            connection = self._create_connection()
+            self._apply_network_settings(connection, network)
+            self._client.add_connection_async(connection, True, None, self._on_added, network)
+
+    def update_networks(self, networks: list[WifiNetwork], removed_ssids: list[str]) -> None:
+        for ssid in removed_ssids:
+            if connection := self._find_connection(ssid):
+                connection.delete_async(None, self._on_removed, ssid)
+            else:
+                log.warning('Network connection not found, not removed', ssid=ssid, interface=self._interface)
+
+        for network in networks:
+            if connection := self._find_connection(network.ssid):
+                self._apply_network_settings(connection, network)
+                connection.commit_changes_async(True, None, self._on_batch_updated, network)
+            else:
+                connection = self._create_connection()
+                self._apply_network_settings(connection, network)
+                self._client.add_connection_async(connection, True, None, self._on_batch_added, network)
+
+        log.info('Network batch submitted', added=len(networks), removed=len(removed_ssids),
+                 interface=self._interface)
+
+    def set_network_priorities(self, priorities: dict[str, int]) -> None:
+        for ssid, priority in priorities.items():
+            if connection := self._find_connection(ssid):
+                setting_connection = connection.get_setting_connection()
+                setting_connection.set_property(NM.SETTING_CONNECTION_AUTOCONNECT_PRIORITY, priority)
+                connection.commit_changes_async(True, None, self._on_priority_updated, ssid)
+            else:
+                log.warning('Network connection not found, priority not updated', ssid=ssid,
+                            interface=self._interface)
+
+    def scan(self, ssids: list[str]) -> Optional[dict[str, int]]:
+        device = self._get_device()
+        if not device or device.get_state() <= NM.DeviceState.UNAVAILABLE:
+            return None
 
+        scan_done = MainLoopEvent()
+        last_scan = device.get_last_scan()
+        handler_id = device.connect('notify::last-scan', lambda *args: scan_done.set())
+
+        try:
+            options = GLib.Variant('a{sv}', {'ssids': GLib.Variant('aay', [ssid.encode() for ssid in ssids])})
+            device.request_scan_options_async(options, None, self._on_scan_requested, ', '.join(ssids))
+
+            if not scan_done.wait(self._scan_timeout) or device.get_last_scan() == last_scan:
+                log.warning('Network scan timed out', interface=self._interface, timeout=self._scan_timeout)
+                return None
+        finally:
+            device.disconnect(handler_id)
+
+        return {ssid: self._strength_to_rssi(strength)
+                for ssid, strength in self._access_points.get_strengths(ssids).items()}
+
+    def reset_wireless(self) -> None:
+        if self._reset_waiter.is_waiting():
+            log.warning('Wireless reset already in progress', interface=self._interface)
+            return
+
+        log.info('Resetting wireless', interface=self._interface)
+        self._reset_started = time.monotonic()
+        self._reset_waiter.start()
+
+        if self._client.wireless_get_enabled():
+            self._reset_waiter.connect(self._client, 'notify::wireless-enabled', self._on_wireless_disabled)
+            self._client.wireless_set_enabled(False)
+        else:
+            self._enable_after_reset()
+
+    def enable_wireless(self) -> None:
+        self._client.wireless_set_enabled(True)
+
+    def _enable_after_reset(self) -> None:
+        self._reset_waiter.disconnect_all()
+
+        if not self._client.wireless_hardware_get_enabled():
+            log.warning('Wireless is disabled by hardware, waiting for it to be enabled', interface=self._interface)
+            self._reset_waiter.connect(
+                self._client, 'notify::wireless-hardware-enabled', self._on_wireless_hardware_enabled)
+            return
+
+        if device := self._get_device():
+            self._reset_waiter.connect(device, 'state-changed', self._on_device_state_changed_after_reset)
+            self._client.wireless_set_enabled(True)
+        else:
+            self._client.wireless_set_enabled(True)
+            self._complete_reset()
+
+    def _complete_reset(self) -> None:
+        self._reset_waiter.stop()
+        log.info('Wireless reset completed', interface=self._interface,
+                 duration=round(time.monotonic() - self._reset_started, 3))
+
+    def _on_wireless_disabled(self, client: Client, param: Any) -> None:
+        if not client.wireless_get_enabled():
+            self._enable_after_reset()
+
+    def _on_wireless_hardware_enabled(self, client: Client, param: Any) -> None:
+        if client.wireless_hardware_get_enabled():
+            self._enable_after_reset()
+
+    def _on_device_state_changed_after_reset(self, device: DeviceWifi, new: int, old: int, reason: int) -> None:
+        if new > NM.DeviceState.UNAVAILABLE:
+            self._complete_reset()
+
+    def _on_reset_timeout(self) -> None:
+        log.error('Wireless reset timed out, enabling wireless', interface=self._interface)
+        self._client.wireless_set_enabled(True)
+
+    def _find_connection(self, ssid: str) -> Optional[RemoteConnection]:
+        for connection in self._client.get_connections():
+            if connection.get_connection_type() != NM.SETTING_WIRELESS_SETTING_NAME:
+                continue
+
+            interface = connection.get_interface_name()
+            setting_wireless = connection.get_setting_wireless()
+
+            if interface in (None, self._interface) and setting_wireless and setting_wireless.get_ssid():
+                if bytes_to_str(setting_wireless.get_ssid()) == ssid:
+                    return connection
+
+        return None
+
+    def _create_connection(self) -> Connection:
         setting_connection = NM.SettingConnection.new()
-        setting_connection.set_property(NM.SETTING_CONNECTION_ID, network.ssid)
+        setting_connection.set_property(NM.SETTING_CONNECTION_UUID, NM.utils_uuid_generate())
         setting_connection.set_property(NM.SETTING_CONNECTION_INTERFACE_NAME, self._interface)
         setting_connection.set_property(NM.SETTING_CONNECTION_TYPE, NM.SETTING_WIRELESS_SETTING_NAME)
-        setting_connection.set_property(NM.SETTING_CONNECTION_AUTOCONNECT_PRIORITY, network.priority)
 
         setting_wireless = NM.SettingWireless.new()
-        setting_wireless.set_property(NM.SETTING_WIRELESS_SSID, ssid_bytes)
+        setting_wireless.set_property(NM.SETTING_WIRELESS_MODE, NM.SETTING_WIRELESS_MODE_INFRA)
 
-        setting_security = NM.SettingWirelessSecurity.new()
-        setting_security.set_property(NM.SETTING_WIRELESS_SECURITY_KEY_MGMT, 'wpa-psk')
-        setting_security.set_property(NM.SETTING_WIRELESS_SECURITY_PSK, network.password)
+        setting_ipv4 = NM.SettingIP4Config.new()
+        setting_ipv4.set_property(NM.SETTING_IP_CONFIG_METHOD, NM.SETTING_IP4_CONFIG_METHOD_AUTO)
+
+        setting_ipv6 = NM.SettingIP6Config.new()
+        setting_ipv6.set_property(NM.SETTING_IP_CONFIG_METHOD, NM.SETTING_IP6_CONFIG_METHOD_DISABLED)
 
         connection = NM.SimpleConnection.new()
         connection.add_setting(setting_connection)
         connection.add_setting(setting_wireless)
-        connection.add_setting(setting_security)
+        connection.add_setting(setting_ipv4)
+        connection.add_setting(setting_ipv6)
 
-        self._client.add_connection_async(connection, True, None, self._on_added, None)
+        return connection
 
-        if network.enabled:
-            self._activate_network(network.ssid, connection)
+    def _apply_network_settings(self, connection: Connection, network: WifiNetwork) -> None:
+        setting_connection = connection.get_setting_connection()
+        setting_connection.set_property(NM.SETTING_CONNECTION_ID, network.ssid)
+        setting_connection.set_property(NM.SETTING_CONNECTION_AUTOCONNECT, network.enabled)
+        setting_connection.set_property(NM.SETTING_CONNECTION_AUTOCONNECT_PRIORITY, network.priority)
 
-    def reset_wireless(self) -> None:
-        self._client.wireless_set_enabled(False)
-        time.sleep(1)
-        self._client.wireless_set_enabled(True)
+        setting_wireless = connection.get_setting_wireless()
+        setting_wireless.set_property(NM.SETTING_WIRELESS_SSID, str_to_bytes(network.ssid))
 
-    def enable_wireless(self) -> None:
-        self._client.wireless_set_enabled(True)
+        if not (setting_security := connection.get_setting_wireless_security()):
+            setting_security = NM.SettingWirelessSecurity.new()
+            connection.add_setting(setting_security)
+
+        setting_security.set_property(NM.SETTING_WIRELESS_SECURITY_KEY_MGMT, 'wpa-psk')
+        setting_security.set_property(NM.SETTING_WIRELESS_SECURITY_PSK, network.password)
 
     def _activate_network(self, ssid: str, connection: Connection) -> None:
         if device := self._get_device():
-            device.request_scan()
-
-            if ap := next((ap for ap in device.get_access_points() if bytes_to_str(ap.get_ssid()) == ssid), None):
-                self._client.activate_connection_async(
-                    connection, device, ap.get_path(), None, self._on_activated, None)
+            if previous_waiter := self._scan_waiters.pop(ssid, None):
+                previous_waiter.stop()
+
+            waiter = SignalWaiter(f'scan-{ssid}', self._scan_timeout,
+                                  partial(self._on_scan_timeout, ssid, connection, device))
+            waiter.connect(device, 'notify::last-scan', partial(self._on_scan_completed, ssid, connection))
+            waiter.start()
+            self._scan_waiters[ssid] = waiter
+
+            log.info('Requesting scan before activation', ssid=ssid, interface=self._interface)
+            options = GLib.Variant('a{sv}', {'ssids': GLib.Variant('aay', [ssid.encode()])})
+            device.request_scan_options_async(options, None, self._on_scan_requested, ssid)
+
+    def _activate_best_access_point(self, ssid: str, connection: Connection, device: DeviceWifi) -> None:
+        if access_points := self._access_points.find(ssid):
+            best_ap = max(access_points, key=lambda ap: int(ap.get_strength()))
+            log.info('Activating network', ssid=ssid, access_point=best_ap.get_bssid(), strength=best_ap.get_strength())
+            self._client.activate_connection_async(
+                connection, device, best_ap.get_path(), None, self._on_activated, None)
+        else:
+            log.warning('Network not found after scan, leaving activation to autoconnect', ssid=ssid)
+
+    def _on_scan_requested(self, device: DeviceWifi, result: AsyncResult, ssid: str) -> None:
+        try:
+            device.request_scan_finish(result)
+        except GLib.Error as error:
+            log.warning('Scan request rejected, waiting for ongoing scan', ssid=ssid, error=error.message)
+
+    def _on_scan_completed(self, ssid: str, connection: Connection, device: DeviceWifi, param: Any) -> None:
+        if waiter := self._scan_waiters.pop(ssid, None):
+            waiter.stop()
+
+        self._activate_best_access_point(ssid, connection, device)
+
+    def _on_scan_timeout(self, ssid: str, connection: Connection, device: DeviceWifi) -> None:
+        self._scan_waiters.pop(ssid, None)
+        self._activate_best_access_point(ssid, connection, device)
+
+    def _strength_to_rssi(self, strength: int) -> int:
+        return round(self._NOISE_FLOOR_DBM + strength * (self._SIGNAL_MAX_DBM - self._NOISE_FLOOR_DBM) / 100)
 
     def _get_device(self) -> Optional[DeviceWifi]:
-        return next((dev for dev in self._client.get_devices() if
-                     dev.get_iface() == self._interface and isinstance(dev, DeviceWifi)), None)
+        with self._device_lock:
+            if self._device is None:
+                if device := next((dev for dev in self._client.get_devices() if self._is_wireless_device(dev)), None):
+                    self._set_device(device)
+
+            return self._device
+
+    def _set_device(self, device: DeviceWifi) -> None:
+        with self._device_lock:
+            if self._device is device:
+                return
+
+            self._clear_device()
+            self._device = device
+
+            self._device_handlers = [
+                (self._client, self._client.connect('device-removed', self._on_device_removed)),
+                (device, device.connect('access-point-added', self._on_access_point_added)),
+                (device, device.connect('access-point-removed', self._on_access_point_removed)),
+            ]
+
+            for access_point in device.get_access_points():
+                self._access_points.add(access_point)
+
+    def _clear_device(self) -> None:
+        with self._device_lock:
+            for source, handler_id in self._device_handlers:
+                source.disconnect(handler_id)
+
+            self._device_handlers = []
+            self._device = None
+            self._access_points.clear()
+
+    def _is_wireless_device(self, device: Device) -> bool:
+        return bool(device.get_iface() == self._interface and isinstance(device, DeviceWifi))
+
+    def _wait_for_device(self) -> None:
+        self._device_waiter.connect(self._client, 'device-added', self._on_device_added)
+        self._device_waiter.start()
+
+    def _add_pending_handlers(self, device: DeviceWifi) -> None:
+        self._device_waiter.stop()
+
+        with self._pending_lock:
+            handlers = self._pending_handlers
+            self._pending_handlers = []
+
+        for handler in handlers:
+            device.connect('state-changed', handler)
+            log.info('Added connection handler', interface=self._interface)
+
+    def _on_device_added(self, client: Client, device: Device) -> None:
+        if self._is_wireless_device(device):
+            log.info('Wireless device appeared', interface=self._interface)
+            self._set_device(device)
+            self._add_pending_handlers(device)
+
+    def _on_device_removed(self, client: Client, device: Device) -> None:
+        if device is self._device:
+            log.info('Wireless device removed', interface=self._interface)
+            self._clear_device()
+
+    def _on_access_point_added(self, device: DeviceWifi, access_point: AccessPoint) -> None:
+        self._access_points.add(access_point)
+
+    def _on_access_point_removed(self, device: DeviceWifi, access_point: AccessPoint) -> None:
+        self._access_points.remove(access_point)
+
+    def _on_device_timeout(self) -> None:
+        if device := self._get_device():
+            self._add_pending_handlers(device)
+            return
+
+        with self._pending_lock:
+            pending = len(self._pending_handlers)
+
+        log.error('Wireless device did not appear, still waiting for it', interface=self._interface,
+                  pending_handlers=pending)
+        self._wait_for_device()
+
+    def _on_added(self, client: Client, result: AsyncResult, network: WifiNetwork) -> None:
+        try:
+            connection = client.add_connection_finish(result)
+        except GLib.Error as error:
+            log.error('Failed to add network', ssid=network.ssid, error=error.message)
+            return
+
+        if network.enabled:
+            self._activate_network(network.ssid, connection)
+
+    def _on_updated(self, connection: RemoteConnection, result: AsyncResult, network: WifiNetwork) -> None:
+        try:
+            connection.commit_changes_finish(result)
+        except GLib.Error as error:
+            log.error('Failed to update network', ssid=network.ssid, error=error.message)
+            return
+
+        if network.enabled:
+            self._activate_network(network.ssid, connection)
 
-    def _on_added(self, client: Client, result: AsyncResult, data: Any) -> None:
-        client.add_connection_finish(result)
+    def _on_batch_added(self, client: Client, result: AsyncResult, network: WifiNetwork) -> None:
+        try:
+            client.add_connection_finish(result)
+        except GLib.Error as error:
+            log.error('Failed to add network', ssid=network.ssid, error=error.message)
+
+    def _on_batch_updated(self, connection: RemoteConnection, result: AsyncResult, network: WifiNetwork) -> None:
+        try:
+            connection.commit_changes_finish(result)
+        except GLib.Error as error:
+            log.error('Failed to update network', ssid=network.ssid, error=error.message)
+
+    def _on_removed(self, connection: RemoteConnection, result: AsyncResult, ssid: str) -> None:
+        try:
+            connection.delete_finish(result)
+            log.info('Network removed', ssid=ssid, interface=self._interface)
+        except GLib.Error as error:
+            log.error('Failed to remove network', ssid=ssid, error=error.message)
+
+    def _on_priority_updated(self, connection: RemoteConnection, result: AsyncResult, ssid: str) -> None:
+        try:
+            connection.commit_changes_finish(result)
+            log.info('Network priority updated', ssid=ssid, interface=self._interface)
+        except GLib.Error as error:
+            log.error('Failed to update network priority', ssid=ssid, error=error.message)
 
     def _on_activated(self, client: Client, result: AsyncResult, data: Any) -> None:
         client.activate_connection_finish(result)
@@ -0,0 +1,57 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+from threading import RLock
+from typing import Any, Optional
+
+from context_logger import get_logger
+from gi.repository import GLib
+
+log = get_logger('SignalWaiter')
+
+
+class SignalWaiter(object):
+
+    def __init__(self, name: str, timeout: float, on_timeout: Any) -> None:
+        self._name = name
+        self._timeout = timeout
+        self._on_timeout = on_timeout
+        self._handlers: list[tuple[Any, int]] = []
+        self._timeout_id: Optional[int] = None
+        self._lock = RLock()
+
+    def connect(self, source: Any, signal: str, handler: Any) -> None:
+        with self._lock:
+            self._handlers.append((source, source.connect(signal, handler)))
+
+    def disconnect_all(self) -> None:
+        with self._lock:
+            for source, handler_id in self._handlers:
+                source.disconnect(handler_id)
+            self._handlers.clear()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._timeout_id is None:
+                self._timeout_id = GLib.timeout_add(int(self._timeout * 1000), self._on_timeout_elapsed)
+
+    def stop(self) -> None:
+        with self._lock:
+            self.disconnect_all()
+            if self._timeout_id is not None:
+                GLib.source_remove(self._timeout_id)
+                self._timeout_id = None
+
+    def is_waiting(self) -> bool:
+        return self._timeout_id is not None
+
+    def _on_timeout_elapsed(self) -> bool:
+        with self._lock:
+            self._timeout_id = None
+            self.disconnect_all()
+
+        log.warning('Timed out waiting for signal', waiter=self._name, timeout=self._timeout)
+        self._on_timeout()
+
+        return False
@@ -0,0 +1,77 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+from threading import Lock
+from typing import Any, Optional
+
+import dbus
+from context_logger import get_logger
+from dbus import SystemBus
+
+log = get_logger('SystemdUnitMonitor')
+
+
+class SystemdUnitMonitor(object):
+    _SYSTEMD_NAME = 'org.freedesktop.systemd1'
+    _UNIT_INTERFACE = 'org.freedesktop.systemd1.Unit'
+    _WATCHED_PROPERTIES = ('ActiveState', 'SubState')
+
+    def __init__(self, system_bus: SystemBus) -> None:
+        self._system_bus = system_bus
+        self._handlers: dict[str, list[Any]] = {}
+        self._states: dict[str, dict[str, str]] = {}
+        self._signal_match: Optional[Any] = None
+        self._lock = Lock()
+
+    def add_handler(self, unit_path: str, handler: Any) -> None:
+        with self._lock:
+            if self._signal_match is None:
+                self._signal_match = self._system_bus.add_signal_receiver(self._on_properties_changed,
+                                                                          signal_name='PropertiesChanged',
+                                                                          dbus_interface=dbus.PROPERTIES_IFACE,
+                                                                          bus_name=self._SYSTEMD_NAME,
+                                                                          arg0=self._UNIT_INTERFACE,
+                                                                          path_keyword='path')
+
+            self._handlers.setdefault(unit_path, []).append(handler)
+
+        log.debug('Unit handler added', path=unit_path)
+
+    def remove_handler(self, unit_path: str, handler: Any) -> None:
+        with self._lock:
+            handlers = self._handlers.get(unit_path, [])
+            if handler in handlers:
+                handlers.remove(handler)
+
+            if not handlers:
+                self._handlers.pop(unit_path, None)
+                self._states.pop(unit_path, None)
+
+            if not self._handlers and self._signal_match:
+                self._signal_match.remove()
+                self._signal_match = None
+
+    def get_unit_paths(self) -> list[str]:
+        with self._lock:
+            return list(self._handlers)
+
+    def _on_properties_changed(self, interface: str, changed: dict[str, Any], invalidated: list[str],
+                               path: Optional[str] = None) -> None:
+        unit_path = str(path)
+
+        with self._lock:
+            handlers = list(self._handlers.get(unit_path, []))
+            if not handlers:
+                return
+
+            states = self._states.setdefault(unit_path, {})
+            delta = {}
+            for name in self._WATCHED_PROPERTIES:
+                if name in changed and states.get(name) != changed[name]:
+                    delta[name] = str(changed[name])
+                    states[name] = delta[name]
+
+        if delta:
+            for handler in handlers:
+                handler(interface, delta, invalidated)
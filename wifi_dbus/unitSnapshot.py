@@ -0,0 +1,125 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+import os
+from dataclasses import dataclass
+from functools import partial
+from threading import Lock
+from typing import Any, Optional
+
+import dbus
+from context_logger import get_logger
+from dbus import SystemBus
+
+from wifi_dbus import AsyncDbus, SystemdUnitMonitor
+
+log = get_logger('UnitSnapshot')
+
+
+@dataclass
+class UnitState(object):
+    path: str
+    load_state: str
+    active_state: str
+    sub_state: str
+    unit_file_state: Optional[str]
+
+    def is_installed(self) -> bool:
+        return self.unit_file_state is not None or self.load_state not in ('not-found', '')
+
+    def is_enabled(self) -> bool:
+        return self.unit_file_state == 'enabled'
+
+    def is_masked(self) -> bool:
+        return self.unit_file_state == 'masked' or self.load_state == 'masked'
+
+
+class UnitSnapshot(object):
+    _SYSTEMD_NAME = 'org.freedesktop.systemd1'
+    _SYSTEMD_PATH = '/org/freedesktop/systemd1'
+    _MANAGER_INTERFACE = 'org.freedesktop.systemd1.Manager'
+    _UNIT_SUFFIX = '.service'
+
+    def __init__(self, system_bus: SystemBus, async_dbus: AsyncDbus,
+                 unit_monitor: Optional[SystemdUnitMonitor] = None) -> None:
+        self._system_bus = system_bus
+        self._async_dbus = async_dbus
+        self._unit_monitor = unit_monitor
+        self._units: dict[str, UnitState] = {}
+        self._monitored_paths: set[str] = set()
+        self._signal_match: Optional[Any] = None
+        self._lock = Lock()
+
+    def refresh(self, service_names: list[str]) -> None:
+        unit_names = dbus.Array([f'{name}{self._UNIT_SUFFIX}' for name in service_names], signature='s')
+
+        try:
+            loaded_units, unit_files = self._async_dbus.gather([
+                self._async_dbus.call(self._SYSTEMD_NAME, self._SYSTEMD_PATH, self._MANAGER_INTERFACE,
+                                      'ListUnitsByNames', unit_names),
+                self._async_dbus.call(self._SYSTEMD_NAME, self._SYSTEMD_PATH, self._MANAGER_INTERFACE,
+                                      'ListUnitFilesByPatterns', dbus.Array([], signature='s'), unit_names)
+            ])
+        except Exception as error:
+            log.warning('Failed to fetch unit snapshot, falling back to per-unit queries', error=str(error))
+            self.clear()
+            return
+
+        if isinstance(loaded_units, BaseException) or isinstance(unit_files, BaseException):
+            log.warning('Failed to fetch unit snapshot, falling back to per-unit queries',
+                        error=str(loaded_units if isinstance(loaded_units, BaseException) else unit_files))
+            self.clear()
+            return
+
+        unit_file_states = {os.path.basename(str(path)): str(state) for path, state in unit_files}
+
+        with self._lock:
+            self._units.clear()
+            for unit in loaded_units:
+                unit_name = str(unit[0])
+                self._units[unit_name.removesuffix(self._UNIT_SUFFIX)] = UnitState(
+                    str(unit[6]), str(unit[2]), str(unit[3]), str(unit[4]), unit_file_states.get(unit_name))
+
+        self._subscribe()
+
+        log.info('Unit snapshot refreshed', units=len(self._units))
+
+    def get(self, service_name: str) -> Optional[UnitState]:
+        with self._lock:
+            return self._units.get(service_name)
+
+    def invalidate(self, service_name: str) -> None:
+        with self._lock:
+            self._units.pop(service_name, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._units.clear()
+
+    def _subscribe(self) -> None:
+        if self._signal_match is None:
+            self._signal_match = self._system_bus.add_signal_receiver(self._on_unit_files_changed,
+                                                                      signal_name='UnitFilesChanged',
+                                                                      dbus_interface=self._MANAGER_INTERFACE,
+                                                                      bus_name=self._SYSTEMD_NAME)
+
+        if self._unit_monitor:
+            with self._lock:
+                units = [(name, state.path) for name, state in self._units.items()
+                         if state.path not in self._monitored_paths]
+                self._monitored_paths.update(path for _, path in units)
+
+            for name, path in units:
+                self._unit_monitor.add_handler(path, partial(self._on_unit_changed, name))
+
+    def _on_unit_files_changed(self) -> None:
+        log.debug('Unit files changed, dropping unit snapshot')
+        self.clear()
+
+    def _on_unit_changed(self, service_name: str, interface: str, changed: dict[str, str],
+                         invalidated: list[str]) -> None:
+        with self._lock:
+            if unit_state := self._units.get(service_name):
+                unit_state.active_state = changed.get('ActiveState', unit_state.active_state)
+                unit_state.sub_state = changed.get('SubState', unit_state.sub_state)
@@ -35,6 +35,15 @@ class IWifiDbus(object):
     def add_network(self, network: WifiNetwork) -> Any:
         raise NotImplementedError()
 
+    def update_networks(self, networks: list[WifiNetwork], removed_ssids: list[str]) -> None:
+        raise NotImplementedError()
+
+    def set_network_priorities(self, priorities: dict[str, int]) -> None:
+        raise NotImplementedError()
+
+    def scan(self, ssids: list[str]) -> Optional[dict[str, int]]:
+        raise NotImplementedError()
+
     def reset_wireless(self) -> None:
         raise NotImplementedError()
 
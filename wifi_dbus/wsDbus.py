@@ -2,22 +2,37 @@
 # SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
 # SPDX-License-Identifier: MIT
 
+from functools import partial
 from typing import Any, Optional
 
 import dbus
+from context_logger import get_logger
 from dbus import SystemBus, Interface, DBusException
 
-from wifi_config import WifiNetwork
-from wifi_dbus import IWifiDbus, ServiceError, PropertyError, InterfaceError
+from wifi_config import WifiNetwork, is_wpa_psk
+from wifi_dbus import (
+    IWifiDbus,
+    ServiceError,
+    PropertyError,
+    InterfaceError,
+    DbusProxyCache,
+    DbusPropertyMirror,
+    MainLoopEvent,
+)
+
+log = get_logger('WpaSupplicantDbus')
 
 
 class WpaSupplicantDbus(IWifiDbus):
 
-    def __init__(self, interface: str, system_bus: SystemBus) -> None:
+    def __init__(self, interface: str, system_bus: SystemBus, scan_timeout: float = 10) -> None:
         self._interface = interface
         self._system_bus = system_bus
-        self._dbus_interface = WpaSupplicantInterface(interface, system_bus)
-        self._dbus_network = WpaSupplicantNetwork(system_bus)
+        self._scan_timeout = scan_timeout
+        self._proxy_cache = DbusProxyCache(system_bus)
+        self._dbus_interface = WpaSupplicantInterface(interface, system_bus, self._proxy_cache)
+        self._dbus_network = WpaSupplicantNetwork(system_bus, self._proxy_cache)
+        self._dbus_bss = WpaSupplicantBSS(system_bus, self._proxy_cache)
 
     def get_interface(self) -> str:
         return self._interface
@@ -39,50 +54,140 @@ class WpaSupplicantDbus(IWifiDbus):
     def add_network(self, network: WifiNetwork) -> None:
         self._dbus_interface.initialize()
 
-        network_properties = {
+        network_path = self._save_network(network)
+
+        if network.enabled:
+            self._dbus_network.enable_network(network_path)
+
+    def update_networks(self, networks: list[WifiNetwork], removed_ssids: list[str]) -> None:
+        self._dbus_interface.initialize()
+
+        for ssid in removed_ssids:
+            if network_path := self._find_network(ssid):
+                self._dbus_interface.remove_network(network_path)
+                log.info('Network removed', ssid=ssid, path=network_path)
+
+        for network in networks:
+            self._save_network(network)
+
+    def _save_network(self, network: WifiNetwork) -> dbus.ObjectPath:
+        network_properties: dict[str, Any] = {
             'ssid': network.ssid,
-            'psk': network.password,
+            'psk': self._get_psk(network.password),
             'disabled': str(int(not network.enabled)),
             'priority': str(network.priority)
         }
-        self._dbus_interface.add_network(network_properties)
+
+        if network_path := self._find_network(network.ssid):
+            self._dbus_network.set_network_properties(network_path, network_properties)
+            log.info('Network updated', ssid=network.ssid, path=network_path)
+        else:
+            network_path = self._dbus_interface.add_network(network_properties)
+            log.info('Network added', ssid=network.ssid, path=network_path)
+
+        return dbus.ObjectPath(network_path)
+
+    def set_network_priorities(self, priorities: dict[str, int]) -> None:
+        self._dbus_interface.initialize()
+
+        for network_path in self._dbus_interface.get_networks():
+            ssid = str(self._dbus_network.get_network_ssid(network_path))
+            if ssid in priorities:
+                self._dbus_network.set_network_properties(network_path, {'priority': str(priorities[ssid])})
+                log.info('Network priority updated', ssid=ssid, priority=priorities[ssid], path=network_path)
+
+    def scan(self, ssids: list[str]) -> Optional[dict[str, int]]:
+        self._dbus_interface.initialize()
+
+        scan_done = MainLoopEvent()
+        match = self._system_bus.add_signal_receiver(partial(self._on_scan_done, scan_done),
+                                                     dbus_interface=self._dbus_interface.INTERFACE_NAME,
+                                                     signal_name='ScanDone',
+                                                     path=self._dbus_interface.get_interface_path())
+
+        try:
+            self._dbus_interface.scan_ssids(ssids)
+
+            if not scan_done.wait(self._scan_timeout):
+                log.warning('Network scan timed out', interface=self._interface, timeout=self._scan_timeout)
+                return None
+        except (ServiceError, InterfaceError) as error:
+            log.warning('Network scan failed', interface=self._interface, error=error)
+            return None
+        finally:
+            match.remove()
+
+        return self._get_signals(ssids)
+
+    def _get_signals(self, ssids: list[str]) -> dict[str, int]:
+        signals: dict[str, int] = {}
+
+        for bss_path in self._dbus_interface.get_BSSs():
+            try:
+                properties = self._dbus_bss.get_bss_properties(bss_path)
+            except PropertyError:
+                continue
+
+            ssid = bytes(properties['SSID']).decode('utf-8', errors='replace')
+            if ssid in ssids:
+                signal = int(properties['Signal'])
+                signals[ssid] = max(signal, signals.get(ssid, signal))
+
+        return signals
+
+    def _on_scan_done(self, scan_done: MainLoopEvent, success: bool) -> None:
+        if success:
+            scan_done.set()
+
+    def _get_psk(self, password: str) -> Any:
+        if is_wpa_psk(password):
+            return dbus.ByteArray(bytes.fromhex(password))
+
+        return password
+
+    def _find_network(self, ssid: str) -> Optional[dbus.ObjectPath]:
+        for network_path in self._dbus_interface.get_networks():
+            if self._dbus_network.get_network_ssid(network_path) == ssid.strip('"'):
+                return dbus.ObjectPath(network_path)
+
+        return None
 
 
 class WpaSupplicant(object):
     _BASE_NAME = 'fi.w1.wpa_supplicant1'
     _BASE_PATH = '/fi/w1/wpa_supplicant1'
 
-    def __init__(self, system_bus: SystemBus) -> None:
+    def __init__(self, system_bus: SystemBus, proxy_cache: Optional[DbusProxyCache] = None) -> None:
         self._system_bus = system_bus
+        self._proxy_cache = proxy_cache if proxy_cache else DbusProxyCache(system_bus)
+
+    def _get_properties_interface(self, object_path: str) -> Interface:
+        return self._proxy_cache.get_interface(self._BASE_NAME, object_path, dbus.PROPERTIES_IFACE)
 
     def __get_interface(self) -> Interface:
         try:
-            obj = self._system_bus.get_object(self._BASE_NAME, self._BASE_PATH)
-            return Interface(obj, self._BASE_NAME)
+            return self._proxy_cache.get_interface(self._BASE_NAME, self._BASE_PATH, self._BASE_NAME)
         except DBusException as error:
             raise ServiceError(error)
 
     def __get_properties(self) -> Any:
         try:
-            obj = self._system_bus.get_object(self._BASE_NAME, self._BASE_PATH)
-            properties_interface = Interface(obj, dbus.PROPERTIES_IFACE)
+            properties_interface = self._get_properties_interface(self._BASE_PATH)
             return properties_interface.GetAll(self._BASE_NAME)
         except DBusException as error:
             raise ServiceError(error)
 
     def __get_property(self, property_name: str) -> Any:
         try:
-            obj = self._system_bus.get_object(self._BASE_NAME, self._BASE_PATH)
-            properties_interface = Interface(obj, dbus.PROPERTIES_IFACE)
+            properties_interface = self._get_properties_interface(self._BASE_PATH)
             return properties_interface.Get(self._BASE_NAME, property_name)
         except DBusException as error:
             raise PropertyError(error)
 
     def __set_property(self, property_name: str, property_value: Any) -> None:
         try:
-            obj = self._system_bus.get_object(self._BASE_NAME, self._BASE_PATH)
-            properties_interface = Interface(obj, dbus.PROPERTIES_IFACE)
-            properties_interface.Set(self._BASE_NAME, property_name, property_value)
+            properties_interface = self._get_properties_interface(self._BASE_PATH)
+            properties_interface.Set(self._BASE_NAME, property_name, property_value, signature='ssv')
         except DBusException as error:
             raise PropertyError(error)
 
@@ -92,7 +197,7 @@ class WpaSupplicant(object):
             return wpa_interface.GetInterface(interface)
         except DBusException as error:
             if "InterfaceUnknown" in error.get_dbus_name():
-                self.create_interface(interface)
+                return self.create_interface(interface)
             else:
                 raise InterfaceError(error)
 
@@ -148,44 +253,84 @@ class WpaSupplicant(object):
 class WpaSupplicantInterface(WpaSupplicant):
     INTERFACE_NAME = "fi.w1.wpa_supplicant1.Interface"
     _DEFAULT_INTERFACE_PATH = "/fi/w1/wpa_supplicant1/Interfaces/0"
+    _MIRRORED_PROPERTIES = {'State', 'CurrentNetwork', 'CurrentBSS', 'BSSs', 'Scanning', 'DisconnectReason'}
 
-    def __init__(self, interface: str, system_bus: SystemBus) -> None:
+    def __init__(self, interface: str, system_bus: SystemBus, proxy_cache: Optional[DbusProxyCache] = None) -> None:
 
-        super(WpaSupplicantInterface, self).__init__(system_bus)
+        super(WpaSupplicantInterface, self).__init__(system_bus, proxy_cache)
         self._interface_path = self._DEFAULT_INTERFACE_PATH
+        self._resolved_path: Optional[str] = None
+        self._property_mirror = DbusPropertyMirror(self.INTERFACE_NAME, self._MIRRORED_PROPERTIES)
+        self._properties_match: Optional[Any] = None
         self.interface = interface
 
+        self._proxy_cache.add_invalidation_handler(self._BASE_NAME, self.reset_interface_path)
+        self._system_bus.add_signal_receiver(self._on_interface_removed,
+                                             dbus_interface=self._BASE_NAME,
+                                             signal_name='InterfaceRemoved',
+                                             path=self._BASE_PATH)
+
     def initialize(self) -> None:
-        self._interface_path = self.get_interface_path()
+        interface_path = self.get_interface_path()
+
+        if interface_path != self._interface_path:
+            self._interface_path = interface_path
+            self._clear_property_mirror()
 
     def __get_interface(self) -> dbus.Interface:
         try:
-            obj = self._system_bus.get_object(self._BASE_NAME, self._interface_path)
-            return dbus.Interface(obj, self.INTERFACE_NAME)
+            return self._proxy_cache.get_interface(self._BASE_NAME, self._interface_path, self.INTERFACE_NAME)
         except DBusException as error:
             raise InterfaceError(error)
 
     def __get_property(self, property_name: str) -> Any:
         try:
-            obj = self._system_bus.get_object(self._BASE_NAME, self._interface_path)
-            properties_interface = dbus.Interface(obj, dbus.PROPERTIES_IFACE)
+            properties_interface = self._get_properties_interface(self._interface_path)
             return properties_interface.Get(self.INTERFACE_NAME, property_name)
         except DBusException as error:
             raise PropertyError(error)
 
+    def __get_mirrored_property(self, property_name: str) -> Any:
+        if not self._property_mirror.is_seeded():
+            self.refresh_properties()
+
+        if self._property_mirror.contains(property_name):
+            return self._property_mirror.get(property_name)
+        else:
+            return self.__get_property(property_name)
+
     def __set_property(self, property_name: str, property_value: Any) -> None:
         try:
-            obj = self._system_bus.get_object(self._BASE_NAME, self._interface_path)
-            properties_interface = dbus.Interface(obj, dbus.PROPERTIES_IFACE)
-            properties_interface.Set(self.INTERFACE_NAME, property_name, property_value)
+            properties_interface = self._get_properties_interface(self._interface_path)
+            properties_interface.Set(self.INTERFACE_NAME, property_name, property_value, signature='ssv')
         except DBusException as error:
             raise PropertyError(error)
 
     def get_interface_path(self) -> Any:
+        if self._resolved_path is None:
+            try:
+                self._resolved_path = self.get_interface(self.interface)
+            except InterfaceError:
+                return self._DEFAULT_INTERFACE_PATH
+
+        return self._resolved_path
+
+    def reset_interface_path(self) -> None:
+        self._resolved_path = None
+        self._clear_property_mirror()
+
+    def refresh_properties(self) -> None:
+        if self._properties_match is None:
+            self._properties_match = self._system_bus.add_signal_receiver(self._property_mirror.update,
+                                                                          dbus_interface=self.INTERFACE_NAME,
+                                                                          signal_name='PropertiesChanged',
+                                                                          path=self._interface_path)
+
         try:
-            return self.get_interface(self.interface)
-        except InterfaceError:
-            return self._DEFAULT_INTERFACE_PATH
+            properties_interface = self._get_properties_interface(self._interface_path)
+            self._property_mirror.seed(properties_interface.GetAll(self.INTERFACE_NAME))
+        except DBusException as error:
+            raise PropertyError(error)
 
     def scan(self) -> Any:
         interface = self.__get_interface()
@@ -194,7 +339,15 @@ class WpaSupplicantInterface(WpaSupplicant):
         except DBusException as error:
             raise ServiceError(error)
 
-    def add_network(self, network: dict[str, str]) -> Any:
+    def scan_ssids(self, ssids: list[str]) -> Any:
+        interface = self.__get_interface()
+        try:
+            ssid_list = dbus.Array([dbus.ByteArray(ssid.encode()) for ssid in ssids], signature='ay')
+            return interface.Scan(dbus.Dictionary({"Type": "active", "SSIDs": ssid_list}, 'sv'))
+        except DBusException as error:
+            raise ServiceError(error)
+
+    def add_network(self, network: dict[str, Any]) -> Any:
         interface = self.__get_interface()
         try:
             return interface.AddNetwork(dbus.Dictionary(network, 'sv'))
@@ -204,7 +357,7 @@ class WpaSupplicantInterface(WpaSupplicant):
     def remove_network(self, network_path: str) -> Any:
         interface = self.__get_interface()
         try:
-            interface.RemoveNetwork(network_path)
+            interface.RemoveNetwork(dbus.ObjectPath(network_path))
         except DBusException as error:
             raise ServiceError(error)
 
@@ -218,14 +371,14 @@ class WpaSupplicantInterface(WpaSupplicant):
     def select_network(self, network_path: str) -> Any:
         interface = self.__get_interface()
         try:
-            interface.SelectNetwork(network_path)
+            interface.SelectNetwork(dbus.ObjectPath(network_path))
         except DBusException as error:
             raise ServiceError(error)
 
     def network_reply(self, network_path: str, parameter: str, value: str) -> Any:
         interface = self.__get_interface()
         try:
-            interface.NetworkReply(network_path, parameter, value)
+            interface.NetworkReply(dbus.ObjectPath(network_path), parameter, value)
         except DBusException as error:
             raise ServiceError(error)
 
@@ -261,19 +414,19 @@ class WpaSupplicantInterface(WpaSupplicant):
             raise ServiceError(error)
 
     def get_state(self) -> Any:
-        return self.__get_property("State")
+        return self.__get_mirrored_property("State")
 
     def get_current_BSS(self) -> Any:
-        return self.__get_property("CurrentBSS")
+        return self.__get_mirrored_property("CurrentBSS")
 
     def get_BSSs(self) -> Any:
-        return self.__get_property("BSSs")
+        return self.__get_mirrored_property("BSSs")
 
     def get_interface_name(self) -> Any:
         return self.__get_property("Ifname")
 
     def get_scanning(self) -> Any:
-        return self.__get_property("Scanning")
+        return self.__get_mirrored_property("Scanning")
 
     def get_ap_scan(self) -> Any:
         return self.__get_property("ApScan")
@@ -288,29 +441,54 @@ class WpaSupplicantInterface(WpaSupplicant):
         return self.__set_property("ScanInterval", dbus.Int32(value))
 
     def get_current_network(self) -> Any:
-        return self.__get_property("CurrentNetwork")
+        return self.__get_mirrored_property("CurrentNetwork")
 
     def get_networks(self) -> Any:
         return self.__get_property("Networks")
 
     def get_disconnect_reason(self) -> Any:
-        return self.__get_property("DisconnectReason")
+        return self.__get_mirrored_property("DisconnectReason")
+
+    def _clear_property_mirror(self) -> None:
+        self._property_mirror.clear()
+
+        if self._properties_match:
+            self._properties_match.remove()
+            self._properties_match = None
+
+    def _on_interface_removed(self, interface_path: str) -> None:
+        if interface_path == self._resolved_path:
+            log.info('Interface removed', interface=self.interface, path=interface_path)
+            self._proxy_cache.invalidate(self._BASE_NAME, interface_path)
+            self.reset_interface_path()
 
 
 class WpaSupplicantNetwork(WpaSupplicant):
     _NETWORK_NAME = "fi.w1.wpa_supplicant1.Network"
 
-    def __init__(self, system_bus: SystemBus) -> None:
-        super(WpaSupplicantNetwork, self).__init__(system_bus)
+    def __init__(self, system_bus: SystemBus, proxy_cache: Optional[DbusProxyCache] = None) -> None:
+        super(WpaSupplicantNetwork, self).__init__(system_bus, proxy_cache)
 
     def __get_properties(self, network_path: str) -> Any:
         try:
-            obj = self._system_bus.get_object(self._BASE_NAME, network_path)
-            properties_interface = dbus.Interface(obj, dbus.PROPERTIES_IFACE)
+            properties_interface = self._get_properties_interface(network_path)
             return properties_interface.GetAll(self._NETWORK_NAME)
         except DBusException as error:
             raise PropertyError(error)
 
+    def __set_property(self, network_path: str, property_name: str, property_value: Any) -> None:
+        try:
+            properties_interface = self._get_properties_interface(network_path)
+            properties_interface.Set(self._NETWORK_NAME, property_name, property_value, signature='ssv')
+        except DBusException as error:
+            raise PropertyError(error)
+
+    def set_network_properties(self, network_path: str, properties: dict[str, Any]) -> None:
+        self.__set_property(network_path, 'Properties', dbus.Dictionary(properties, 'sv'))
+
+    def enable_network(self, network_path: str) -> None:
+        self.__set_property(network_path, "Enabled", dbus.Boolean(True))
+
     def network_enable(self, network_path: str) -> Any:
         return self.__get_properties(network_path)['Enable']
 
@@ -322,3 +500,17 @@ class WpaSupplicantNetwork(WpaSupplicant):
 
     def reset_wireless(self) -> None:
         pass
+
+
+class WpaSupplicantBSS(WpaSupplicant):
+    _BSS_NAME = "fi.w1.wpa_supplicant1.BSS"
+
+    def __init__(self, system_bus: SystemBus, proxy_cache: Optional[DbusProxyCache] = None) -> None:
+        super(WpaSupplicantBSS, self).__init__(system_bus, proxy_cache)
+
+    def get_bss_properties(self, bss_path: str) -> Any:
+        try:
+            properties_interface = self._get_properties_interface(bss_path)
+            return properties_interface.GetAll(self._BSS_NAME)
+        except DBusException as error:
+            raise PropertyError(error)
@@ -1,4 +1,7 @@
 from .wifiControl import *
+from .networkHistory import *
+from .networkRanker import *
+from .networkWatcher import *
 from .wifiEventHandler import *
 from .wifiWebServer import *
 from .wifiManager import *
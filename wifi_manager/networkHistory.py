@@ -0,0 +1,217 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+import json
+import math
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, asdict, fields, field
+from threading import RLock
+from typing import Any, Optional
+
+from context_logger import get_logger
+
+from wifi_utility import AtomicFileWriter
+
+log = get_logger('NetworkHistory')
+
+CONNECT_TIME_BUCKETS = [1, 2, 3, 4, 5, 6, 8, 10, 12, 15, 20, 25, 30, 40, 50, 60, 90, 120]
+
+
+@dataclass
+class NetworkStats:
+    attempts: int = 0
+    successes: int = 0
+    failures: int = 0
+    total_time_to_ip: float = 0.0
+    total_uptime: float = 0.0
+    last_rssi: Optional[int] = None
+    last_connected: Optional[float] = None
+    connect_times: list[int] = field(default_factory=lambda: [0] * (len(CONNECT_TIME_BUCKETS) + 1))
+    censored_times: list[int] = field(default_factory=lambda: [0] * (len(CONNECT_TIME_BUCKETS) + 1))
+
+    def __post_init__(self) -> None:
+        if len(self.connect_times) != len(CONNECT_TIME_BUCKETS) + 1:
+            self.connect_times = [0] * (len(CONNECT_TIME_BUCKETS) + 1)
+        if len(self.censored_times) != len(CONNECT_TIME_BUCKETS) + 1:
+            self.censored_times = [0] * (len(CONNECT_TIME_BUCKETS) + 1)
+
+    def add_connect_time(self, duration: float) -> None:
+        self.connect_times[bisect_left(CONNECT_TIME_BUCKETS, duration)] += 1
+
+    def add_censored_time(self, duration: float) -> None:
+        self.censored_times[bisect_right(CONNECT_TIME_BUCKETS, duration)] += 1
+
+    def get_connect_time_count(self) -> int:
+        return sum(self.connect_times) + sum(self.censored_times)
+
+    def get_connect_time_percentile(self, percentile: float) -> Optional[float]:
+        if not (total := self.get_connect_time_count()):
+            return None
+
+        threshold = math.ceil(total * percentile / 100)
+        cumulative = 0
+
+        for index, count in enumerate(map(sum, zip(self.connect_times, self.censored_times))):
+            cumulative += count
+            if cumulative >= threshold:
+                return float(CONNECT_TIME_BUCKETS[index]) if index < len(CONNECT_TIME_BUCKETS) else math.inf
+
+        return math.inf
+
+    def get_success_rate(self) -> float:
+        return (self.successes + 1) / (self.attempts + 2)
+
+    def get_mean_time_to_ip(self) -> Optional[float]:
+        return self.total_time_to_ip / self.successes if self.successes else None
+
+    def get_mean_uptime(self) -> Optional[float]:
+        return self.total_uptime / self.successes if self.successes else None
+
+
+class NetworkHistory(object):
+
+    def __init__(self, state_file: str, file_writer: Optional[AtomicFileWriter] = None) -> None:
+        self._state_file = state_file
+        self._file_writer = file_writer if file_writer else AtomicFileWriter()
+        self._networks: dict[str, NetworkStats] = self._load_state()
+        self._attempt_started: Optional[float] = None
+        self._current_ssid: Optional[str] = None
+        self._connected_since: Optional[float] = None
+        self._lock = RLock()
+
+    def get_stats(self, ssid: str) -> Optional[NetworkStats]:
+        with self._lock:
+            return self._networks.get(ssid)
+
+    def get_all_stats(self) -> dict[str, NetworkStats]:
+        with self._lock:
+            return dict(self._networks)
+
+    def get_connect_time_percentile(self, ssids: list[str], percentile: float, min_samples: int) -> Optional[float]:
+        with self._lock:
+            stats = [self._networks.get(ssid) for ssid in ssids]
+
+            if not stats or any(not network or network.get_connect_time_count() < min_samples for network in stats):
+                return None
+
+            values = [network.get_connect_time_percentile(percentile) for network in stats if network]
+
+        return max((value for value in values if value is not None), default=None)
+
+    def start_attempt(self) -> None:
+        with self._lock:
+            if self._attempt_started is None and self._current_ssid is None:
+                self._attempt_started = time.monotonic()
+
+    def record_connected(self, ssid: str) -> None:
+        with self._lock:
+            if self._current_ssid == ssid:
+                return
+
+            if self._current_ssid is not None:
+                self._finish_connection()
+
+            if self._attempt_started is None:
+                self._attempt_started = time.monotonic()
+
+            self._current_ssid = ssid
+            self._get_or_create(ssid).attempts += 1
+
+    def record_ip_acquired(self, ssid: str) -> None:
+        with self._lock:
+            if self._current_ssid != ssid:
+                self.record_connected(ssid)
+
+            if self._connected_since is not None:
+                return
+
+            now = time.monotonic()
+            stats = self._get_or_create(ssid)
+            time_to_ip = now - (self._attempt_started if self._attempt_started is not None else now)
+            stats.successes += 1
+            stats.total_time_to_ip += time_to_ip
+            stats.add_connect_time(time_to_ip)
+            stats.last_connected = time.time()
+
+            self._attempt_started = None
+            self._connected_since = now
+
+            log.info('Network connection recorded', ssid=ssid, attempts=stats.attempts, successes=stats.successes,
+                     time_to_ip=round(time_to_ip, 3))
+            self._save_state()
+
+    def record_disconnected(self) -> None:
+        with self._lock:
+            if self._current_ssid is None:
+                return
+
+            self._finish_connection()
+            self._attempt_started = time.monotonic()
+            self._save_state()
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            if self._current_ssid is not None and self._connected_since is None:
+                if self._attempt_started is not None:
+                    stats = self._get_or_create(self._current_ssid)
+                    stats.add_censored_time(time.monotonic() - self._attempt_started)
+
+                self._finish_connection()
+                self._save_state()
+
+            self._attempt_started = None
+
+    def record_signal(self, ssid: str, rssi: int) -> None:
+        with self._lock:
+            self._get_or_create(ssid).last_rssi = rssi
+
+    def remove(self, ssid: str) -> None:
+        with self._lock:
+            if self._networks.pop(ssid, None):
+                self._save_state()
+
+    def _finish_connection(self) -> None:
+        ssid = str(self._current_ssid)
+        stats = self._get_or_create(ssid)
+
+        if self._connected_since is not None:
+            stats.total_uptime += time.monotonic() - self._connected_since
+            log.info('Network disconnected', ssid=ssid, uptime=round(time.monotonic() - self._connected_since, 3))
+        else:
+            stats.failures += 1
+            log.info('Network connection failed', ssid=ssid, failures=stats.failures)
+
+        self._current_ssid = None
+        self._connected_since = None
+
+    def _get_or_create(self, ssid: str) -> NetworkStats:
+        if (stats := self._networks.get(ssid)) is None:
+            stats = self._networks[ssid] = NetworkStats()
+
+        return stats
+
+    def _load_state(self) -> dict[str, NetworkStats]:
+        try:
+            with open(self._state_file, 'r') as file:
+                entries: dict[str, dict[str, Any]] = json.load(file).get('networks', {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, AttributeError) as error:
+            log.warning('Failed to load network history, starting with empty history',
+                        file=self._state_file, error=error)
+            return {}
+
+        names = {stats_field.name for stats_field in fields(NetworkStats)}
+
+        return {ssid: NetworkStats(**{key: value for key, value in entry.items() if key in names})
+                for ssid, entry in entries.items() if isinstance(entry, dict)}
+
+    def _save_state(self) -> None:
+        content = json.dumps({'networks': {ssid: asdict(stats) for ssid, stats in self._networks.items()}}, indent=2)
+
+        try:
+            self._file_writer.write(self._state_file, content)
+        except OSError as error:
+            log.warning('Failed to save network history', file=self._state_file, error=error)
@@ -0,0 +1,97 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+from typing import Optional
+
+from common_utility import IReusableTimer
+from context_logger import get_logger
+
+from wifi_config import WifiNetwork
+from wifi_manager import IWifiControl, NetworkHistory, NetworkStats
+
+log = get_logger('NetworkRanker')
+
+
+class NetworkRanker(object):
+    _MAX_TIME_TO_IP = 60.0
+    _MAX_UPTIME = 3600.0
+    _MIN_RSSI = -90
+    _MAX_RSSI = -30
+
+    def __init__(self, wifi_control: IWifiControl, network_history: NetworkHistory, timer: IReusableTimer,
+                 interval: int) -> None:
+        self._wifi_control = wifi_control
+        self._network_history = network_history
+        self._timer = timer
+        self._interval = interval
+
+    def start(self) -> None:
+        if self._interval > 0:
+            self._timer.start(self._interval, self._on_rank_timeout)
+
+    def stop(self) -> None:
+        self._timer.cancel()
+
+    def rank(self) -> dict[str, int]:
+        networks = self._wifi_control.get_networks()
+        history = self._network_history.get_all_stats()
+
+        if not any(self._get_ssid(network) in history for network in networks):
+            return {}
+
+        ranked = sorted(networks, key=lambda network: (
+            self.get_score(history.get(self._get_ssid(network))), network.priority
+        ), reverse=True)
+        priorities = sorted((network.priority for network in networks), reverse=True)
+
+        if len(set(priorities)) < len(priorities):
+            priorities = list(range(len(priorities) - 1, -1, -1))
+
+        changes = {self._get_ssid(network): priority for network, priority in zip(ranked, priorities)
+                   if network.priority != priority}
+
+        if changes:
+            self._wifi_control.set_network_priorities(changes)
+            log.info('Network priorities updated', priorities=changes)
+
+        return changes
+
+    def record_scan(self, networks: dict[str, int]) -> None:
+        stored = {self._get_ssid(network) for network in self._wifi_control.get_networks()}
+
+        for ssid in stored.intersection(networks):
+            self._network_history.record_signal(ssid, networks[ssid])
+
+    def get_score(self, stats: Optional[NetworkStats]) -> float:
+        if stats is None:
+            stats = NetworkStats()
+
+        score = stats.get_success_rate() * 100
+
+        if (time_to_ip := stats.get_mean_time_to_ip()) is not None:
+            score -= min(time_to_ip, self._MAX_TIME_TO_IP) / self._MAX_TIME_TO_IP * 20
+        else:
+            score -= 10
+
+        if stats.last_rssi is not None:
+            rssi = min(max(stats.last_rssi, self._MIN_RSSI), self._MAX_RSSI)
+            score += (rssi - self._MIN_RSSI) / (self._MAX_RSSI - self._MIN_RSSI) * 10
+        else:
+            score += 5
+
+        if (uptime := stats.get_mean_uptime()) is not None:
+            score += min(uptime, self._MAX_UPTIME) / self._MAX_UPTIME * 10
+
+        return score
+
+    def _get_ssid(self, network: WifiNetwork) -> str:
+        return network.ssid.strip('"')
+
+    def _on_rank_timeout(self) -> None:
+        try:
+            self.rank()
+        except Exception as error:
+            log.error('Failed to update network priorities', error=error)
+
+        self._timer.restart()
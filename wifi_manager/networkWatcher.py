@@ -0,0 +1,45 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+from typing import Any, Optional
+
+from common_utility import IReusableTimer
+from context_logger import get_logger
+
+from wifi_manager import IWifiControl
+
+log = get_logger('NetworkWatcher')
+
+
+class NetworkWatcher(object):
+
+    def __init__(self, wifi_control: IWifiControl, timer: IReusableTimer, interval: int) -> None:
+        self._wifi_control = wifi_control
+        self._timer = timer
+        self._interval = interval
+        self._on_visible: Optional[Any] = None
+
+    def start(self, on_visible: Any) -> None:
+        if self._interval > 0:
+            self._on_visible = on_visible
+            self._timer.start(self._interval, self._on_watch_timeout)
+            log.debug('Watching for stored networks', interval_seconds=self._interval)
+
+    def stop(self) -> None:
+        self._timer.cancel()
+        self._on_visible = None
+
+    def _on_watch_timeout(self) -> None:
+        try:
+            visible = self._wifi_control.get_visible_client_networks(max_age=self._interval / 2)
+        except Exception as error:
+            log.warning('Failed to check stored networks', error=error)
+            visible = None
+
+        if visible and (on_visible := self._on_visible):
+            log.info('Stored network came into range', networks=visible)
+            self._on_visible = None
+            on_visible()
+        elif self._on_visible:
+            self._timer.restart()
@@ -8,10 +8,10 @@ from typing import Any, Optional
 
 from context_logger import get_logger
 
-from wifi_config import WifiNetwork
+from wifi_config import WifiNetwork, derive_wpa_psk, is_wpa_psk
 from wifi_event import WifiEventType
 from wifi_service import WifiClientService, WifiHotspotService, IService
-from wifi_utility import IPlatformAccess
+from wifi_utility import IPlatformAccess, IWifiScanner
 
 log = get_logger('WifiControl')
 
@@ -19,6 +19,7 @@ log = get_logger('WifiControl')
 class WifiControlState(Enum):
     CLIENT = 'client'
     HOTSPOT = 'hotspot'
+    CONCURRENT = 'concurrent'
     WIFI_OFF = 'wifi_off'
     AMBIGUOUS = 'ambiguous'
 
@@ -30,6 +31,8 @@ class WifiControlState(Enum):
 class WifiControlConfig:
     switch_fail_limit: int
     switch_fail_command: str
+    precompute_psk: bool = False
+    concurrent: bool = False
 
 
 class IWifiControl(object):
@@ -61,21 +64,47 @@ class IWifiControl(object):
     def get_network_count(self) -> int:
         raise NotImplementedError()
 
+    def get_networks(self) -> list[WifiNetwork]:
+        raise NotImplementedError()
+
     def add_network(self, network: WifiNetwork) -> None:
         raise NotImplementedError()
 
+    def update_networks(self, networks: list[WifiNetwork], removed_ssids: list[str]) -> None:
+        raise NotImplementedError()
+
+    def set_network_priorities(self, priorities: dict[str, int]) -> None:
+        raise NotImplementedError()
+
+    def supports_live_reconfiguration(self) -> bool:
+        raise NotImplementedError()
+
+    def is_client_network_visible(self, max_age: Optional[float] = None) -> bool:
+        raise NotImplementedError()
+
+    def get_visible_client_networks(self, max_age: Optional[float] = None) -> Optional[list[str]]:
+        raise NotImplementedError()
+
     def is_hotspot_ip_set(self) -> bool:
         raise NotImplementedError()
 
+    def supports_concurrent_mode(self) -> bool:
+        raise NotImplementedError()
+
+    def follow_client_channel(self) -> None:
+        raise NotImplementedError()
+
 
 class WifiControl(IWifiControl):
 
     def __init__(self, client_service: WifiClientService, hotspot_service: WifiHotspotService,
-                 platform: IPlatformAccess, config: WifiControlConfig) -> None:
+                 platform: IPlatformAccess, config: WifiControlConfig,
+                 scanner: Optional[IWifiScanner] = None) -> None:
         self._client_service = client_service
         self._hotspot_service = hotspot_service
         self._platform = platform
         self._config = config
+        self._scanner = scanner
         self._failures = 0
 
         self._event_sources: dict[WifiEventType, IService] = {}
@@ -96,7 +125,10 @@ class WifiControl(IWifiControl):
         log.info('Starting client mode')
 
         try:
-            if self._hotspot_service.is_active():
+            if self._config.concurrent:
+                if not self._hotspot_service.is_active():
+                    self._hotspot_service.start()
+            elif self._hotspot_service.is_active():
                 self._hotspot_service.stop()
             if self._client_service.is_active():
                 self._client_service.restart()
@@ -110,6 +142,11 @@ class WifiControl(IWifiControl):
         log.info('Starting hotspot mode')
 
         try:
+            if self._config.concurrent:
+                if not self._hotspot_service.is_active():
+                    self._hotspot_service.start()
+                self._failures = 0
+                return
             if self._client_service.is_active():
                 self._client_service.stop()
             if self._hotspot_service.is_active():
@@ -141,7 +178,7 @@ class WifiControl(IWifiControl):
 
         if self._client_service.is_active():
             if self._hotspot_service.is_active():
-                state = WifiControlState.AMBIGUOUS
+                state = WifiControlState.CONCURRENT if self._config.concurrent else WifiControlState.AMBIGUOUS
             else:
                 state = WifiControlState.CLIENT
         elif self._hotspot_service.is_active():
@@ -153,7 +190,7 @@ class WifiControl(IWifiControl):
         state = self.get_state()
         ssid = None
 
-        if state == WifiControlState.CLIENT:
+        if state in (WifiControlState.CLIENT, WifiControlState.CONCURRENT):
             ssid = self._client_service.get_connected_ssid()
         elif state == WifiControlState.HOTSPOT:
             ssid = self._hotspot_service.get_hotspot_ssid()
@@ -170,12 +207,62 @@ class WifiControl(IWifiControl):
     def get_network_count(self) -> int:
         return self._client_service.get_network_count()
 
+    def get_networks(self) -> list[WifiNetwork]:
+        return self._client_service.get_networks()
+
     def add_network(self, network: WifiNetwork) -> None:
-        self._client_service.add_network(network)
+        self._client_service.add_network(self._prepare_network(network))
+
+    def update_networks(self, networks: list[WifiNetwork], removed_ssids: list[str]) -> None:
+        self._client_service.update_networks([self._prepare_network(network) for network in networks], removed_ssids)
+
+    def set_network_priorities(self, priorities: dict[str, int]) -> None:
+        self._client_service.set_network_priorities(priorities)
+
+    def supports_live_reconfiguration(self) -> bool:
+        return self._client_service.supports_live_reconfiguration()
+
+    def is_client_network_visible(self, max_age: Optional[float] = None) -> bool:
+        if not self._scanner:
+            return True
+
+        visible = self.get_visible_client_networks(max_age)
+
+        return visible is None or bool(visible)
+
+    def get_visible_client_networks(self, max_age: Optional[float] = None) -> Optional[list[str]]:
+        if not self._scanner:
+            return None
+
+        ssids = [network.ssid.strip('"') for network in self._client_service.get_networks()]
+        if not ssids:
+            return []
+
+        result = self._scanner.scan(ssids, ap_force=self.get_state() == WifiControlState.HOTSPOT, max_age=max_age)
+        if result is None:
+            return None
+
+        visible = [ssid for ssid in ssids if result.is_visible(ssid)]
+        log.info('Checked stored networks in range', stored=len(ssids), visible=visible)
+
+        return visible
 
     def is_hotspot_ip_set(self) -> bool:
         return self.get_ip_address() == self._hotspot_service.get_hotspot_ip()
 
+    def supports_concurrent_mode(self) -> bool:
+        return self._config.concurrent
+
+    def follow_client_channel(self) -> None:
+        if self._config.concurrent and self._hotspot_service.is_active():
+            self._hotspot_service.follow_client_channel()
+
+    def _prepare_network(self, network: WifiNetwork) -> WifiNetwork:
+        if self._config.precompute_psk and not is_wpa_psk(network.password):
+            network.password = derive_wpa_psk(network.ssid.strip('"'), network.password.strip('"'))
+
+        return network
+
     def _handle_failure(self, error: Exception) -> None:
         self._failures = self._failures + 1
 
@@ -2,7 +2,11 @@
 # SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
 # SPDX-License-Identifier: MIT
 
-from typing import Any
+import math
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Optional
 
 from common_utility import IReusableTimer
 from context_logger import get_logger
@@ -10,12 +14,21 @@ from context_logger import get_logger
 from wifi_config import WifiNetwork
 from wifi_connection import IConnectionMonitor
 from wifi_event import WifiEventType
-from wifi_manager import IWifiControl, WifiControlState
+from wifi_manager import IWifiControl, WifiControlState, NetworkHistory, NetworkRanker, NetworkWatcher
 from wifi_utility import IBlinkControl
 
 log = get_logger('WifiEventHandler')
 
 
+@dataclass
+class ClientTimeoutConfig:
+    min_timeout: int
+    max_timeout: int
+    percentile: float = 95
+    margin: float = 1.5
+    min_samples: int = 3
+
+
 class IEventHandler(object):
 
     def register_event_handlers(self) -> None:
@@ -27,6 +40,12 @@ class IEventHandler(object):
     def on_add_network_completed(self) -> None:
         raise NotImplementedError()
 
+    def on_update_networks_requested(self, configuration: dict[str, Any]) -> Optional[dict[str, Any]]:
+        raise NotImplementedError()
+
+    def on_update_networks_completed(self) -> None:
+        raise NotImplementedError()
+
     def on_restart_requested(self) -> bool:
         raise NotImplementedError()
 
@@ -47,6 +66,10 @@ class WifiEventHandler(IEventHandler):
             connection_monitor: IConnectionMonitor,
             client_timeout: int,
             peer_timeout: int,
+            network_history: Optional[NetworkHistory] = None,
+            network_ranker: Optional[NetworkRanker] = None,
+            client_timeout_config: Optional[ClientTimeoutConfig] = None,
+            network_watcher: Optional[NetworkWatcher] = None,
     ) -> None:
         self._wifi_control = wifi_control
         self._blink_control = blink_control
@@ -54,6 +77,12 @@ class WifiEventHandler(IEventHandler):
         self._connection_monitor = connection_monitor
         self._client_timeout = client_timeout
         self._peer_timeout = peer_timeout
+        self._network_history = network_history
+        self._network_ranker = network_ranker
+        self._client_timeout_config = client_timeout_config
+        self._network_watcher = network_watcher
+        self._current_client_timeout = client_timeout
+        self._switch_lock = Lock()
 
     def register_event_handlers(self) -> None:
         self._wifi_control.register_callback(WifiEventType.CLIENT_STARTED, self._on_client_started)
@@ -69,6 +98,9 @@ class WifiEventHandler(IEventHandler):
         self._wifi_control.register_callback(WifiEventType.HOTSPOT_PEER_RECONNECTED, self._on_peer_connected)
         self._wifi_control.register_callback(WifiEventType.HOTSPOT_PEER_DISCONNECTED, self._on_peer_disconnected)
 
+        if self._network_ranker:
+            self._network_ranker.start()
+
     def on_add_network_requested(self, configuration: dict[str, Any]) -> bool:
         if len(configuration.get('password', '')) < 8:
             return False
@@ -87,12 +119,39 @@ class WifiEventHandler(IEventHandler):
 
     def on_add_network_completed(self) -> None:
         log.info('Configuration completed')
+        self._apply_to_client_mode()
+
+    def on_update_networks_requested(self, configuration: dict[str, Any]) -> Optional[dict[str, Any]]:
         try:
-            self._wifi_control.start_client_mode()
-            self._timer.cancel()
+            networks = self._get_batch_networks(configuration.get('networks', []))
+            removed_ssids = [str(ssid) for ssid in configuration.get('remove', [])]
+        except (KeyError, TypeError, ValueError, AttributeError) as error:
+            log.error('Invalid network batch', error=error)
+            return None
+
+        if not networks and not removed_ssids:
+            return None
+
+        start = time.perf_counter()
+
+        try:
+            self._wifi_control.update_networks(networks, removed_ssids)
         except Exception as error:
-            self._timer.restart()
-            log.error('Failed to (re)start client mode', error=error)
+            log.error('Failed to update networks', added=len(networks), removed=len(removed_ssids), error=error)
+            return None
+
+        if self._network_history:
+            for ssid in removed_ssids:
+                self._network_history.remove(ssid)
+
+        duration = round((time.perf_counter() - start) * 1000, 3)
+        log.info('Updated networks', added=len(networks), removed=len(removed_ssids), duration_ms=duration)
+
+        return {'added': len(networks), 'removed': len(removed_ssids), 'duration_ms': duration}
+
+    def on_update_networks_completed(self) -> None:
+        log.info('Network batch completed')
+        self._apply_to_client_mode()
 
     def on_restart_requested(self) -> bool:
         log.info('Restarting client mode')
@@ -113,9 +172,61 @@ class WifiEventHandler(IEventHandler):
         self._timer.cancel()
         self._connection_monitor.stop()
 
+        if self._network_ranker:
+            self._network_ranker.stop()
+
+        self._stop_network_watcher()
+
+    def _get_batch_networks(self, configurations: list[dict[str, Any]]) -> list[WifiNetwork]:
+        networks: list[WifiNetwork] = []
+        next_priority: Optional[int] = None
+
+        for configuration in configurations:
+            ssid, password = str(configuration['ssid']), str(configuration['password'])
+
+            if len(password) < 8:
+                raise ValueError(f'Password too short for network {ssid}')
+
+            if 'priority' in configuration:
+                priority = int(configuration['priority'])
+            else:
+                if next_priority is None:
+                    next_priority = self._wifi_control.get_network_count()
+                priority = next_priority
+                next_priority += 1
+
+            if not isinstance(enabled := configuration.get('enabled', True), bool):
+                raise ValueError(f'Invalid enabled flag for network {ssid}')
+
+            networks.append(WifiNetwork(ssid, password, enabled, priority))
+
+        return networks
+
+    def _get_client_timeout(self) -> int:
+        if not self._network_history or not self._client_timeout_config:
+            return self._client_timeout
+
+        config = self._client_timeout_config
+        ssids = self._get_enabled_ssids()
+
+        connect_time = self._network_history.get_connect_time_percentile(ssids, config.percentile, config.min_samples)
+        if connect_time is None:
+            return self._client_timeout
+
+        timeout = math.ceil(connect_time * config.margin) if math.isfinite(connect_time) else config.max_timeout
+
+        return int(min(max(timeout, config.min_timeout), config.max_timeout))
+
+    def _get_enabled_ssids(self) -> list[str]:
+        return [network.ssid.strip('"') for network in self._wifi_control.get_networks() if network.enabled]
+
     def _on_client_connect_timeout(self) -> None:
         state = self._wifi_control.get_state()
-        log.info('Waiting for connection timed out', wifi_mode=state, timeout_seconds=self._client_timeout)
+        log.info('Waiting for connection timed out', wifi_mode=state, timeout_seconds=self._current_client_timeout)
+
+        if self._network_history:
+            self._network_history.record_timeout()
+
         try:
             self._wifi_control.start_hotspot_mode()
         except Exception as error:
@@ -125,36 +236,97 @@ class WifiEventHandler(IEventHandler):
     def _on_peer_connect_timeout(self) -> None:
         state = self._wifi_control.get_state()
         log.info('Waiting for peers timed out', wifi_mode=state, timeout_seconds=self._peer_timeout)
+        self._switch_to_client_mode()
+
+    def _on_client_network_visible(self) -> None:
+        state = self._wifi_control.get_state()
+
+        if state == WifiControlState.HOTSPOT:
+            log.info('Stored network in range, switching to client mode', wifi_mode=state)
+            self._switch_to_client_mode()
+
+    def _switch_to_client_mode(self) -> None:
+        with self._switch_lock:
+            state = self._wifi_control.get_state()
+
+            if self._is_client_running(state):
+                log.info('Client mode already started', wifi_mode=state)
+                return
+
+            try:
+                if not self._wifi_control.is_client_network_visible():
+                    log.info('No stored networks in range, staying in hotspot mode', retry_seconds=self._peer_timeout)
+                    self._restart_hotspot_watch()
+                    return
+
+                self._timer.cancel()
+                self._stop_network_watcher()
+                self._wifi_control.start_client_mode()
+            except Exception as error:
+                log.error('Failed switching to client mode', wifi_mode=state, error=error)
+                self._restart_hotspot_watch()
+
+    def _restart_hotspot_watch(self) -> None:
+        self._timer.restart()
+
+        if self._network_watcher:
+            self._network_watcher.start(self._on_client_network_visible)
+
+    def _apply_to_client_mode(self) -> None:
         try:
+            state = self._wifi_control.get_state()
+            if self._is_client_running(state) and self._wifi_control.supports_live_reconfiguration():
+                log.info('Networks applied to running client', wifi_mode=state)
+                return
+
             self._wifi_control.start_client_mode()
+            self._timer.cancel()
         except Exception as error:
-            log.error('Failed switching to client mode', wifi_mode='hotspot', error=error)
             self._timer.restart()
+            log.error('Failed to (re)start client mode', error=error)
+
+    def _is_client_running(self, state: WifiControlState) -> bool:
+        return state in (WifiControlState.CLIENT, WifiControlState.CONCURRENT)
+
+    def _stop_network_watcher(self) -> None:
+        if self._network_watcher:
+            self._network_watcher.stop()
 
     def _on_client_started(self, event_type: WifiEventType, data: Any) -> None:
+        self._stop_network_watcher()
+
         state = self._wifi_control.get_state()
 
-        if state == WifiControlState.CLIENT:
+        if self._is_client_running(state):
+            self._current_client_timeout = self._get_client_timeout()
             log.info(
                 'Started Wi-Fi client',
                 wifi_mode=state,
                 wifi_event=event_type,
-                timeout_seconds=self._client_timeout,
+                timeout_seconds=self._current_client_timeout,
             )
-            self._timer.start(self._client_timeout, self._on_client_connect_timeout)
+            self._timer.start(self._current_client_timeout, self._on_client_connect_timeout)
+
+            if self._network_history:
+                self._network_history.start_attempt()
 
     def _on_client_not_connected(self, event_type: WifiEventType, data: Any) -> None:
         self._connection_monitor.stop()
 
         state = self._wifi_control.get_state()
+        self._current_client_timeout = self._get_client_timeout()
 
         log.info(
             'Trying to connect to a network',
             wifi_mode=state,
             wifi_event=event_type,
-            timeout_seconds=self._client_timeout,
+            timeout_seconds=self._current_client_timeout,
         )
-        self._timer.start(self._client_timeout, self._on_client_connect_timeout)
+        self._timer.start(self._current_client_timeout, self._on_client_connect_timeout)
+
+        if self._network_history:
+            self._network_history.record_disconnected()
+            self._network_history.start_attempt()
 
     def _on_client_connected(self, event_type: WifiEventType, data: Any) -> None:
         state = self._wifi_control.get_state()
@@ -162,6 +334,15 @@ class WifiEventHandler(IEventHandler):
         log.info('Connected to network', wifi_mode=state, wifi_event=event_type, network=status)
         self._timer.cancel()
 
+        if self._wifi_control.supports_concurrent_mode():
+            try:
+                self._wifi_control.follow_client_channel()
+            except Exception as error:
+                log.error('Failed to follow client channel', wifi_mode=state, error=error)
+
+        if self._network_history and (ssid := status.get('ssid')):
+            self._network_history.record_connected(ssid)
+
     def _on_client_ip_acquired(self, event_type: WifiEventType, data: Any) -> None:
         state = self._wifi_control.get_state()
         status = self._wifi_control.get_status()
@@ -169,7 +350,15 @@ class WifiEventHandler(IEventHandler):
 
         self._connection_monitor.start()
 
+        if self._network_history and (ssid := status.get('ssid')):
+            self._network_history.record_ip_acquired(ssid)
+
     def _on_hotspot_started(self, event_type: WifiEventType, data: Any) -> None:
+        if self._wifi_control.supports_concurrent_mode():
+            state = self._wifi_control.get_state()
+            log.info('Started concurrent Wi-Fi hotspot', wifi_mode=state, wifi_event=event_type)
+            return
+
         self._connection_monitor.stop()
 
         state = self._wifi_control.get_state()
@@ -178,20 +367,22 @@ class WifiEventHandler(IEventHandler):
         if self._wifi_control.get_network_count():
             self._timer.start(self._peer_timeout, self._on_peer_connect_timeout)
 
+            if self._network_watcher:
+                self._network_watcher.start(self._on_client_network_visible)
+
     def _on_peer_connected(self, event_type: WifiEventType, data: Any) -> None:
         state = self._wifi_control.get_state()
         log.info('Peer connected', wifi_mode=state, wifi_event=event_type, peer=data)
+
+        if self._wifi_control.supports_concurrent_mode():
+            return
+
         self._timer.cancel()
+        self._stop_network_watcher()
 
     def _on_peer_disconnected(self, event_type: WifiEventType, data: Any) -> None:
         state = self._wifi_control.get_state()
 
         if state == WifiControlState.HOTSPOT:
             log.info('Peer disconnected', wifi_mode=state, wifi_event=event_type, peer=data)
-
-            try:
-                self._timer.cancel()
-                self._wifi_control.start_client_mode()
-            except Exception as error:
-                log.error('Failed switching to client mode', wifi_mode='hotspot', error=error)
-                self._timer.restart()
+            self._switch_to_client_mode()
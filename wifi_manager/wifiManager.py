@@ -2,13 +2,13 @@
 # SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
 # SPDX-License-Identifier: MIT
 
-from typing import Any
+from typing import Any, Optional
 
 from context_logger import get_logger
 
 from wifi_connection import IConnectionMonitor
 from wifi_manager import IWebServer, IEventHandler, IWifiControl, WifiControlState
-from wifi_service import IService, ServiceError
+from wifi_service import IService, ServiceError, SetupTransaction
 
 log = get_logger('WifiManager')
 
@@ -16,12 +16,14 @@ log = get_logger('WifiManager')
 class WifiManager(object):
 
     def __init__(self, services: dict[str, IService], wifi_control: IWifiControl, event_handler: IEventHandler,
-                 connection_monitor: IConnectionMonitor, web_server: IWebServer) -> None:
+                 connection_monitor: IConnectionMonitor, web_server: IWebServer,
+                 setup_transaction: Optional[SetupTransaction] = None) -> None:
         self._services = services
         self._wifi_control = wifi_control
         self._event_handler = event_handler
         self._connection_monitor = connection_monitor
         self._web_server = web_server
+        self._setup_transaction = setup_transaction
 
     def __enter__(self) -> 'WifiManager':
         return self
@@ -47,6 +49,12 @@ class WifiManager(object):
         self._event_handler.shutdown()
 
     def _setup_services(self) -> None:
+        if self._setup_transaction:
+            with self._setup_transaction as transaction:
+                for name, service in self._services.items():
+                    log.debug('Setting up service units', service=name)
+                    service.setup_units(transaction)
+
         for name, service in self._services.items():
             log.debug('Setting up service', service=name)
             service.setup()
@@ -72,7 +80,7 @@ class WifiManager(object):
 
             start_client = False
 
-            if initial_state != WifiControlState.CLIENT:
+            if initial_state not in (WifiControlState.CLIENT, WifiControlState.CONCURRENT):
                 log.info('Not running in client mode, starting client mode')
                 start_client = True
             else:
@@ -87,8 +95,18 @@ class WifiManager(object):
                     start_client = True
 
             if start_client:
-                self._wifi_control.start_client_mode()
+                self._start_client_mode()
             else:
                 self._connection_monitor.start()
+                if self._wifi_control.supports_concurrent_mode() and initial_state == WifiControlState.CLIENT:
+                    log.info('Hotspot not running alongside client, starting hotspot')
+                    self._wifi_control.start_hotspot_mode()
         except Exception as error:
             log.error('Error occurred while handling initial status', error=error)
+
+    def _start_client_mode(self) -> None:
+        if self._wifi_control.supports_concurrent_mode() or self._wifi_control.is_client_network_visible():
+            self._wifi_control.start_client_mode()
+        else:
+            log.info('No stored networks in range, starting hotspot mode')
+            self._wifi_control.start_hotspot_mode()
@@ -54,6 +54,7 @@ class WifiWebServer(IWebServer):
         self._hotspot_host = f'{self._configuration.hotspot_ip}:{self._server_port}'
         self._is_running = False
         self._network_configured = False
+        self._networks_updated = False
         self._hostname: Optional[str] = None
 
         self._set_up_api_endpoints()
@@ -70,6 +71,10 @@ class WifiWebServer(IWebServer):
                 self._network_configured = False
                 Thread(target=self._event_handler.on_add_network_completed).start()
 
+            if self._networks_updated:
+                self._networks_updated = False
+                Thread(target=self._event_handler.on_update_networks_completed).start()
+
             return response
 
     def _get_effective_port(self, server: MultiSocketServer | BaseWSGIServer) -> int:
@@ -143,6 +148,30 @@ class WifiWebServer(IWebServer):
             log.error('Invalid json configuration', error=error)
             return {}
 
+    def _convert_json_network_batch(self, batch_request: Request) -> dict[str, Any]:
+        try:
+            batch = json.loads(batch_request.data)
+
+            if batch_request.method == 'DELETE':
+                return {'remove': self._get_list_field(batch, 'ssids', str)}
+
+            return {
+                'networks': self._get_list_field(batch, 'networks', dict, []),
+                'remove': self._get_list_field(batch, 'remove', str, []),
+            }
+        except Exception as error:
+            log.error('Invalid json network batch', error=error)
+            return {}
+
+    def _get_list_field(self, batch: dict[str, Any], name: str, item_type: type,
+                        default: Optional[list[Any]] = None) -> list[Any]:
+        value = batch.get(name, default)
+
+        if not isinstance(value, list) or not all(isinstance(item, item_type) for item in value):
+            raise ValueError(f'Field {name} must be a list of {item_type.__name__}')
+
+        return value
+
     def _convert_form_configuration(self, configuration_request: Request) -> dict[str, Any]:
         try:
             ssid = configuration_request.form['ssid']
@@ -165,6 +194,21 @@ class WifiWebServer(IWebServer):
 
             return ('Configured network', 200) if self._network_configured else ('Failed to configure network', 400)
 
+        @self._app.route('/api/networks', methods=['POST', 'DELETE'])
+        def update_networks_by_api() -> tuple[Response, int]:
+            log.info('Networks API request', request=request)
+
+            configuration = self._convert_json_network_batch(request)
+
+            result = self._event_handler.on_update_networks_requested(configuration) if configuration else None
+
+            if result is None:
+                return json.jsonify({'error': 'Failed to update networks'}), 400
+
+            self._networks_updated = True
+
+            return json.jsonify(result), 200
+
         @self._app.route('/api/restart', methods=['POST'])
         def restart_by_api() -> tuple[str, int]:
             log.info('Restart API request', request=request)
@@ -1,3 +1,4 @@
+from .setupTransaction import *
 from .service import *
 from .resolvedService import *
 from .nmService import *
@@ -2,10 +2,8 @@
 # SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
 # SPDX-License-Identifier: MIT
 
-import fileinput
 from os.path import exists
 
-from common_utility import create_file
 from context_logger import get_logger
 
 from wifi_service import Service, ServiceDependencies
@@ -36,17 +34,14 @@ class AvahiService(Service):
     def _setup_config(self) -> None:
         current_hostname = self._platform.get_hostname()
 
-        create_file(self._hostname_config, self._hostname + '\n')
+        self._file_writer.write(self._hostname_config, self._hostname + '\n')
 
         self._platform.execute_command(f'hostname -F {self._hostname_config}')
 
-        with fileinput.FileInput(self._hosts_config, inplace=True) as file:
-            for line in file:
-                print(line.replace(current_hostname, self._hostname), end='')
+        self._file_writer.update(self._hosts_config, lambda content: content.replace(current_hostname, self._hostname))
 
         if exists(self._cloud_config):
-            with fileinput.FileInput(self._cloud_config, inplace=True) as file:
-                for line in file:
-                    print(line.replace('preserve_hostname: false', 'preserve_hostname: true'), end='')
+            self._file_writer.update(self._cloud_config, lambda content: content.replace(
+                'preserve_hostname: false', 'preserve_hostname: true'))
 
         log.info('Updated hostname', old_hostname=current_hostname, new_hostname=self._hostname)
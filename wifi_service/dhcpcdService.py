@@ -2,9 +2,9 @@
 # SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
 # SPDX-License-Identifier: MIT
 
-from typing import Any
+from typing import Any, Optional
 
-from common_utility import is_file_matches_pattern, append_file
+from common_utility import is_file_matches_pattern
 from context_logger import get_logger
 from dbus import SystemBus
 
@@ -25,11 +25,13 @@ class DhcpcdService(Service):
         system_bus: SystemBus,
         interface: str,
         config_file: str = '/etc/dhcpcd.conf',
+        excluded_interfaces: Optional[list[str]] = None,
     ) -> None:
         super().__init__('dhcpcd', self._SYSTEMD_DBUS_PATH, dependencies)
         self._system_bus = system_bus
         self._interface = interface
         self._config_file = config_file
+        self._excluded_interfaces = excluded_interfaces or []
 
     def get_supported_events(self) -> set[WifiEventType]:
         return {WifiEventType.CLIENT_IP_ACQUIRED}
@@ -39,12 +41,27 @@ class DhcpcdService(Service):
 
     def _need_config_setup(self) -> bool:
         pattern = f'(interface {self._interface})\n+(nohook wpa_supplicant)'
-        return not is_file_matches_pattern(self._config_file, pattern)
+        if self._excluded_interfaces:
+            pattern = f'^({self._get_deny_configuration()})\n[\\s\\S]*{pattern}'
+        return self._need_file_setup(self._config_file, pattern,
+                                     lambda: not is_file_matches_pattern(self._config_file, pattern))
 
     def _setup_config(self) -> None:
         log.info('Appending configuration file', file=self._config_file)
         configuration = f'interface {self._interface}\nnohook wpa_supplicant'
-        append_file(self._config_file, f'\n{configuration}')
+        self._file_writer.update(self._config_file, lambda content: self._update_configuration(content, configuration))
+
+    def _update_configuration(self, content: str, configuration: str) -> str:
+        if configuration not in content:
+            content = f'{content}\n{configuration}'
+        if self._excluded_interfaces:
+            deny_configuration = self._get_deny_configuration()
+            lines = [line for line in content.split('\n') if not line.startswith('denyinterfaces ')]
+            content = '\n'.join([deny_configuration] + lines)
+        return content
+
+    def _get_deny_configuration(self) -> str:
+        return f'denyinterfaces {" ".join(self._excluded_interfaces)}'
 
     def _setup_custom_event_handling(self) -> None:
         dbus_object = self._system_bus.get_object(self._DHCPCD_DBUS_SERVICE, self._DHCPCD_DBUS_PATH)
@@ -7,7 +7,7 @@ from enum import Enum
 from pathlib import Path
 from typing import Any
 
-from common_utility import render_template_file, is_file_contains_lines, create_file
+from common_utility import render_template_file, is_file_contains_lines
 from context_logger import get_logger
 from dbus import SystemBus
 
@@ -71,11 +71,12 @@ class DnsmasqService(DhcpServerService):
 
     def _need_config_setup(self) -> bool:
         expected_config = self._config_file_content.splitlines()
-        return not is_file_contains_lines(self._config_file, expected_config)
+        return self._need_file_setup(self._config_file, self._config_file_content,
+                                     lambda: not is_file_contains_lines(self._config_file, expected_config))
 
     def _setup_config(self) -> None:
         log.info('Creating service configuration file', service=self._name, file=self._config_file)
-        create_file(self._config_file, self._config_file_content)
+        self._file_writer.write(self._config_file, self._config_file_content)
 
     def _setup_custom_event_handling(self) -> None:
         dbus_object = self._system_bus.get_object(self._DNSMASQ_DBUS_SERVICE, self._DNSMASQ_DBUS_PATH)
@@ -4,13 +4,15 @@
 
 import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
-from common_utility import render_template_file, is_file_contains_lines, create_file
+from common_utility import render_template_file, is_file_contains_lines
 from context_logger import get_logger
 
+from wifi_config import derive_wpa_psk
 from wifi_event import WifiEventType
 from wifi_service import WifiHotspotService, ServiceDependencies, DhcpServerService, WifiHotspotStateEvent
+from wifi_utility import VirtualInterface
 
 log = get_logger('HostapdService')
 
@@ -18,13 +20,26 @@ log = get_logger('HostapdService')
 class HostapdConfig(object):
 
     def __init__(self, interface: str, mac_address: str, ssid: str, password: str, country: str,
-                 startup_delay: int) -> None:
+                 startup_delay: int, precompute_psk: bool = False, channel: int = 7) -> None:
         self.interface = interface
         self.mac_address = mac_address
         self.ssid = ssid
         self.password = password
         self.country = country
         self.startup_delay = startup_delay
+        self.precompute_psk = precompute_psk
+        self.channel = channel
+
+    def get_hw_mode(self) -> str:
+        return 'a' if self.channel > 14 else 'g'
+
+    def get_frequency(self) -> int:
+        if self.channel == 14:
+            return 2484
+        elif self.channel > 14:
+            return 5000 + 5 * self.channel
+        else:
+            return 2407 + 5 * self.channel
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -32,7 +47,10 @@ class HostapdConfig(object):
             'mac_address': self.mac_address,
             'ssid': self.ssid,
             'password': self.password,
+            'psk': derive_wpa_psk(self.ssid, self.password) if self.precompute_psk else '',
             'country': self.country,
+            'hw_mode': self.get_hw_mode(),
+            'channel': self.channel,
         }
 
 
@@ -47,12 +65,15 @@ class HostapdService(WifiHotspotService):
             resource_root: str,
             template_file: str = 'config/hostapd.conf.template',
             config_file: str = '/etc/hostapd/hostapd.conf',
+            virtual_interface: Optional[VirtualInterface] = None,
     ) -> None:
         super().__init__('hostapd', self._SYSTEMD_DBUS_PATH, dependencies)
         self._config_file = config_file
         self._config = config
         self._dhcp_server = dhcp_server
-        self._configuration = render_template_file(Path(resource_root, template_file), config.to_dict())
+        self._template_file = Path(resource_root, template_file)
+        self._virtual_interface = virtual_interface
+        self._configuration = render_template_file(self._template_file, config.to_dict())
         self.set_auto_start(False)
 
     def start(self) -> None:
@@ -75,17 +96,48 @@ class HostapdService(WifiHotspotService):
     def get_hotspot_ip(self) -> str:
         return self._dhcp_server.get_static_ip()
 
+    def follow_client_channel(self) -> None:
+        if not self._virtual_interface:
+            return
+
+        channel = self._virtual_interface.get_parent_channel()
+
+        if not channel or channel == self._config.channel:
+            return
+
+        self._set_channel(channel)
+
+        if self.is_active():
+            try:
+                self._platform.execute_command(
+                    f'hostapd_cli -i {self._config.interface} chan_switch 5 {self._config.get_frequency()}')
+                log.info('Switched hotspot channel', channel=channel)
+            except Exception as error:
+                log.warning('Failed to switch hotspot channel, restarting', channel=channel, error=error)
+                self.restart()
+
+    def _set_channel(self, channel: int) -> None:
+        log.info('Updating hotspot channel', previous=self._config.channel, channel=channel)
+        self._config.channel = channel
+        self._configuration = render_template_file(self._template_file, self._config.to_dict())
+        self._setup_config()
+
     def _prepare_start(self) -> None:
         time.sleep(self._config.startup_delay)
+        if self._virtual_interface:
+            self._virtual_interface.create()
+            if (channel := self._virtual_interface.get_parent_channel()) and channel != self._config.channel:
+                self._set_channel(channel)
         self._platform.set_ip_address(self._config.interface, self._dhcp_server.get_static_ip())
 
     def _need_config_setup(self) -> bool:
         expected_config = self._configuration.splitlines()
-        return not is_file_contains_lines(self._config_file, expected_config)
+        return self._need_file_setup(self._config_file, self._configuration,
+                                     lambda: not is_file_contains_lines(self._config_file, expected_config))
 
     def _setup_config(self) -> None:
         log.info('Creating service configuration file', service=self._name, file=self._config_file)
-        create_file(self._config_file, self._configuration)
+        self._file_writer.write(self._config_file, self._configuration)
 
     def _on_service_state_changed(self, state: str) -> None:
         super()._on_service_state_changed(state)
@@ -72,13 +72,34 @@ class NetworkManagerService(WifiClientService):
         return self._wifi_dbus.get_active_ssid()
 
     def get_network_count(self) -> int:
-        return len(self._wifi_config.get_networks())
+        return self._wifi_config.get_network_count()
 
     def get_networks(self) -> list[WifiNetwork]:
         return self._wifi_config.get_networks()
 
     def add_network(self, network: WifiNetwork) -> None:
-        self._wifi_config.add_network(network)
+        if self.is_active():
+            self._wifi_dbus.add_network(network)
+        else:
+            self._wifi_config.add_network(network)
+
+    def update_networks(self, networks: list[WifiNetwork], removed_ssids: list[str]) -> None:
+        if self.is_active():
+            self._wifi_dbus.update_networks(networks, removed_ssids)
+        else:
+            self._wifi_config.update_networks(networks, removed_ssids)
+
+    def set_network_priorities(self, priorities: dict[str, int]) -> None:
+        if self.is_active():
+            self._wifi_dbus.set_network_priorities(priorities)
+        else:
+            self._wifi_config.update_networks(self._get_prioritized_networks(self.get_networks(), priorities), [])
+
+    def supports_live_reconfiguration(self) -> bool:
+        return True
+
+    def scan_networks(self, ssids: list[str]) -> Optional[dict[str, int]]:
+        return self._wifi_dbus.scan(ssids) if self.is_active() else None
 
     def reset_wireless(self) -> None:
         self._wifi_dbus.reset_wireless()
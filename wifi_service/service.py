@@ -3,14 +3,16 @@
 # SPDX-License-Identifier: MIT
 from enum import Enum
 from threading import Event
-from typing import Optional, Any
+from typing import Optional, Any, Callable
 
 from context_logger import get_logger
 from systemd_dbus import Systemd
 
 from wifi_config import WifiNetwork
+from wifi_dbus import SystemdUnitMonitor, UnitSnapshot, UnitState
 from wifi_event import WifiEventType
-from wifi_utility import IPlatformAccess, IJournal
+from wifi_service import SetupTransaction
+from wifi_utility import IPlatformAccess, IJournal, ConfigReconciler, AtomicFileWriter
 
 log = get_logger('Service')
 
@@ -24,6 +26,9 @@ class ServiceError(Exception):
 
 class IService(object):
 
+    def setup_units(self, transaction: SetupTransaction) -> None:
+        raise NotImplementedError()
+
     def setup(self) -> None:
         raise NotImplementedError()
 
@@ -66,10 +71,17 @@ class IService(object):
 
 class ServiceDependencies(object):
 
-    def __init__(self, platform: IPlatformAccess, systemd: Systemd, journal: IJournal):
+    def __init__(self, platform: IPlatformAccess, systemd: Systemd, journal: IJournal,
+                 unit_monitor: Optional[SystemdUnitMonitor] = None, unit_snapshot: Optional[UnitSnapshot] = None,
+                 config_reconciler: Optional[ConfigReconciler] = None,
+                 file_writer: Optional[AtomicFileWriter] = None):
         self.platform = platform
         self.systemd = systemd
         self.journal = journal
+        self.unit_monitor = unit_monitor
+        self.unit_snapshot = unit_snapshot
+        self.config_reconciler = config_reconciler
+        self.file_writer = file_writer or AtomicFileWriter()
 
 
 class Service(IService):
@@ -80,18 +92,34 @@ class Service(IService):
         self._platform = dependencies.platform
         self._systemd = dependencies.systemd
         self._journal = dependencies.journal
+        self._unit_monitor = dependencies.unit_monitor
+        self._unit_snapshot = dependencies.unit_snapshot
+        self._config_reconciler = dependencies.config_reconciler
+        self._file_writer = dependencies.file_writer
         self._config_reloaded = Event()
         self._force_stop = False
         self._auto_start = True
         self._failed = False
+        self._units_set_up = False
         self._last_state: Optional[str] = None
         self._event_callbacks: dict[WifiEventType, Any] = {}
 
+    def setup_units(self, transaction: SetupTransaction) -> None:
+        try:
+            self._setup_unmasking(transaction)
+            self._setup_masking(transaction)
+            self._setup_unit_files(transaction)
+            self._units_set_up = True
+        except Exception as error:
+            raise ServiceError(self._name, str(error))
+
     def setup(self) -> None:
+        if not self._units_set_up:
+            with SetupTransaction(self._systemd) as transaction:
+                self.setup_units(transaction)
+
         try:
-            self._setup_unmasking()
             self._setup_auto_start()
-            self._setup_masking()
             self._setup_state_change_handling()
             self._setup_config_and_reload()
             self._setup_custom_event_handling()
@@ -124,9 +152,13 @@ class Service(IService):
         return self._systemd.is_active(self._name)
 
     def is_enabled(self) -> bool:
+        if unit_state := self._get_unit_state():
+            return unit_state.is_enabled()
         return self._systemd.is_enabled(self._name)
 
     def is_installed(self) -> bool:
+        if unit_state := self._get_unit_state():
+            return unit_state.is_installed()
         return self._systemd.is_installed(self._name)
 
     def get_name(self) -> str:
@@ -155,28 +187,47 @@ class Service(IService):
     def _is_force_stop(self) -> bool:
         return self._force_stop
 
-    def _setup_masking(self) -> None:
-        if self._is_force_stop() and not self._systemd.is_masked(self._name):
+    def _is_masked(self) -> bool:
+        if unit_state := self._get_unit_state():
+            return unit_state.is_masked()
+        return bool(self._systemd.is_masked(self._name))
+
+    def _get_unit_state(self) -> Optional[UnitState]:
+        return self._unit_snapshot.get(self._name) if self._unit_snapshot else None
+
+    def _invalidate_unit_state(self) -> None:
+        if self._unit_snapshot:
+            self._unit_snapshot.invalidate(self._name)
+
+    def _setup_masking(self, transaction: SetupTransaction) -> None:
+        if self._is_force_stop() and not self._is_masked():
             log.info('Service is unmasked, masking service', service=self._name)
             self._systemd.mask_service(self._name)
-            self._systemd.reload_daemon()
+            self._invalidate_unit_state()
+            transaction.request_reload(self._name)
 
-    def _setup_unmasking(self) -> None:
-        if not self._is_force_stop() and self._systemd.is_masked(self._name):
+    def _setup_unmasking(self, transaction: SetupTransaction) -> None:
+        if not self._is_force_stop() and self._is_masked():
             log.info('Service is masked, unmasking service', service=self._name)
             self._systemd.unmask_service(self._name)
-            self._systemd.reload_daemon()
+            self._invalidate_unit_state()
+            transaction.request_reload(self._name)
+
+    def _setup_unit_files(self, transaction: SetupTransaction) -> None:
+        pass
 
     def _setup_auto_start(self) -> None:
         if self._is_auto_start():
             if not self.is_enabled():
                 log.info('Service is not enabled, enabling service', service=self._name)
                 self._systemd.enable_service(self._name)
+                self._invalidate_unit_state()
             self.start()
         else:
             if self.is_enabled():
                 log.info('Service is enabled, disabling service', service=self._name)
                 self._systemd.disable_service(self._name)
+                self._invalidate_unit_state()
             self.stop()
 
     def _setup_state_change_handling(self) -> None:
@@ -188,6 +239,11 @@ class Service(IService):
     def _setup_config(self) -> None:
         pass
 
+    def _need_file_setup(self, config_file: str, expected: str, check: Callable[[], bool]) -> bool:
+        if self._config_reconciler:
+            return self._config_reconciler.need_setup(config_file, expected, check)
+        return check()
+
     def _reload_config(self) -> None:
         self._systemd.restart_service(self._name)
 
@@ -218,7 +274,10 @@ class Service(IService):
                           event_type=event_type, callback=callback.__name__, service=self._name, error=error)
 
     def _add_property_change_handler(self, handler: Any) -> None:
-        self._systemd.add_property_change_handler(self._path, handler)
+        if self._unit_monitor:
+            self._unit_monitor.add_handler(self._path, handler)
+        else:
+            self._systemd.add_property_change_handler(self._path, handler)
 
     def _on_property_changed(self, *args: Any) -> None:
         _, props, _ = args
@@ -308,9 +367,25 @@ class WifiClientService(WifiService):
     def add_network(self, network: WifiNetwork) -> None:
         raise NotImplementedError()
 
+    def update_networks(self, networks: list[WifiNetwork], removed_ssids: list[str]) -> None:
+        raise NotImplementedError()
+
+    def set_network_priorities(self, priorities: dict[str, int]) -> None:
+        raise NotImplementedError()
+
+    def supports_live_reconfiguration(self) -> bool:
+        return False
+
+    def scan_networks(self, ssids: list[str]) -> Optional[dict[str, int]]:
+        return None
+
     def reset_wireless(self) -> None:
         raise NotImplementedError()
 
+    def _get_prioritized_networks(self, networks: list[WifiNetwork], priorities: dict[str, int]) -> list[WifiNetwork]:
+        return [WifiNetwork(network.ssid, network.password, network.enabled, priorities[network.ssid.strip('"')])
+                for network in networks if network.ssid.strip('"') in priorities]
+
 
 class WifiHotspotService(WifiService):
 
@@ -320,6 +395,9 @@ class WifiHotspotService(WifiService):
     def get_hotspot_ip(self) -> str:
         raise NotImplementedError()
 
+    def follow_client_channel(self) -> None:
+        pass
+
 
 class DhcpServerService(Service):
 
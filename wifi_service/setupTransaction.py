@@ -0,0 +1,60 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+import time
+from threading import Lock
+from typing import Any
+
+from context_logger import get_logger
+from systemd_dbus import Systemd
+
+log = get_logger('SetupTransaction')
+
+
+class SetupTransaction(object):
+
+    def __init__(self, systemd: Systemd) -> None:
+        self._systemd = systemd
+        self._requesters: list[str] = []
+        self._reloads = 0
+        self._reloads_avoided = 0
+        self._lock = Lock()
+
+    def __enter__(self) -> 'SetupTransaction':
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        self.commit()
+
+    def request_reload(self, service: str) -> None:
+        with self._lock:
+            self._requesters.append(service)
+
+        log.debug('Daemon reload requested', service=service)
+
+    def is_reload_pending(self) -> bool:
+        return len(self._requesters) > 0
+
+    def commit(self) -> None:
+        with self._lock:
+            requesters = self._requesters
+            self._requesters = []
+
+        if not requesters:
+            return
+
+        start = time.monotonic()
+        self._systemd.reload_daemon()
+
+        self._reloads += 1
+        self._reloads_avoided += len(requesters) - 1
+
+        log.info('Daemon reloaded', requested_by=requesters, reloads_avoided=self._reloads_avoided,
+                 duration=round(time.monotonic() - start, 3))
+
+    def get_reload_count(self) -> int:
+        return self._reloads
+
+    def get_reloads_avoided(self) -> int:
+        return self._reloads_avoided
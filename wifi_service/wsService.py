@@ -2,7 +2,6 @@
 # SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
 # SPDX-License-Identifier: MIT
 
-import fileinput
 import os.path
 from enum import Enum
 from typing import Any, Optional
@@ -13,7 +12,7 @@ from context_logger import get_logger
 from wifi_config import IWifiConfig, WifiNetwork
 from wifi_dbus import IWifiDbus
 from wifi_event import WifiEventType
-from wifi_service import WifiClientService, IService, ServiceDependencies, WifiClientStateEvent
+from wifi_service import WifiClientService, IService, ServiceDependencies, WifiClientStateEvent, SetupTransaction
 
 log = get_logger('WpaSupplicantService')
 
@@ -56,6 +55,7 @@ class WpaSupplicantService(WifiClientService):
         self._interface = wifi_dbus.get_interface()
         self._service_file = service_file
         self._run_file = os.path.join(run_dir, self._interface)
+        self._service_file_updated = False
 
         config_file = self._wifi_config.get_config_file()
         self._exec_start = f'ExecStart=/sbin/{self._name} -u -s -O {run_dir} -i{self._interface} -c{config_file}\n'
@@ -72,7 +72,7 @@ class WpaSupplicantService(WifiClientService):
         return self._wifi_dbus.get_active_ssid()
 
     def get_network_count(self) -> int:
-        return len(self._wifi_config.get_networks())
+        return self._wifi_config.get_network_count()
 
     def get_networks(self) -> list[WifiNetwork]:
         return self._wifi_config.get_networks()
@@ -83,6 +83,24 @@ class WpaSupplicantService(WifiClientService):
 
         self._wifi_config.add_network(network)
 
+    def update_networks(self, networks: list[WifiNetwork], removed_ssids: list[str]) -> None:
+        if self.is_active():
+            self._wifi_dbus.update_networks(networks, removed_ssids)
+
+        self._wifi_config.update_networks(networks, removed_ssids)
+
+    def set_network_priorities(self, priorities: dict[str, int]) -> None:
+        if self.is_active():
+            self._wifi_dbus.set_network_priorities(priorities)
+
+        self._wifi_config.update_networks(self._get_prioritized_networks(self.get_networks(), priorities), [])
+
+    def supports_live_reconfiguration(self) -> bool:
+        return True
+
+    def scan_networks(self, ssids: list[str]) -> Optional[dict[str, int]]:
+        return self._wifi_dbus.scan(ssids) if self.is_active() else None
+
     def reset_wireless(self) -> None:
         self._wifi_dbus.reset_wireless()
 
@@ -90,20 +108,24 @@ class WpaSupplicantService(WifiClientService):
         delete_file(self._run_file)
         self._dhcp_client.start()
 
-    def _need_config_setup(self) -> bool:
-        return self._need_service_file_setup() or self._wifi_config.need_config_file_setup()
-
-    def _setup_config(self) -> None:
+    def _setup_unit_files(self, transaction: SetupTransaction) -> None:
         if self._need_service_file_setup():
             log.info('Updating service file', file=self._service_file)
 
-            with fileinput.FileInput(self._service_file, inplace=True) as file:
-                for line in file:
-                    if 'ExecStart' in line:
-                        line = self._exec_start
-                    print(line, end='')
+            self._file_writer.update(self._service_file, self._replace_exec_start)
+
+            self._service_file_updated = True
+            transaction.request_reload(self._name)
 
-            self._systemd.reload_daemon()
+    def _replace_exec_start(self, content: str) -> str:
+        lines = content.splitlines(keepends=True)
+        return ''.join(self._exec_start if 'ExecStart' in line else line for line in lines)
+
+    def _need_config_setup(self) -> bool:
+        return self._service_file_updated or self._wifi_config.need_config_file_setup()
+
+    def _setup_config(self) -> None:
+        self._service_file_updated = False
 
         if self._wifi_config.need_config_file_setup():
             log.info('Updating config file', file=self._wifi_config.get_config_file())
@@ -113,7 +135,8 @@ class WpaSupplicantService(WifiClientService):
         self._wifi_dbus.add_connection_handler(self._on_wpa_properties_changed)
 
     def _need_service_file_setup(self) -> bool:
-        return not is_file_matches_pattern(self._service_file, self._exec_start)
+        return self._need_file_setup(self._service_file, self._exec_start,
+                                     lambda: not is_file_matches_pattern(self._service_file, self._exec_start))
 
     def _on_service_state_changed(self, state: str) -> None:
         super()._on_service_state_changed(state)
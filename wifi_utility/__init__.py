@@ -4,3 +4,8 @@ from .interfaceSelector import *
 from .serviceJournal import *
 from .blinkDevice import *
 from .blinkControl import *
+from .configReconciler import *
+from .fileMonitor import *
+from .atomicFileWriter import *
+from .wifiScanner import *
+from .virtualInterface import *
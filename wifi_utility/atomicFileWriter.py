@@ -0,0 +1,101 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+import os
+import tempfile
+from threading import Lock
+from typing import Callable, Optional
+
+from context_logger import get_logger
+
+log = get_logger('AtomicFileWriter')
+
+
+class AtomicFileWriter(object):
+    _DEFAULT_MODE = 0o644
+
+    def __init__(self) -> None:
+        self._bytes_written = 0
+        self._writes = 0
+        self._writes_avoided = 0
+        self._lock = Lock()
+
+    def write(self, file_path: str, content: str, mode: Optional[int] = None) -> bool:
+        data = content.encode()
+
+        if self._read(file_path) == data:
+            if mode is not None and (os.stat(file_path).st_mode & 0o7777) != mode:
+                os.chmod(file_path, mode)
+
+            with self._lock:
+                self._writes_avoided += 1
+
+            log.debug('File is up to date, write skipped', file=file_path)
+            return False
+
+        directory = os.path.dirname(file_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(file_path)}.')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+
+            os.chmod(temp_path, mode if mode is not None else self._get_mode(file_path))
+            os.replace(temp_path, file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self._sync_directory(directory)
+
+        with self._lock:
+            self._bytes_written += len(data)
+            self._writes += 1
+
+        log.debug('File written', file=file_path, bytes=len(data))
+        return True
+
+    def update(self, file_path: str, transform: Callable[[str], str], mode: Optional[int] = None) -> bool:
+        data = self._read(file_path)
+        content = data.decode() if data is not None else ''
+        return self.write(file_path, transform(content), mode)
+
+    def get_bytes_written(self) -> int:
+        return self._bytes_written
+
+    def get_writes(self) -> int:
+        return self._writes
+
+    def get_writes_avoided(self) -> int:
+        return self._writes_avoided
+
+    def _read(self, file_path: str) -> Optional[bytes]:
+        try:
+            with open(file_path, 'rb') as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def _get_mode(self, file_path: str) -> int:
+        try:
+            return os.stat(file_path).st_mode & 0o7777
+        except FileNotFoundError:
+            return self._DEFAULT_MODE
+
+    def _sync_directory(self, directory: str) -> None:
+        try:
+            directory_descriptor = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+
+        try:
+            os.fsync(directory_descriptor)
+        except OSError:
+            pass
+        finally:
+            os.close(directory_descriptor)
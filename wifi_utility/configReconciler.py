@@ -0,0 +1,115 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import json
+import os
+import time
+from threading import Lock
+from typing import Any, Callable, Optional
+
+from context_logger import get_logger
+
+from .atomicFileWriter import AtomicFileWriter
+
+log = get_logger('ConfigReconciler')
+
+
+class ConfigReconciler(object):
+
+    def __init__(self, state_file: str, file_writer: Optional[AtomicFileWriter] = None) -> None:
+        self._state_file = state_file
+        self._file_writer = file_writer if file_writer else AtomicFileWriter()
+        self._entries: dict[str, dict[str, Any]] = self._load_state()
+        self._timings: dict[str, dict[str, Any]] = {}
+        self._lock = Lock()
+
+    def need_setup(self, config_file: str, expected: str, check: Callable[[], bool]) -> bool:
+        start = time.perf_counter()
+        expected_hash = self._get_hash(expected.encode())
+
+        with self._lock:
+            file_stat = self._get_stat(config_file)
+            entry = self._entries.get(config_file)
+
+            if entry and entry['expected_hash'] != expected_hash:
+                entry = None
+
+            if file_stat is None:
+                method, need = 'missing', check()
+            elif entry and self._is_same_metadata(entry, file_stat):
+                method, need = 'stat', False
+            else:
+                content_hash = self._get_file_hash(config_file)
+                if entry and entry['content_hash'] == content_hash:
+                    method, need = 'hash', False
+                else:
+                    method, need = 'check', check()
+
+            duration = time.perf_counter() - start
+            self._timings[config_file] = {'method': method, 'duration': duration}
+
+            if method in ('hash', 'check'):
+                self._update_entry(config_file, need, expected_hash, content_hash)
+
+        log.debug('Config reconciled', file=config_file, method=method, need_setup=need, duration=round(duration, 6))
+
+        return need
+
+    def get_timings(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return dict(self._timings)
+
+    def _update_entry(self, config_file: str, need: bool, expected_hash: str, content_hash: str) -> None:
+        file_stat = self._get_stat(config_file)
+
+        if need or file_stat is None:
+            self._entries.pop(config_file, None)
+        else:
+            self._entries[config_file] = {
+                'inode': file_stat.st_ino,
+                'mtime_ns': file_stat.st_mtime_ns,
+                'size': file_stat.st_size,
+                'content_hash': content_hash,
+                'expected_hash': expected_hash,
+            }
+
+        self._save_state()
+
+    def _is_same_metadata(self, entry: dict[str, Any], file_stat: os.stat_result) -> bool:
+        return bool(entry['inode'] == file_stat.st_ino and entry['mtime_ns'] == file_stat.st_mtime_ns
+                    and entry['size'] == file_stat.st_size)
+
+    def _get_stat(self, config_file: str) -> Optional[os.stat_result]:
+        try:
+            return os.stat(config_file)
+        except OSError:
+            return None
+
+    def _get_file_hash(self, config_file: str) -> str:
+        with open(config_file, 'rb') as file:
+            return self._get_hash(file.read())
+
+    def _get_hash(self, data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _load_state(self) -> dict[str, dict[str, Any]]:
+        if not os.path.exists(self._state_file):
+            return {}
+
+        try:
+            with open(self._state_file, 'r') as file:
+                entries: dict[str, dict[str, Any]] = json.load(file).get('files', {})
+                return entries
+        except (OSError, ValueError, AttributeError) as error:
+            log.warning('Failed to load config state, starting with empty state', file=self._state_file, error=error)
+            return {}
+
+    def _save_state(self) -> None:
+        content = json.dumps({'files': self._entries, 'timings': self._timings}, indent=2)
+
+        try:
+            self._file_writer.write(self._state_file, content)
+        except OSError as error:
+            log.warning('Failed to save config state', file=self._state_file, error=error)
@@ -0,0 +1,82 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+from threading import Lock
+from typing import Any, Callable, Optional
+
+from context_logger import get_logger
+from gi.repository import Gio
+
+log = get_logger('FileMonitor')
+
+
+class FileMonitor(object):
+    _EVENTS = {
+        Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+        Gio.FileMonitorEvent.CREATED,
+        Gio.FileMonitorEvent.DELETED,
+        Gio.FileMonitorEvent.MOVED_IN,
+        Gio.FileMonitorEvent.MOVED_OUT,
+        Gio.FileMonitorEvent.RENAMED,
+    }
+
+    def __init__(self, path: str, directory: bool = False) -> None:
+        self._path = path
+        self._directory = directory
+        self._handlers: list[Callable[[str], None]] = []
+        self._monitor: Optional[Gio.FileMonitor] = None
+        self._lock = Lock()
+
+    def get_path(self) -> str:
+        return self._path
+
+    def is_active(self) -> bool:
+        return self._monitor is not None
+
+    def add_handler(self, handler: Callable[[str], None]) -> None:
+        with self._lock:
+            self._handlers.append(handler)
+
+    def start(self) -> None:
+        if self._monitor is not None:
+            return
+
+        file = Gio.File.new_for_path(self._path)
+        flags = Gio.FileMonitorFlags.WATCH_MOVES
+
+        try:
+            if self._directory:
+                self._monitor = file.monitor_directory(flags, None)
+            else:
+                self._monitor = file.monitor_file(flags, None)
+        except Exception as error:
+            log.warning('Failed to monitor path, changes are detected on access only', path=self._path, error=error)
+            return
+
+        self._monitor.connect('changed', self._on_changed)
+
+        log.info('Monitoring path', path=self._path, directory=self._directory)
+
+    def stop(self) -> None:
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+
+    def _on_changed(self, monitor: Any, file: Gio.File, other_file: Optional[Gio.File], event: Any) -> None:
+        if event not in self._EVENTS:
+            return
+
+        paths = [file.get_path()]
+
+        if event == Gio.FileMonitorEvent.RENAMED and other_file:
+            paths.append(other_file.get_path())
+
+        log.debug('Monitored path changed', paths=paths, event=event.value_nick)
+
+        with self._lock:
+            handlers = list(self._handlers)
+
+        for path in paths:
+            for handler in handlers:
+                handler(path)
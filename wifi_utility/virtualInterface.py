@@ -0,0 +1,59 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+import os
+import re
+from typing import Optional
+
+from context_logger import get_logger
+
+from wifi_utility import IPlatformAccess
+
+log = get_logger('VirtualInterface')
+
+
+class VirtualInterface(object):
+    _CHANNEL_PATTERN = re.compile(r'^\s*channel (\d+)', re.MULTILINE)
+
+    def __init__(self, platform: IPlatformAccess, parent_interface: str, interface: str,
+                 unmanaged: bool = False, sys_class_net: str = '/sys/class/net') -> None:
+        self._platform = platform
+        self._parent_interface = parent_interface
+        self._interface = interface
+        self._unmanaged = unmanaged
+        self._sys_class_net = sys_class_net
+
+    def get_interface(self) -> str:
+        return self._interface
+
+    def get_parent_interface(self) -> str:
+        return self._parent_interface
+
+    def exists(self) -> bool:
+        return os.path.exists(os.path.join(self._sys_class_net, self._interface))
+
+    def create(self) -> None:
+        if self.exists():
+            return
+
+        self._platform.execute_command(f'iw dev {self._parent_interface} interface add {self._interface} type __ap')
+        log.info('Virtual interface created', interface=self._interface, parent=self._parent_interface)
+
+        if self._unmanaged:
+            try:
+                self._platform.execute_command(f'nmcli device set {self._interface} managed no')
+            except Exception as error:
+                log.warning('Failed to release interface from NetworkManager', interface=self._interface, error=error)
+
+    def get_parent_channel(self) -> Optional[int]:
+        try:
+            output = self._platform.execute_command(f'iw dev {self._parent_interface} info').decode()
+        except Exception as error:
+            log.warning('Failed to get interface channel', interface=self._parent_interface, error=error)
+            return None
+
+        if match := self._CHANNEL_PATTERN.search(output):
+            return int(match.group(1))
+
+        return None
@@ -0,0 +1,150 @@
+# SPDX-FileCopyrightText: 2024 Ferenc Nandor Janky <ferenj@effective-range.com>
+# SPDX-FileCopyrightText: 2024 Attila Gombos <attila.gombos@effective-range.com>
+# SPDX-License-Identifier: MIT
+
+import re
+import shlex
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Optional
+
+from context_logger import get_logger
+
+from wifi_utility import IPlatformAccess
+
+log = get_logger('WifiScanner')
+
+
+@dataclass
+class ScanResult:
+    timestamp: float
+    networks: dict[str, int]
+    requested: frozenset[str] = frozenset()
+
+    def get_age(self) -> float:
+        return time.monotonic() - self.timestamp
+
+    def is_visible(self, ssid: str) -> bool:
+        return ssid in self.networks
+
+    def covers(self, ssids: list[str]) -> bool:
+        return not self.requested or self.requested.issuperset(ssids)
+
+
+class IWifiScanner(object):
+
+    def scan(self, ssids: list[str], ap_force: bool = False, max_age: Optional[float] = None) -> Optional[ScanResult]:
+        raise NotImplementedError()
+
+    def get_cached_result(self, max_age: Optional[float] = None) -> Optional[ScanResult]:
+        raise NotImplementedError()
+
+    def add_result_handler(self, handler: Any) -> None:
+        raise NotImplementedError()
+
+
+class WifiScanner(IWifiScanner):
+    _BSS_PATTERN = re.compile(r'^BSS [0-9a-fA-F:]{17}')
+    _SIGNAL_PATTERN = re.compile(r'^\s+signal:\s*(-?\d+(?:\.\d+)?) dBm')
+    _SSID_PATTERN = re.compile(r'^\s+SSID: (.*)$')
+
+    def __init__(self, platform: IPlatformAccess, interface: str, cache_ttl: float = 30,
+                 scan_source: Optional[Any] = None) -> None:
+        self._platform = platform
+        self._interface = interface
+        self._cache_ttl = cache_ttl
+        self._scan_source = scan_source
+        self._result: Optional[ScanResult] = None
+        self._handlers: list[Any] = []
+        self._lock = Lock()
+
+    def scan(self, ssids: list[str], ap_force: bool = False, max_age: Optional[float] = None) -> Optional[ScanResult]:
+        with self._lock:
+            if (cached := self._get_cached_result(max_age)) and cached.covers(ssids):
+                log.debug('Using cached scan result', age=round(cached.get_age(), 3), networks=len(cached.networks))
+                return cached
+
+            start = time.monotonic()
+
+            if (networks := self._scan_networks(ssids, ap_force)) is None:
+                return None
+
+            self._result = ScanResult(time.monotonic(), networks, frozenset(ssids))
+            result = self._result
+
+        log.info('Scanned for networks', interface=self._interface, requested=len(ssids),
+                 found=len(result.networks), duration=round(result.timestamp - start, 3))
+
+        for handler in self._handlers:
+            handler(dict(result.networks))
+
+        return result
+
+    def get_cached_result(self, max_age: Optional[float] = None) -> Optional[ScanResult]:
+        with self._lock:
+            return self._get_cached_result(max_age)
+
+    def add_result_handler(self, handler: Any) -> None:
+        self._handlers.append(handler)
+
+    def _scan_networks(self, ssids: list[str], ap_force: bool) -> Optional[dict[str, int]]:
+        if self._scan_source:
+            try:
+                if (networks := self._scan_source(ssids)) is not None:
+                    return dict(networks)
+            except Exception as error:
+                log.warning('Failed to scan for networks via client service', interface=self._interface, error=error)
+
+            log.info('Client service scan not available, scanning with iw', interface=self._interface)
+
+        return self._scan_with_iw(ssids, ap_force)
+
+    def _scan_with_iw(self, ssids: list[str], ap_force: bool) -> Optional[dict[str, int]]:
+        command = f'iw dev {self._interface} scan'
+        if ap_force:
+            command += ' ap-force'
+        if ssids:
+            command += ' ssid ' + ' '.join(shlex.quote(ssid) for ssid in ssids)
+
+        try:
+            output = self._platform.execute_command(command).decode('utf-8', errors='replace')
+        except Exception as error:
+            if ap_force:
+                log.warning('Failed to scan for networks with ap-force, retrying without it',
+                            interface=self._interface, error=error)
+                return self._scan_with_iw(ssids, False)
+
+            log.warning('Failed to scan for networks', interface=self._interface, error=error)
+            return None
+
+        return self._parse(output)
+
+    def _get_cached_result(self, max_age: Optional[float] = None) -> Optional[ScanResult]:
+        max_age = self._cache_ttl if max_age is None else max_age
+
+        if self._result and self._result.get_age() <= max_age:
+            return self._result
+
+        return None
+
+    def _parse(self, output: str) -> dict[str, int]:
+        networks: dict[str, int] = {}
+        signal: Optional[int] = None
+
+        for line in output.splitlines():
+            if self._BSS_PATTERN.match(line):
+                signal = None
+            elif match := self._SIGNAL_PATTERN.match(line):
+                signal = round(float(match.group(1)))
+            elif (match := self._SSID_PATTERN.match(line)) and signal is not None:
+                if ssid := self._decode_ssid(match.group(1)):
+                    networks[ssid] = max(signal, networks.get(ssid, signal))
+
+        return networks
+
+    def _decode_ssid(self, value: str) -> str:
+        try:
+            return value.encode('latin-1').decode('unicode_escape').encode('latin-1').decode('utf-8')
+        except (UnicodeDecodeError, UnicodeEncodeError):
+            return value